@@ -1,26 +1,46 @@
 import json
 import logging
-import groq
 from bs4 import BeautifulSoup
 import os
+from prompt_registry import (
+    PAGE_ANALYSIS_SYSTEM, PAGE_ANALYSIS_USER, PAGE_DESCRIPTION_STREAM_SYSTEM,
+    CONTENT_DESCRIPTION_SYSTEM, CONTENT_DESCRIPTION_USER
+)
+from sentence_stream import iter_sentences
+from llm_gateway import get_gateway
+from page_compaction import compact_page_info, to_prompt_json, CATEGORY_ORDER
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Key in page_info holding the items of each content type
+CONTENT_KEYS = {
+    "products": "products",
+    "videos": "videos",
+    "images": "images",
+    "music": "music",
+    "articles": "cards",  # cards in page_info contains articles
+    "links": "links"
+}
+
 class AdvancedPageAnalyzer:
     """
     Advanced page analyzer that uses LLM to provide detailed description of web page content.
     Takes parsed HTML elements and extracts structured information about products, videos, etc.
     """
     
-    def __init__(self, groq_api_key=None):
-        """Initialize the analyzer with the API key for LLM service"""
-        self.groq_api_key = groq_api_key or os.getenv("GROQ_API_KEY")
-        if self.groq_api_key:
-            self.llm_client = groq.Client(api_key=self.groq_api_key)
-            logger.info("Advanced Page Analyzer initialized with Groq API key")
+    def __init__(self, groq_api_key=None, llm=None):
+        """
+        Initialize the analyzer with the LLM service
+        
+        Args:
+            groq_api_key: API key used if the shared LLM gateway is created here
+            llm: LLMGateway to use, the process-wide gateway by default
+        """
+        self.llm = llm or get_gateway(groq_api_key or os.getenv("GROQ_API_KEY"))
+        if self.llm.available:
+            logger.info("Advanced Page Analyzer initialized with the LLM gateway")
         else:
-            self.llm_client = None
             logger.warning("No Groq API key provided. Advanced analysis will be limited.")
     
     def analyze_with_llm(self, page_info):
@@ -33,77 +53,24 @@ class AdvancedPageAnalyzer:
         Returns:
             Dictionary with enhanced page analysis
         """
-        if not self.llm_client:
+        if not self.llm.available:
             logger.warning("LLM client not available. Using basic analysis only.")
             return self._fallback_analysis(page_info)
         
         try:
-            # Create a prompt for the LLM with the page structure information
-            system_prompt = """
-            You are a specialized web page analyzer that can identify and categorize content on websites.
-            Analyze the provided website content and identify the following elements:
-            
-            1. Products - with details about name, price, seller, ratings
-            2. Videos - with details about title, creator, duration
-            3. Music/Audio tracks - with details about title, artist, album
-            4. Articles/Blog posts - with title, author, date
-            5. Images - with description of what they show (from alt text)
-            6. Interactive elements - buttons, forms, etc.
-            
-            For each category, provide structured information in a conversational format that describes what's on the page.
-            If you detect a specific type of website (e-commerce, video platform, news site, etc.), mention that.
-            
-            Return your analysis in a JSON format with a 'description' field containing a conversational summary,
-            and a 'structured_data' field containing categorized elements.
-            """
-            
-            # Format the page_info as part of the user prompt
-            user_prompt = f"""
-            Website: {page_info['url']}
-            Title: {page_info['title']}
-            
-            Here's what I've detected so far:
-            
-            Products ({len(page_info['products'])}): 
-            {json.dumps(page_info['products'][:5], indent=2)}
-            
-            Videos ({len(page_info['videos'])}): 
-            {json.dumps(page_info['videos'][:5], indent=2)}
-            
-            Articles/Cards ({len(page_info['cards'])}): 
-            {json.dumps(page_info['cards'][:5], indent=2)}
-            
-            Music ({len(page_info['music'])}): 
-            {json.dumps(page_info['music'][:5], indent=2)}
-            
-            Images ({len(page_info['images'])}): 
-            {json.dumps(page_info['images'][:5], indent=2)}
-            
-            Links ({len(page_info['links'])}): 
-            {json.dumps(page_info['links'][:5], indent=2)}
-            
-            Based on this information, provide an enhanced analysis of what's on this page.
-            Add any insights about the type of website, what it's selling or offering, and the main content.
-            For e-commerce sites, describe the products in more detail.
-            For video platforms, identify the main themes of videos.
-            For music sites, describe the music collection.
-            For news/blog sites, summarize the article topics.
-            """
+            user_prompt = self._build_user_prompt(page_info)
             
             # Send request to LLM
-            response = self.llm_client.chat.completions.create(
-                model="llama3-70b-8192",  # Fast, economical model with good understanding
-                messages=[
-                    {"role": "system", "content": system_prompt},
+            result = self.llm.complete(
+                [
+                    {"role": "system", "content": PAGE_ANALYSIS_SYSTEM.text},
                     {"role": "user", "content": user_prompt}
                 ],
+                purpose="page analysis",
                 temperature=0.2,  # Low temperature for consistent results
                 max_tokens=1024,
             )
             
-            # Extract the response
-            result = response.choices[0].message.content.strip()
-            
             # Try to parse as JSON
             try:
                 # First try to extract JSON if it's embedded in text
@@ -125,6 +92,112 @@ class AdvancedPageAnalyzer:
             logger.error(f"Error during LLM page analysis: {str(e)}")
             return self._fallback_analysis(page_info)
     
+    def _build_user_prompt(self, page_info):
+        """Format the compacted page_info into the prebuilt user prompt template"""
+        compacted = compact_page_info(page_info, CATEGORY_ORDER, per_category=5, purpose="page analysis")
+        counts, items = compacted["counts"], compacted["items"]
+        return PAGE_ANALYSIS_USER.render(
+            url=page_info['url'],
+            title=page_info['title'],
+            product_count=counts['products'],
+            products=to_prompt_json(items['products']),
+            video_count=counts['videos'],
+            videos=to_prompt_json(items['videos']),
+            card_count=counts['cards'],
+            cards=to_prompt_json(items['cards']),
+            music_count=counts['music'],
+            music=to_prompt_json(items['music']),
+            image_count=counts['images'],
+            images=to_prompt_json(items['images']),
+            link_count=counts['links'],
+            links=to_prompt_json(items['links'])
+        )
+    
+    def stream_description(self, page_info, should_stop=None):
+        """
+        Stream a spoken description of the page from the LLM, one sentence at a time
+        
+        Args:
+            page_info: Dictionary containing parsed page elements and content
+            should_stop: Optional callable; when it returns True the stream is closed
+            
+        Yields:
+            Complete sentences as soon as the LLM has produced them
+        """
+        if not self.llm.available:
+            logger.warning("LLM client not available. Cannot stream page description.")
+            return
+        
+        stream = self.llm.stream(
+            [
+                {"role": "system", "content": PAGE_DESCRIPTION_STREAM_SYSTEM.text},
+                {"role": "user", "content": self._build_user_prompt(page_info)}
+            ],
+            purpose="page description",
+            temperature=0.2,
+            max_tokens=512,
+        )
+        
+        def deltas():
+            for delta in stream:
+                if should_stop and should_stop():
+                    return
+                yield delta
+        
+        try:
+            for sentence in iter_sentences(deltas()):
+                if should_stop and should_stop():
+                    logger.info("Page description stream cancelled")
+                    break
+                yield sentence
+        finally:
+            # Closing the stream drops the HTTP connection so the LLM stops generating
+            stream.close()
+    
+    def content_messages(self, page_info, content_type):
+        """Chat messages asking for a description of one content type of the page"""
+        key = CONTENT_KEYS[content_type]
+        compacted = compact_page_info(page_info, [key], per_category=10, purpose=f"{content_type} description")
+        return [
+            {"role": "system", "content": CONTENT_DESCRIPTION_SYSTEM[content_type].text},
+            {"role": "user", "content": CONTENT_DESCRIPTION_USER.render(
+                count=compacted["counts"][key],
+                content_type=content_type,
+                title=page_info['title'],
+                items=to_prompt_json(compacted["items"][key])
+            )}
+        ]
+    
+    def describe_content_types(self, page_info, content_types, should_stop=None):
+        """
+        Describe several content types of the page with one LLM request each, all in flight at once
+        
+        Args:
+            page_info: Dictionary containing parsed page elements and content
+            content_types: Content types to describe, keys of CONTENT_KEYS
+            should_stop: Optional callable; when it returns True the requests still running are cancelled
+            
+        Yields:
+            (content_type, description) as each description arrives; description is None if its request failed
+        """
+        if not self.llm.available:
+            logger.warning("LLM client not available. Cannot describe page content.")
+            return
+        
+        calls = {
+            content_type: {
+                "messages": self.content_messages(page_info, content_type),
+                "purpose": "content description",
+                "temperature": 0.2,
+                "max_tokens": 1024
+            }
+            for content_type in content_types
+        }
+        for content_type, description, error in self.llm.complete_concurrently(calls, should_stop=should_stop):
+            if error is not None:
+                logger.error(f"Error getting enhanced {content_type} description: {error}")
+            yield content_type, description
+    
     def _fallback_analysis(self, page_info):
         """Provide basic analysis without LLM"""
         # Determine website type
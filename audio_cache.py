@@ -0,0 +1,180 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+try:
+    import winsound
+except ImportError:  # winsound only exists on Windows
+    winsound = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Where rendered phrases are kept between runs
+CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")
+
+
+class WinsoundPlayer:
+    """Plays WAV data from memory with the Windows sound API"""
+
+    def play(self, data):
+        """Play WAV bytes, blocking until they finished or stop() was called"""
+        winsound.PlaySound(data, winsound.SND_MEMORY | winsound.SND_NODEFAULT)
+
+    def stop(self):
+        """Stop the sound that is playing, from any thread"""
+        winsound.PlaySound(None, 0)
+
+
+def default_player():
+    """Return a player for cached audio on this platform, or None if there is none"""
+    if winsound is not None:
+        return WinsoundPlayer()
+    return None
+
+
+class AudioCache:
+    """
+    Pre-rendered speech for phrases the assistant says over and over.
+
+    Each phrase is rendered to a WAV file once and keyed on its text plus the
+    voice and rate it was rendered with, so changing either renders it again.
+    Played phrases are kept in memory up to `max_memory_bytes` in LRU order;
+    on disk at most `max_files` phrases are kept, the least recently played
+    ones are deleted first.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_memory_bytes=32 * 1024 * 1024, max_files=500):
+        self.directory = directory
+        self.max_memory_bytes = max_memory_bytes
+        self.max_files = max_files
+        self.voice = None
+        self.rate = None
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def configure(self, voice, rate):
+        """Set the voice and rate of the engine that renders and is replaced by the cache"""
+        with self.lock:
+            if (voice, rate) != (self.voice, self.rate):
+                self.voice = voice
+                self.rate = rate
+                self.memory.clear()
+                self.memory_bytes = 0
+
+    def key(self, text):
+        payload = f"{self.voice}\0{self.rate}\0{text}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def path(self, text):
+        """File the phrase is rendered to"""
+        return os.path.join(self.directory, self.key(text) + ".wav")
+
+    def contains(self, text):
+        key = self.key(text)
+        return key in self.memory or os.path.exists(os.path.join(self.directory, key + ".wav"))
+
+    def get(self, text):
+        """
+        Look up the rendered audio of a phrase
+
+        Args:
+            text: The exact text that would be spoken
+
+        Returns:
+            WAV bytes, or None if the phrase has not been rendered
+        """
+        key = self.key(text)
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return data
+
+        path = os.path.join(self.directory, key + ".wav")
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # The modification time records the last play, for disk eviction
+            os.utime(path)
+        except OSError:
+            data = None
+        if not data:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.hits += 1
+            self._remember(key, data)
+        return data
+
+    def render(self, engine, text):
+        """
+        Render a phrase to disk with a pyttsx3 engine, unless it is already there
+
+        Must be called on the thread that owns the engine.
+
+        Returns:
+            True if the phrase is available afterwards
+        """
+        path = self.path(text)
+        if os.path.exists(path):
+            return True
+        os.makedirs(self.directory, exist_ok=True)
+        # Rendered under a temporary name, so an interrupted render never leaves a truncated clip
+        partial = path[:-len(".wav")] + ".part.wav"
+        try:
+            engine.save_to_file(text, partial)
+            engine.runAndWait()
+            if not os.path.getsize(partial):
+                raise OSError("engine wrote an empty file")
+            os.replace(partial, path)
+        except Exception as e:
+            logger.warning(f"Could not render '{text[:50]}': {e}")
+            if os.path.exists(partial):
+                os.remove(partial)
+            return False
+        self._evict_files()
+        return True
+
+    def _remember(self, key, data):
+        if len(data) > self.max_memory_bytes:
+            return
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key))
+        self.memory[key] = data
+        self.memory_bytes += len(data)
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    def _evict_files(self):
+        try:
+            files = [entry for entry in os.scandir(self.directory)
+                     if entry.name.endswith(".wav") and not entry.name.endswith(".part.wav")]
+        except OSError:
+            return
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in files[:len(files) - self.max_files]:
+            try:
+                os.remove(entry.path)
+            except OSError as e:
+                logger.warning(f"Could not remove cached audio {entry.name}: {e}")
+
+    def stats(self):
+        """Return hit/miss counters and the memory used by cached audio"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory_bytes,
+        }
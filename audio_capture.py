@@ -0,0 +1,270 @@
+import math
+import time
+import queue
+import logging
+import threading
+from array import array
+from collections import deque
+import speech_recognition as sr
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Signed PCM sample types by sample width in bytes
+SAMPLE_TYPES = {1: "b", 2: "h", 4: "i"}
+
+# The assistant's voice still reaches the microphone this long after playback ends (speaker buffers, room echo)
+ECHO_TAIL_SECONDS = 0.3
+
+
+def rms(chunk, sample_width):
+    """Root mean square energy of a chunk of signed little-endian PCM audio"""
+    samples = array(SAMPLE_TYPES[sample_width], chunk)
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(sample * sample for sample in samples) / len(samples))
+
+
+class UtteranceSegmenter:
+    """
+    Energy based voice activity detection over a continuous stream of chunks.
+
+    A chunk louder than the energy threshold starts an utterance, which ends
+    after `pause_seconds` of quieter audio or at `phrase_time_limit`. The last
+    `preroll_seconds` of audio are kept in a ring buffer and prepended, so the
+    first syllable is not cut off. While nobody speaks the threshold follows
+    the background noise, like the dynamic threshold of speech_recognition but
+    without ever stopping to calibrate.
+    """
+
+    def __init__(self, sample_rate, sample_width, chunk_size, energy_threshold=300, pause_seconds=0.6,
+                 phrase_time_limit=5, min_speech_seconds=0.15, preroll_seconds=0.3,
+                 dynamic_damping=0.15, dynamic_ratio=1.5, min_energy_threshold=50):
+        self.sample_width = sample_width
+        self.seconds_per_chunk = chunk_size / sample_rate
+        self.energy_threshold = energy_threshold
+        self.pause_chunks = math.ceil(pause_seconds / self.seconds_per_chunk)
+        self.max_chunks = math.ceil(phrase_time_limit / self.seconds_per_chunk)
+        self.min_speech_chunks = math.ceil(min_speech_seconds / self.seconds_per_chunk)
+        self.dynamic_damping = dynamic_damping
+        self.dynamic_ratio = dynamic_ratio
+        self.min_energy_threshold = min_energy_threshold
+        self.preroll = deque(maxlen=max(1, math.ceil(preroll_seconds / self.seconds_per_chunk)))
+        self.frames = []
+        self.speech_chunks = 0
+        self.silent_chunks = 0
+
+    @property
+    def in_utterance(self):
+        return bool(self.frames)
+
+    def calibrate(self, chunk):
+        """Adjust the threshold to one chunk of background noise"""
+        energy = rms(chunk, self.sample_width)
+        # Exponential moving average of the noise, scaled per second rather than per chunk
+        damping = self.dynamic_damping ** self.seconds_per_chunk
+        target = energy * self.dynamic_ratio
+        self.energy_threshold = max(self.min_energy_threshold,
+                                    self.energy_threshold * damping + target * (1 - damping))
+
+    def feed(self, chunk):
+        """
+        Process the next chunk of audio
+
+        Args:
+            chunk: Raw PCM bytes read from the microphone
+
+        Returns:
+            The raw audio of an utterance that just ended, otherwise None
+        """
+        loud = rms(chunk, self.sample_width) > self.energy_threshold
+
+        if not self.frames:
+            if not loud:
+                self.calibrate(chunk)
+                self.preroll.append(chunk)
+                return None
+            self.frames = list(self.preroll)
+            self.preroll.clear()
+            self.speech_chunks = 0
+            self.silent_chunks = 0
+
+        self.frames.append(chunk)
+        if loud:
+            self.speech_chunks += 1
+            self.silent_chunks = 0
+        else:
+            self.silent_chunks += 1
+
+        if self.silent_chunks < self.pause_chunks and len(self.frames) < self.max_chunks:
+            return None
+
+        frames = self.frames
+        speech_chunks = self.speech_chunks
+        self.frames = []
+        if speech_chunks < self.min_speech_chunks:
+            # A click or a cough, not speech
+            return None
+        return b"".join(frames)
+
+
+class AudioCapture:
+    """
+    Keeps one microphone stream open and queues the utterances spoken into it.
+
+    A background thread reads the stream continuously and segments it with an
+    UtteranceSegmenter, so there is no per-command stream setup or calibration
+    and speech that starts while the previous command is handled is not lost.
+    Utterances are handed over as speech_recognition AudioData through a
+    bounded queue; when nobody consumes them the oldest one is dropped.
+
+    Listeners such as the keyword spotter see the audio of each utterance
+    chunk by chunk while it is spoken, on the capture thread. They implement
+    open(sample_rate), start_utterance(chunks), feed(chunk) and
+    end_utterance(audio), where audio is None for a discarded utterance.
+
+    The microphone also hears the assistant's own voice. Every utterance gets
+    a `during_speech` attribute that is True when any of it was captured
+    while `is_speaking()` returned True (or within ECHO_TAIL_SECONDS after),
+    so consumers can ignore the assistant's feedback and read-aloud text.
+    """
+
+    def __init__(self, source_factory=None, max_queued=4, calibration_seconds=0.5, is_speaking=None,
+                 **segmenter_options):
+        self.source_factory = source_factory or sr.Microphone
+        self.calibration_seconds = calibration_seconds
+        self.is_speaking = is_speaking
+        self.last_speaking = None
+        self.overlaps_speech = False
+        self.segmenter_options = segmenter_options
+        self.utterances = queue.Queue(maxsize=max_queued)
+        self.segmenter = None
+        self.running = threading.Event()
+        self.ready = threading.Event()
+        self.thread = None
+        self.listeners = []
+        self.sample_rate = None
+        self.dropped = 0
+        self.error = None
+
+    def start(self):
+        """Open the microphone and start capturing; returns once the noise level is calibrated"""
+        if self.thread and self.thread.is_alive():
+            return
+        self.running.set()
+        self.ready.clear()
+        self.thread = threading.Thread(target=self._run, name="AudioCapture", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def stop(self, timeout=None):
+        """Stop capturing and close the microphone"""
+        self.running.clear()
+        if self.thread:
+            self.thread.join(timeout)
+
+    def add_listener(self, listener):
+        """Let a listener follow the utterances as they are spoken"""
+        if self.sample_rate is not None:
+            listener.open(self.sample_rate)
+        self.listeners.append(listener)
+
+    def get_utterance(self, timeout=None):
+        """
+        Wait for the next utterance
+
+        Args:
+            timeout: Seconds to wait, or None to wait forever
+
+        Returns:
+            speech_recognition AudioData, or None if nothing was said in time
+        """
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def clear(self):
+        """Drop utterances that were captured but not consumed yet"""
+        while True:
+            try:
+                self.utterances.get_nowait()
+            except queue.Empty:
+                return
+
+    def _put(self, audio):
+        while True:
+            try:
+                self.utterances.put_nowait(audio)
+                return
+            except queue.Full:
+                try:
+                    self.utterances.get_nowait()
+                    self.dropped += 1
+                    logger.warning("Dropping an unprocessed utterance")
+                except queue.Empty:
+                    pass
+
+    def _assistant_speaking(self):
+        if self.is_speaking is None:
+            return False
+        now = time.monotonic()
+        try:
+            if self.is_speaking():
+                self.last_speaking = now
+        except Exception as e:
+            logger.debug(f"Could not tell whether the assistant is speaking: {e}")
+        return self.last_speaking is not None and now - self.last_speaking <= ECHO_TAIL_SECONDS
+
+    def _notify(self, was_speaking, chunk, audio):
+        for listener in list(self.listeners):
+            try:
+                if self.segmenter.in_utterance and not was_speaking:
+                    # The utterance starts with the pre-roll ring buffer
+                    listener.start_utterance(list(self.segmenter.frames))
+                elif self.segmenter.in_utterance:
+                    listener.feed(chunk)
+                elif was_speaking:
+                    listener.feed(chunk)
+                    listener.end_utterance(audio)
+            except Exception as e:
+                logger.error(f"Audio listener {type(listener).__name__} failed: {e}")
+
+    def _run(self):
+        try:
+            with self.source_factory() as source:
+                self.segmenter = UtteranceSegmenter(source.SAMPLE_RATE, source.SAMPLE_WIDTH, source.CHUNK,
+                                                    **self.segmenter_options)
+                # One short calibration when the stream opens; afterwards the threshold adapts while idle
+                for _ in range(max(1, math.ceil(self.calibration_seconds * source.SAMPLE_RATE / source.CHUNK))):
+                    self.segmenter.calibrate(source.stream.read(source.CHUNK))
+                self.sample_rate = source.SAMPLE_RATE
+                for listener in list(self.listeners):
+                    listener.open(source.SAMPLE_RATE)
+                logger.info(f"Audio capture started, energy threshold {self.segmenter.energy_threshold:.0f}")
+                self.ready.set()
+
+                while self.running.is_set():
+                    chunk = source.stream.read(source.CHUNK)
+                    if not chunk:
+                        break
+                    was_speaking = self.segmenter.in_utterance
+                    assistant_speaking = self._assistant_speaking()
+                    frames = self.segmenter.feed(chunk)
+                    if self.segmenter.in_utterance and not was_speaking:
+                        self.overlaps_speech = assistant_speaking
+                    elif was_speaking:
+                        self.overlaps_speech = self.overlaps_speech or assistant_speaking
+                    audio = None
+                    if frames is not None:
+                        audio = sr.AudioData(frames, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                        audio.during_speech = self.overlaps_speech
+                    self._notify(was_speaking, chunk, audio)
+                    if audio is not None:
+                        self._put(audio)
+        except Exception as e:
+            self.error = e
+            logger.error(f"Audio capture stopped: {e}")
+        finally:
+            self.running.clear()
+            self.ready.set()
@@ -0,0 +1,258 @@
+"""
+Micro-benchmark for the precompiled command router.
+
+Replays the recorded command corpus through the original linear if/elif cascade
+from process_command and through CommandRouter, checks that both pick the same
+handler with the same parameters, and reports the routing latency of each.
+
+Usage:
+    python benchmark_command_router.py [corpus_file] [repeats]
+"""
+import os
+import re
+import sys
+import time
+import logging
+from favorites_manager import FavoritesManager, DEFAULT_CATEGORIES
+from command_router import CommandRouter
+
+# Keyword tables as defined in voice_browser_control (copied so the benchmark
+# does not need selenium, pyttsx3 or speech_recognition to be installed)
+INTENT_KEYWORDS = {
+    "watch_video": ["watch", "video", "youtube", "videos", "film", "stream", "streaming", "watch video"],
+    "shopping": ["shop", "buy", "purchase", "shopping", "amazon", "order", "cart"],
+    "social_media": ["social", "facebook", "twitter", "instagram", "post", "friend", "connect", "social media"],
+    "search": ["search", "find", "google", "look up", "lookup", "query"],
+    "news": ["news", "headlines", "current events", "world news", "breaking news"],
+    "mail": ["mail", "email", "gmail", "message", "inbox"],
+    "movies": ["movie", "movies", "netflix", "film", "cinema", "watch movie"],
+    "music": ["music", "song", "listen", "spotify", "playlist", "album", "artist"]
+}
+
+MOOD_KEYWORDS = {
+    "videos": ["in the mood for watching", "want to watch", "feel like watching"],
+    "shopping": ["in the mood for shopping", "want to shop", "feel like shopping"],
+    "social": ["check social media", "see what friends are doing"],
+    "movies": ["in the mood for a movie", "want to watch a film", "feel like a movie"],
+    "music": ["in the mood for music", "want to listen", "feel like listening"]
+}
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "recorded_commands.txt")
+
+
+class InMemoryFavoritesManager(FavoritesManager):
+    """Favorites manager that never touches browser_favorites.json"""
+
+    def load_favorites(self):
+        self.favorites = dict(DEFAULT_CATEGORIES)
+
+    def save_favorites(self):
+        pass
+
+
+def legacy_analyze_intent(fm, text):
+    """The original VoiceBrowserControl.analyze_intent"""
+    if fm.is_setting_favorite_command(text):
+        return None
+    words = text.lower().split()
+    for category in fm.favorites.keys():
+        if category in words:
+            return category
+    categories = {"watch_video": "videos", "shopping": "shopping", "social_media": "social", "search": "search",
+                  "news": "news", "mail": "mail", "movies": "movies", "music": "music"}
+    for intent, keywords in INTENT_KEYWORDS.items():
+        for keyword in keywords:
+            if keyword in text.lower():
+                return categories[intent]
+    for category, phrases in MOOD_KEYWORDS.items():
+        for phrase in phrases:
+            if phrase in text.lower():
+                return category
+    return None
+
+
+def legacy_route(fm, command):
+    """The original fallback cascade of process_command, returning (handler, params) instead of acting"""
+    if any(phrase in command for phrase in [
+        "read page", "read this page", "read aloud", "read the page",
+        "read to me", "read this to me", "read this", "read the article",
+        "read this article", "start reading"
+    ]):
+        return ("read_aloud", {})
+
+    youtube_search_patterns = [
+        r"(?:search|find|look for)(?:.+?)(?:on|in|at)(?:.+?)youtube(?:.+?)(?:for\s+)(.+)",
+        r"youtube(?:.+?)(?:search|find|look for)(?:.+?)(?:for\s+)(.+)",
+        r"(?:search|find|look for)(?:.+?)youtube(?:\s+for\s+)(.+)"
+    ]
+    for pattern in youtube_search_patterns:
+        match = re.search(pattern, command, re.IGNORECASE)
+        if match:
+            search_query = match.group(1).strip()
+            if search_query:
+                return ("youtube_search", {"query": search_query})
+
+    video_number_pattern = r"(?:tell me about|what's|describe|play|show|start)(?:.+?)(?:video|) (?:number |#)?(first|second|third|fourth|fifth|1st|2nd|3rd|4th|5th|[1-9])"
+    match = re.search(video_number_pattern, command, re.IGNORECASE)
+    if match:
+        position_text = match.group(1).lower()
+        position = 1
+        if position_text in ["first", "1st", "1"]:
+            position = 1
+        elif position_text in ["second", "2nd", "2"]:
+            position = 2
+        elif position_text in ["third", "3rd", "3"]:
+            position = 3
+        elif position_text in ["fourth", "4th", "4"]:
+            position = 4
+        elif position_text in ["fifth", "5th", "5"]:
+            position = 5
+        elif position_text.isdigit():
+            position = int(position_text)
+        action = None
+        if any(action in command.lower() for action in ["tell me about", "what's", "describe"]):
+            action = "describe"
+        elif any(action in command.lower() for action in ["play", "show", "start"]):
+            action = "play"
+        return ("video_number", {"position": position, "action": action})
+
+    if any(phrase in command.lower() for phrase in ["list videos", "show videos", "what videos", "summarize videos", "summarize results"]):
+        return ("list_videos", {})
+
+    if fm.is_setting_favorite_command(command):
+        category, website = fm.extract_favorite_settings(command)
+        if category and website:
+            return ("set_favorite", {"category": category, "website": website})
+
+    if fm.is_open_category_command(command):
+        category = fm.extract_category(command)
+        if category:
+            website = fm.get_favorite(category)
+            if website:
+                return ("open_category", {"category": category, "website": website})
+
+    if fm.is_listing_favorites_command(command):
+        return ("list_favorites", {})
+
+    if "open" in command or "go to" in command:
+        website = None
+        if "open" in command:
+            match = re.search(r'open\s+(.*?)(?:\s+in browser|\s+website|\s+site|\s*$)', command)
+            if match:
+                website = match.group(1)
+        elif "go to" in command:
+            match = re.search(r'go to\s+(.*?)(?:\s+website|\s+site|\s*$)', command)
+            if match:
+                website = match.group(1)
+        if website:
+            return ("open_website", {"website": website})
+
+    if "scroll" in command:
+        if "down" in command:
+            return ("scroll", {"direction": "down"})
+        elif "up" in command:
+            return ("scroll", {"direction": "up"})
+        return ("scroll", {"direction": None})
+
+    if "click" in command:
+        return ("click", {"element": command.replace("click", "").strip()})
+
+    if "back" in command or "previous page" in command:
+        return ("back", {})
+
+    if "forward" in command or "next page" in command:
+        return ("forward", {})
+
+    if "search for" in command:
+        return ("search_for", {"query": command.replace("search for", "").strip()})
+
+    if "refresh" in command or "reload" in command:
+        return ("refresh", {})
+
+    if "close browser" in command or "exit" in command:
+        return ("close_browser", {})
+
+    if any(phrase in command for phrase in [
+        "what's on this page", "what is on this page", "describe this page",
+        "tell me about this page", "what's on the page", "what can you see",
+        "describe what you see", "analyze this page", "page content"
+    ]):
+        return ("describe_page", {})
+
+    content_patterns = [
+        (r"(?:tell|describe|what|list)(?:.+?)products", "products"),
+        (r"(?:tell|describe|what|list)(?:.+?)videos", "videos"),
+        (r"(?:tell|describe|what|list)(?:.+?)images", "images"),
+        (r"(?:tell|describe|what|list)(?:.+?)pictures", "images"),
+        (r"(?:tell|describe|what|list)(?:.+?)music", "music"),
+        (r"(?:tell|describe|what|list)(?:.+?)songs", "music"),
+        (r"(?:tell|describe|what|list)(?:.+?)tracks", "music"),
+        (r"(?:tell|describe|what|list)(?:.+?)articles", "articles"),
+        (r"(?:tell|describe|what|list)(?:.+?)posts", "articles")
+    ]
+    for pattern, content_type in content_patterns:
+        if re.search(pattern, command, re.IGNORECASE):
+            return ("describe_content", {"content_type": content_type})
+
+    if any(phrase in command for phrase in ["help", "how to use", "instructions", "what can i say", "available commands"]):
+        return ("help", {})
+
+    category = legacy_analyze_intent(fm, command)
+    if category:
+        website = fm.get_favorite(category)
+        if website:
+            return ("open_intent", {"category": category, "website": website})
+    return None
+
+
+def load_corpus(path):
+    """Load recorded command transcripts, skipping blank lines and comments"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def time_per_command(func, commands, repeats):
+    """Return the mean time per command in microseconds"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for command in commands:
+            func(command)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeats * len(commands)) * 1e6
+
+
+def main():
+    logging.disable(logging.INFO)
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_CORPUS
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    commands = load_corpus(corpus_path)
+    fm = InMemoryFavoritesManager()
+
+    start = time.perf_counter()
+    router = CommandRouter(fm, INTENT_KEYWORDS, MOOD_KEYWORDS)
+    compile_ms = (time.perf_counter() - start) * 1000
+
+    mismatches = 0
+    for command in commands:
+        expected = legacy_route(fm, command)
+        match = router.route(command)
+        actual = (match.name, match.params) if match else None
+        if expected != actual:
+            mismatches += 1
+            print(f"MISMATCH {command!r}: legacy={expected} router={actual}")
+
+    legacy_us = time_per_command(lambda c: legacy_route(fm, c), commands, repeats)
+    router_us = time_per_command(router.route, commands, repeats)
+
+    print(f"Corpus: {len(commands)} commands from {corpus_path}")
+    print(f"Router compile time: {compile_ms:.2f} ms ({len(router.matcher.phrases)} phrases)")
+    print(f"Legacy cascade: {legacy_us:8.2f} us/command")
+    print(f"Command router: {router_us:8.2f} us/command")
+    print(f"Speedup: {legacy_us / router_us:.2f}x")
+    print(f"Mismatches: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
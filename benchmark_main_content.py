@@ -0,0 +1,55 @@
+"""
+Measures how much main-content detection cuts from what gets spoken and sent to the LLM.
+
+For every saved HTML fixture page, compares the text read_page_aloud used to
+speak (every visible line with more than three words) with the scored main
+content, in words, estimated LLM tokens and estimated speaking time.
+
+Usage:
+    python benchmark_main_content.py [fixture_dir]
+"""
+import os
+import sys
+import logging
+from bs4 import BeautifulSoup
+from page_snapshot import HTML_PARSER, visible_text
+from page_reader import main_content_text
+from prompt_registry import estimate_tokens
+from benchmark_page_structure import DEFAULT_FIXTURES, load_fixtures
+
+# Typical text-to-speech speaking rate
+WORDS_PER_MINUTE = 170
+
+
+def legacy_spoken_text(soup):
+    """The text the original read_page_aloud spoke: all visible lines with more than three words"""
+    return "\n".join(line for line in visible_text(soup).split("\n") if len(line.split()) > 3)
+
+
+def measure(text):
+    """Return (words, estimated tokens, estimated speaking seconds) for a text"""
+    words = len(text.split())
+    return words, estimate_tokens(text), words / WORDS_PER_MINUTE * 60
+
+
+def main():
+    logging.disable(logging.INFO)
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_FIXTURES
+
+    print(f"{'page':14} {'words':>13} {'tokens':>13} {'speech (s)':>15}  reduction")
+    totals = [0, 0]
+    for name, html in load_fixtures(fixture_dir):
+        soup = BeautifulSoup(html, HTML_PARSER)
+        before = measure(legacy_spoken_text(soup))
+        after = measure(main_content_text(soup))
+        totals[0] += before[1]
+        totals[1] += after[1]
+        reduction = 1 - after[1] / before[1] if before[1] else 0.0
+        print(f"{name:14} {before[0]:6d} > {after[0]:5d} {before[1]:6d} > {after[1]:5d} "
+              f"{before[2]:7.0f} > {after[2]:6.0f}  {reduction:8.0%}")
+    print(f"Total tokens: {totals[0]} > {totals[1]} ({1 - totals[1] / totals[0]:.0%} less)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
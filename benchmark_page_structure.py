@@ -0,0 +1,210 @@
+"""
+Micro-benchmark for the single-pass page structure extractor.
+
+Parses the saved HTML fixture pages once and runs both the original
+select/select_one extraction from analyze_page_structure and
+page_structure.extract_page_structure over the same tree, checks that both
+return identical page_info dictionaries, and reports the time of each.
+
+With --browser, also loads every fixture in headless Chrome and compares the
+in-browser JavaScript extractor against fetching page_source and parsing it
+in Python, end to end over the WebDriver wire.
+
+Usage:
+    python benchmark_page_structure.py [--browser] [fixture_dir] [repeats]
+"""
+import os
+import sys
+import glob
+import time
+import logging
+from bs4 import BeautifulSoup
+from page_snapshot import HTML_PARSER
+from page_structure import extract_page_structure, _text
+
+DEFAULT_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+
+def legacy_extract_page_structure(soup, url):
+    """The original VoiceBrowserControl.analyze_page_structure, on an already parsed page"""
+    # Container for all the extracted information
+    page_info = {
+        "title": soup.title.string if soup.title else "No title found",
+        "url": url,
+        "products": [],
+        "videos": [],
+        "articles": [],
+        "cards": [],
+        "music": [],
+        "images": [],
+        "links": []
+    }
+    
+    # Extract product information (common in e-commerce sites)
+    product_elements = soup.select('.product, [class*=product], [id*=product], .item, [data-component*=product]')
+    for product in product_elements[:10]:  # Limit to 10 products for manageability
+        product_info = {
+            "name": _text(product.select_one('.product-title, .name, h2, h3, [class*=title]')),
+            "price": _text(product.select_one('.price, [class*=price]')),
+            "seller": _text(product.select_one('.seller, .vendor, [class*=seller], [class*=vendor]')),
+            "rating": _text(product.select_one('.rating, [class*=rating], .stars')),
+            "description": _text(product.select_one('.description, [class*=description]'))
+        }
+        if any(product_info.values()):
+            page_info["products"].append(product_info)
+    
+    # Extract video information
+    video_elements = soup.select('video, [class*=video], [id*=video], iframe[src*=youtube], iframe[src*=vimeo]')
+    for video in video_elements[:10]:
+        video_info = {
+            "title": video.get('title') or video.get('alt') or video.get('aria-label') or 
+                     _text(video.find_previous(['h1', 'h2', 'h3', 'h4', '.title', '[class*=title]'])),
+            "creator": _text(video.find_previous('[class*=creator], [class*=author], [class*=channel]')),
+            "duration": video.get('duration') or _text(video.select_one('[class*=duration], [class*=length], [class*=time]')),
+            "src": video.get('src') or (video.select_one('source').get('src') if video.select_one('source') else None)
+        }
+        if any(video_info.values()):
+            page_info["videos"].append(video_info)
+    
+    # Extract article/content card information
+    card_elements = soup.select('article, .card, [class*=card], .post, [class*=post], .item, [class*=item]')
+    for card in card_elements[:10]:
+        card_info = {
+            "title": _text(card.select_one('h1, h2, h3, h4, .title, [class*=title], [class*=heading]')),
+            "author": _text(card.select_one('.author, [class*=author], [class*=byline]')),
+            "date": _text(card.select_one('.date, [class*=date], [class*=time], time')),
+            "summary": _text(card.select_one('p, .summary, [class*=summary], [class*=excerpt]'))
+        }
+        if any(card_info.values()):
+            page_info["cards"].append(card_info)
+    
+    # Extract music information
+    music_elements = soup.select('audio, [class*=track], [class*=song], [class*=music], [class*=playlist]')
+    for music in music_elements[:10]:
+        music_info = {
+            "title": _text(music.select_one('[class*=title], .name, [class*=name]')) or music.get('title') or music.get('aria-label'),
+            "artist": _text(music.select_one('[class*=artist], .artist, [class*=singer], .singer')),
+            "album": _text(music.select_one('[class*=album]')),
+            "duration": _text(music.select_one('[class*=duration], [class*=length], [class*=time]'))
+        }
+        if any(music_info.values()):
+            page_info["music"].append(music_info)
+    
+    # Extract image information (focus on meaningful images, not icons)
+    img_elements = soup.select('img[alt]:not([width="16"]):not([width="24"]):not([width="32"]):not([height="16"]):not([height="24"]):not([height="32"])')
+    for img in img_elements[:15]:
+        if img.get('alt') and img.get('alt').strip():
+            img_info = {
+                "alt": img.get('alt'),
+                "src": img.get('src')
+            }
+            page_info["images"].append(img_info)
+    
+    # Extract main links
+    links = soup.select('a[href]:not([href^="#"]):not([href=""]) h1, a[href]:not([href^="#"]):not([href=""]) h2, a[href]:not([href^="#"]):not([href=""]) h3, a.main-link, a.primary-link')
+    for link in links[:10]:
+        link_info = {
+            "text": link.get_text(strip=True),
+            "href": link.get('href')
+        }
+        if link_info["text"]:
+            page_info["links"].append(link_info)
+    
+    return page_info
+
+
+def load_fixtures(fixture_dir):
+    """Load the saved HTML pages as (name, html) pairs"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+        with open(path, "r", encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def time_per_page(func, soup, url, repeats):
+    """Return the mean time per extraction in milliseconds"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func(soup, url)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def compare_browser_backend(fixture_dir, repeats):
+    """Compare both VoiceBrowserControl backends on the fixture pages in headless Chrome"""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from page_structure_js import extract_page_structure_in_browser
+
+    def python_backend(driver):
+        soup = BeautifulSoup(driver.page_source, HTML_PARSER)
+        return extract_page_structure(soup, driver.current_url)
+
+    chrome_options = Options()
+    chrome_options.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=chrome_options)
+    mismatches = 0
+    try:
+        for path in sorted(glob.glob(os.path.join(fixture_dir, "*.html"))):
+            name = os.path.basename(path)
+            driver.get("file://" + os.path.abspath(path))
+            expected = python_backend(driver)
+            actual = extract_page_structure_in_browser(driver)
+            if expected != actual:
+                mismatches += 1
+                for key in expected:
+                    if expected[key] != actual[key]:
+                        print(f"MISMATCH {name} [{key}]: python={expected[key]} browser={actual[key]}")
+
+            timings = []
+            for backend in (python_backend, extract_page_structure_in_browser):
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    backend(driver)
+                timings.append((time.perf_counter() - start) / repeats * 1000)
+            print(f"{name:14} page_source + parse {timings[0]:8.2f} ms  in-browser {timings[1]:8.2f} ms  "
+                  f"speedup {timings[0] / timings[1]:5.2f}x")
+    finally:
+        driver.quit()
+    print(f"Browser backend mismatches: {mismatches}")
+    return mismatches
+
+
+def main():
+    logging.disable(logging.INFO)
+    args = [arg for arg in sys.argv[1:] if arg != "--browser"]
+    fixture_dir = args[0] if len(args) > 0 else DEFAULT_FIXTURES
+    repeats = int(args[1]) if len(args) > 1 else 20
+
+    mismatches = 0
+    legacy_total = walker_total = 0.0
+    print(f"Parser: {HTML_PARSER}")
+    for name, html in load_fixtures(fixture_dir):
+        url = f"file://{name}"
+        soup = BeautifulSoup(html, HTML_PARSER)
+
+        expected = legacy_extract_page_structure(soup, url)
+        actual = extract_page_structure(soup, url)
+        if expected != actual:
+            mismatches += 1
+            for key in expected:
+                if expected[key] != actual[key]:
+                    print(f"MISMATCH {name} [{key}]: legacy={expected[key]} walker={actual[key]}")
+
+        legacy_ms = time_per_page(legacy_extract_page_structure, soup, url, repeats)
+        walker_ms = time_per_page(extract_page_structure, soup, url, repeats)
+        legacy_total += legacy_ms
+        walker_total += walker_ms
+        print(f"{name:14} {len(html) // 1024:5d} KB  legacy {legacy_ms:8.2f} ms  walker {walker_ms:8.2f} ms  "
+              f"speedup {legacy_ms / walker_ms:5.2f}x")
+
+    print(f"Total: legacy {legacy_total:.2f} ms, walker {walker_total:.2f} ms, speedup {legacy_total / walker_total:.2f}x")
+    print(f"Mismatches: {mismatches}")
+
+    if "--browser" in sys.argv[1:]:
+        mismatches += compare_browser_backend(fixture_dir, repeats)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,35 +3,59 @@ import time
 import threading
 import json
 import speech_recognition as sr
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 from voice_browser_control import VoiceBrowserControl
+from driver_provider import create_chrome
+from panel_bridge import PanelEventBridge
+from page_waits import PageWaiter, enable_network_log
+
+# Used when the event bridge cannot start: events are left in localStorage for poll_js_callbacks
+LOCAL_STORAGE_POST_SCRIPT = """
+window.postPanelEvent = function(event) {
+    if (event.type === 'voice-command') {
+        localStorage.setItem('voiceCommandRequested', 'true');
+    } else if (event.type === 'execute-command') {
+        localStorage.setItem('pendingCommand', event.command);
+    }
+};
+"""
 
 class BrowserPanel:
     def __init__(self):
         # Initialize the voice recognizer
         self.recognizer = sr.Recognizer()
         
+        # Thread for handling voice recognition
+        self.voice_thread = None
+        self.listening = False
+        
+        # The panel pushes its events to a local endpoint as they happen, so nothing is polled while idle
+        try:
+            self.bridge = PanelEventBridge({
+                "execute-command": lambda event: self.process_command(event.get("command", "")),
+                "voice-command": lambda event: self.start_voice_recognition()
+            })
+            self.bridge.start()
+        except OSError as e:
+            print(f"Could not start the panel event bridge, falling back to polling: {e}")
+            self.bridge = None
+        
         # Start the browser with custom panel
         self.start_browser()
         
         # Initialize controller
         self.browser_controller = VoiceBrowserControl(self.driver)
         
-        # Thread for handling voice recognition
-        self.voice_thread = None
-        self.listening = False
-        
-        # Start polling thread for JS callbacks
-        self.polling_thread = threading.Thread(target=self.poll_js_callbacks)
-        self.polling_thread.daemon = True
-        self.polling_thread.start()
+        # Without the bridge, poll localStorage for JS callbacks
+        self.polling_thread = None
+        if self.bridge is None:
+            self.polling_thread = threading.Thread(target=self.poll_js_callbacks)
+            self.polling_thread.daemon = True
+            self.polling_thread.start()
         
     def start_browser(self):
         """Initialize browser with custom UI panel"""
@@ -46,23 +70,25 @@ class BrowserPanel:
             "homepage_is_newtabpage": False,
             "browser.startup_page": 1  # Open homepage on startup
         })
+        enable_network_log(chrome_options)
         
         # Create a custom Chrome profile to allow JavaScript modifications
-        self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+        self.driver = create_chrome(chrome_options)
+        waits = PageWaiter(self.driver)
         
         # Open Google as initial page
         google_search_url = "https://www.google.com/search"
         self.driver.get(google_search_url)
         
         # Verify we're on the search page and not a doodle page
-        time.sleep(1)  # Give the page a moment to load
+        waits.ready("Start page", replaces=1)
         current_url = self.driver.current_url
         if "google.com/doodles" in current_url or not "/search" in current_url:
             # We got redirected to a doodle page, force navigation back to search
             self.driver.get(google_search_url)
         
         # Wait for page to fully load
-        time.sleep(2)
+        waits.ready("Start page load", replaces=2, network_idle=True)
         
         # Once page is loaded, inject our panel
         self.inject_panel()
@@ -374,11 +400,11 @@ class BrowserPanel:
                         }
                     }
                 } else if (event.data === 'voice-command') {
-                    // Store in localStorage for python to detect
-                    localStorage.setItem('voiceCommandRequested', 'true');
+                    // Tell python to start listening
+                    window.postPanelEvent({type: 'voice-command'});
                 } else if (event.data && event.data.type === 'execute-command') {
-                    // Store command in localStorage for python to retrieve
-                    localStorage.setItem('pendingCommand', event.data.command);
+                    // Send the command to python
+                    window.postPanelEvent({type: 'execute-command', command: event.data.command});
                 }
             });
             
@@ -393,7 +419,8 @@ class BrowserPanel:
                 }
             };
             """
-            self.driver.execute_script(parent_js)
+            post_script = self.bridge.post_script() if self.bridge else LOCAL_STORAGE_POST_SCRIPT
+            self.driver.execute_script(post_script + parent_js)
             
             # Create a maximize button for minimized state
             maximize_js = """
@@ -499,7 +526,7 @@ class BrowserPanel:
             self.listening = False
     
     def poll_js_callbacks(self):
-        """Poll for JavaScript callbacks from the UI"""
+        """Poll for JavaScript callbacks from the UI; only used when the event bridge is unavailable"""
         while True:
             try:
                 # Check for pending command
@@ -543,6 +570,8 @@ class BrowserPanel:
         except KeyboardInterrupt:
             print("Closing browser...")
         finally:
+            if self.bridge:
+                self.bridge.stop()
             try:
                 self.driver.quit()
             except:
@@ -0,0 +1,274 @@
+import re
+import json
+import time
+import logging
+from difflib import SequenceMatcher
+from selenium.webdriver.common.by import By
+from page_snapshot import DOM_FINGERPRINT_SCRIPT
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Attribute holding the handle the index refers to an element by
+HANDLE_ATTRIBUTE = "data-phonicflow-click"
+
+# Matches scoring lower than this are not clicked
+MIN_SCORE = 0.6
+
+# A query word counts as found when it is at least this similar to a word of the element
+WORD_SIMILARITY = 0.9
+
+# The best match must beat the best differently named element by this much, otherwise nothing is clicked
+AMBIGUITY_MARGIN = 0.1
+
+# Most elements the text fallback returns for matching
+MAX_TEXT_MATCHES = 50
+
+# Longest text kept per element; link and button labels are much shorter
+MAX_TEXT_LENGTH = 200
+
+# Attributes that show or hide elements without changing the DOM structure,
+# e.g. a menu opened by toggling a class
+VISIBILITY_ATTRIBUTES = ["class", "style", "hidden", "aria-hidden", "open"]
+
+# Lists every visible clickable element with its text, label and box, tagging
+# each one with a handle. Takes the fingerprint of the last index and returns
+# no elements while the DOM is unchanged, so a cached index costs one round
+# trip. The DOM fingerprint ignores the attributes that only change what is
+# visible, so a second observer counts changes to those; the handle attribute
+# is watched by neither.
+CLICKABLE_INDEX_SCRIPT = """
+var known = arguments[0];
+var visibility = window.__phonicflowVisibility;
+if (!visibility) {
+    visibility = window.__phonicflowVisibility = {changes: 0};
+    try {
+        new MutationObserver(function(records) {
+            visibility.changes += records.length;
+        }).observe(document.documentElement, {subtree: true, attributes: true, attributeFilter: """ + json.dumps(VISIBILITY_ATTRIBUTES) + """});
+    } catch (e) {
+        visibility.observer_error = String(e);
+    }
+}
+var fingerprint = (function() {
+""" + DOM_FINGERPRINT_SCRIPT + """
+})();
+// Without the observer visibility changes go unnoticed, so the index is never reused
+fingerprint = visibility.observer_error ? null : fingerprint + ':' + visibility.changes;
+if (known && fingerprint === known) {
+    return {fingerprint: fingerprint, elements: null};
+}
+var nodes = document.querySelectorAll(
+    'a[href], button, summary, label, select, [role="button"], [role="link"], [role="checkbox"], [role="tab"], ' +
+    '[role="menuitem"], [role="option"], [role="switch"], input[type="button"], input[type="submit"], ' +
+    'input[type="checkbox"], input[type="radio"], [onclick]');
+var next = window.__phonicflowClickId || 0;
+var elements = [];
+for (var i = 0; i < nodes.length; i++) {
+    var el = nodes[i];
+    var box = el.getBoundingClientRect();
+    if (box.width === 0 || box.height === 0) continue;
+    var handle = el.getAttribute('%(attribute)s');
+    if (!handle) {
+        handle = String(++next);
+        el.setAttribute('%(attribute)s', handle);
+    }
+    var checkable = el.type === 'checkbox' || el.type === 'radio';
+    elements.push({
+        handle: handle,
+        tag: el.tagName.toLowerCase(),
+        text: (el.innerText || (checkable ? '' : el.value) || '').replace(/\\s+/g, ' ').trim().slice(0, %(max_text)d),
+        label: el.getAttribute('aria-label') || el.getAttribute('title') ||
+            (el.labels && el.labels.length ? el.labels[0].innerText : '') || '',
+        box: [Math.round(box.left + window.scrollX), Math.round(box.top + window.scrollY),
+              Math.round(box.width), Math.round(box.height)]
+    });
+}
+window.__phonicflowClickId = next;
+return {fingerprint: fingerprint, elements: elements};
+""" % {"attribute": HANDLE_ATTRIBUTE, "max_text": MAX_TEXT_LENGTH}
+
+# Fallback for elements the index cannot recognize as clickable, such as divs
+# and spans with JavaScript click listeners: visible elements whose own text
+# contains every query word, tagged with a handle like the indexed ones.
+TEXT_MATCH_SCRIPT = """
+var words = arguments[0];
+var matches = document.evaluate('//body//*[not(self::script or self::style)][text()[normalize-space()]]',
+    document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var next = window.__phonicflowClickId || 0;
+var elements = [];
+for (var i = 0; i < matches.snapshotLength && elements.length < %(max_matches)d; i++) {
+    var el = matches.snapshotItem(i);
+    var text = '';
+    for (var child = el.firstChild; child; child = child.nextSibling) {
+        if (child.nodeType === 3) text += ' ' + child.nodeValue;
+    }
+    text = text.replace(/\\s+/g, ' ').trim();
+    var lower = text.toLowerCase();
+    if (!words.every(function(word) { return lower.indexOf(word) !== -1; })) continue;
+    var box = el.getBoundingClientRect();
+    if (box.width === 0 || box.height === 0) continue;
+    var handle = el.getAttribute('%(attribute)s');
+    if (!handle) {
+        handle = String(++next);
+        el.setAttribute('%(attribute)s', handle);
+    }
+    elements.push({handle: handle, tag: el.tagName.toLowerCase(), text: text.slice(0, %(max_text)d), label: ''});
+}
+window.__phonicflowClickId = next;
+return elements;
+""" % {"attribute": HANDLE_ATTRIBUTE, "max_text": MAX_TEXT_LENGTH, "max_matches": MAX_TEXT_MATCHES}
+
+
+def normalize(text):
+    """Lowercase text with punctuation removed and whitespace collapsed"""
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def _word_found(word, text_words):
+    return word in text_words or any(SequenceMatcher(None, word, text_word).ratio() >= WORD_SIMILARITY
+                                     for text_word in text_words)
+
+
+def match_score(query, text):
+    """
+    How well a spoken element name matches the text of an element, from 0 to 1
+
+    Every query word must be found in the text, exactly or as a near-identical
+    spelling, otherwise the score is 0: "sign up" must not find "Sign out".
+    Among texts containing all the words, the closer the whole text is to the
+    query the higher the score, and the query appearing as a phrase adds to it.
+    """
+    if not query or not text:
+        return 0.0
+    if query == text:
+        return 1.0
+    if query.replace(" ", "") == text.replace(" ", ""):
+        # "log in" for "Login"
+        return 0.95
+    text_words = set(text.split())
+    if not all(_word_found(word, text_words) for word in query.split()):
+        return 0.0
+    score = 0.6 + 0.3 * SequenceMatcher(None, query, text).ratio()
+    if re.search(r"\b" + re.escape(query) + r"\b", text):
+        score += 0.1
+    return min(score, 0.95)
+
+
+class ClickableIndex:
+    """
+    Index of the clickable elements on the current page, matched by name.
+
+    The links, buttons, form controls and role=button elements of the page
+    are listed in a single execute_script call and matched against the
+    spoken name in Python, so a miss costs one round trip instead of several
+    WebDriver timeouts. The index is rebuilt only when the DOM fingerprint of
+    the page or the visibility of its elements changes, and elements are
+    clicked through the handle attribute set when indexing; a matched element
+    that is gone or hidden by the time it is clicked is matched again. Names the index does not match are looked up once
+    more in the text of all visible elements, which covers elements that
+    are only clickable through JavaScript listeners.
+
+    A name is only clicked when it clearly matches one element: every word
+    must be found, and a different element scoring almost as well makes the
+    name ambiguous.
+
+    Args:
+        driver: Selenium WebDriver instance
+    """
+
+    def __init__(self, driver, min_score=MIN_SCORE):
+        self.driver = driver
+        self.min_score = min_score
+        self.fingerprint = None
+        self.elements = []
+        self.builds = 0
+
+    def refresh(self):
+        """Bring the index up to date with the page; returns the indexed elements"""
+        start = time.perf_counter()
+        result = self.driver.execute_script(CLICKABLE_INDEX_SCRIPT, self.fingerprint)
+        if result["elements"] is not None:
+            self.elements = result["elements"]
+            for element in self.elements:
+                element["match_text"] = normalize(element["text"])
+                element["match_label"] = normalize(element["label"])
+            self.builds += 1
+            logger.debug(f"Indexed {len(self.elements)} clickable elements in {(time.perf_counter() - start) * 1000:.1f} ms")
+        # Without a fingerprint the page cannot be watched for changes, so the index is never reused
+        self.fingerprint = result["fingerprint"] if isinstance(result["fingerprint"], str) else None
+        return self.elements
+
+    def invalidate(self):
+        self.fingerprint = None
+
+    def find(self, name):
+        """
+        Return the clickable element clearly best matching a spoken name, or None
+
+        Elements with the same text count as one name; the first in the document is used.
+        """
+        query = normalize(name)
+        best = self._best_match(name, query, self.refresh())
+        if best is None and query:
+            # Elements the index does not know to be clickable, e.g. divs with click listeners
+            best = self._best_match(name, query, self.driver.execute_script(TEXT_MATCH_SCRIPT, query.split()))
+        return best
+
+    def _best_match(self, name, query, elements):
+        scored = []
+        for element in elements:
+            text, label = element.get("match_text"), element.get("match_label")
+            if text is None:
+                text, label = normalize(element["text"]), normalize(element["label"])
+            score, matched = max((match_score(query, text), text), (match_score(query, label), label))
+            if score >= self.min_score:
+                scored.append((score, matched, element))
+        if not scored:
+            return None
+        # Stable sort, so ties keep document order
+        scored.sort(key=lambda candidate: candidate[0], reverse=True)
+        best_score, best_name, best = scored[0]
+        runner_up = next((score for score, matched, _ in scored if matched != best_name), 0.0)
+        if best_score < 1.0 and best_score - runner_up < AMBIGUITY_MARGIN:
+            logger.info(f"'{name}' matches several elements ({best_score:.2f} and {runner_up:.2f}); not clicking")
+            return None
+        logger.info(f"Matched '{name}' to {best['tag']} '{best['text'] or best['label']}' ({best_score:.2f})")
+        return best
+
+    def click(self, name):
+        """
+        Click the element best matching a spoken name
+
+        Returns:
+            The clicked element, or None if nothing matched
+        """
+        element = self.find(name)
+        if element is None:
+            return None
+        target = self._visible_target(element)
+        if target is None:
+            # The element went away or was hidden after the index was read; try once more on the current page
+            self.invalidate()
+            element = self.find(name)
+            if element is None:
+                return None
+            target = self._visible_target(element)
+            if target is None:
+                logger.info(f"'{name}' is no longer visible; not clicking")
+                return None
+        try:
+            target.click()
+        except Exception as e:
+            # Covered by an overlay or not interactable through WebDriver; let the page handle the click
+            logger.debug(f"Native click failed, clicking from JavaScript: {e}")
+            self.driver.execute_script("arguments[0].click();", target)
+        return element
+
+    def _visible_target(self, element):
+        """The WebElement of an indexed element, or None if it is gone or hidden"""
+        try:
+            target = self.driver.find_element(By.CSS_SELECTOR, f'[{HANDLE_ATTRIBUTE}="{element["handle"]}"]')
+            return target if target.is_displayed() else None
+        except Exception:
+            return None
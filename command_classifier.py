@@ -0,0 +1,173 @@
+import re
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Confidence threshold above which a locally routed command skips the LLM
+DEFAULT_CONFIDENCE_THRESHOLD = 0.75
+
+# How reliable each router handler is on its own. Handlers keyed on exact
+# phrases or anchored regexes are trusted; handlers triggered by a loose
+# substring ("back", "open", a category keyword) need support from the examples.
+ROUTE_CONFIDENCE = {
+    "read_aloud": 0.9,
+    "youtube_search": 0.95,
+    "video_number": 0.9,
+    "list_videos": 0.9,
+    "set_favorite": 0.95,
+    "open_category": 0.95,
+    "list_favorites": 0.95,
+    "open_website": 0.7,
+    "scroll": 0.9,
+    "click": 0.75,
+    "back": 0.65,
+    "forward": 0.65,
+    "search_for": 0.8,
+    "refresh": 0.85,
+    "close_browser": 0.6,
+    "describe_page": 0.9,
+    "describe_content": 0.8,
+    "help": 0.85,
+    "open_intent": 0.45,
+}
+
+# The SUPPORTED_COMMANDS entry each router handler corresponds to
+ROUTE_COMMANDS = {
+    "read_aloud": "Read page aloud",
+    "youtube_search": "Search YouTube",
+    "list_videos": "List videos",
+    "set_favorite": "Set favorite category",
+    "open_category": "Open category website",
+    "list_favorites": "Show favorites",
+    "open_website": "Open website",
+    "scroll": "Scroll down/up",
+    "click": "Click on element",
+    "back": "Go back/forward",
+    "forward": "Go back/forward",
+    "search_for": "Search for",
+    "refresh": "Refresh page",
+    "close_browser": "Close browser",
+    "describe_page": "Describe page",
+    "open_intent": "Open category website",
+}
+
+# Words that signal a multi-step request the local handlers cannot split
+COMPOUND_MARKERS = re.compile(r"\b(?:and then|then|after that|and also)\b")
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class Classification:
+    """Result of classifying a command locally"""
+
+    def __init__(self, route, command, confidence, example_command=None, example_score=0.0, threshold=DEFAULT_CONFIDENCE_THRESHOLD):
+        self.route = route
+        self.command = command
+        self.confidence = confidence
+        self.example_command = example_command
+        self.example_score = example_score
+        self.threshold = threshold
+
+    @property
+    def confident(self):
+        """True if the command can be executed locally without asking the LLM"""
+        return self.route is not None and self.confidence >= self.threshold
+
+    def __repr__(self):
+        return (f"Classification(route={self.route!r}, command={self.command!r}, "
+                f"confidence={self.confidence:.2f}, example={self.example_command!r}:{self.example_score:.2f})")
+
+
+class LocalCommandClassifier:
+    """
+    Confidence-scored local classifier that sits in front of the LLM.
+
+    Combines the handler chosen by the CommandRouter with a nearest-example
+    score over COMMAND_EXAMPLES. Unambiguous commands ("scroll down", "go back")
+    score above the threshold and are executed immediately; everything else is
+    left for the LLM.
+    """
+
+    def __init__(self, supported_commands, command_examples, threshold=DEFAULT_CONFIDENCE_THRESHOLD):
+        self.threshold = threshold
+        self.supported_commands = list(supported_commands)
+        self.examples = []
+        for command, examples in command_examples.items():
+            for example in examples:
+                self.examples.append((command, example.lower().rstrip("?!."), frozenset(self._tokenize(example))))
+
+    @staticmethod
+    def _tokenize(text):
+        return TOKEN_PATTERN.findall(text.lower())
+
+    def nearest_example(self, text):
+        """
+        Find the COMMAND_EXAMPLES entry closest to the text
+
+        Returns:
+            Tuple of (command name, similarity between 0 and 1)
+        """
+        normalized = text.lower().strip().rstrip("?!.")
+        tokens = frozenset(self._tokenize(normalized))
+        if not tokens:
+            return None, 0.0
+
+        best_command, best_score = None, 0.0
+        for command, example, example_tokens in self.examples:
+            if normalized == example:
+                return command, 1.0
+            score = len(tokens & example_tokens) / len(tokens | example_tokens)
+            if score > best_score:
+                best_command, best_score = command, score
+        return best_command, best_score
+
+    def route_command(self, route):
+        """Map a router match onto the SUPPORTED_COMMANDS name it executes"""
+        if route.name == "video_number":
+            return "Play video number" if route.params.get("action") == "play" else "Describe video number"
+        if route.name == "describe_content":
+            return f"Describe {route.params['content_type']}"
+        return ROUTE_COMMANDS.get(route.name)
+
+    def classify(self, command, route):
+        """
+        Score how safely a command can be executed by the local handler
+
+        Args:
+            command: The recognized command text
+            route: RouteMatch chosen by the CommandRouter, or None
+
+        Returns:
+            Classification with the confidence of the local decision
+        """
+        example_command, example_score = self.nearest_example(command)
+
+        if route is None:
+            return Classification(None, example_command, 0.0, example_command, example_score, self.threshold)
+
+        route_command = self.route_command(route)
+        confidence = ROUTE_CONFIDENCE.get(route.name, 0.5)
+
+        # Incomplete parameters mean the handler would do nothing useful
+        if route.name == "scroll" and not route.params.get("direction"):
+            confidence = 0.3
+
+        # Agreement with the closest example raises confidence, an exact example is certain
+        if example_command == route_command:
+            if example_score == 1.0:
+                confidence = 1.0
+            elif example_score >= 0.5:
+                confidence += 0.15
+            elif example_score >= 0.25:
+                confidence += 0.1
+
+        # Long or multi-step utterances are better interpreted by the LLM
+        words = len(self._tokenize(command))
+        if COMPOUND_MARKERS.search(command.lower()):
+            confidence -= 0.35
+        if words > 8:
+            confidence -= 0.2
+
+        confidence = max(0.0, min(1.0, confidence))
+        return Classification(route, route_command, confidence, example_command, example_score, self.threshold)
@@ -0,0 +1,215 @@
+import time
+import queue
+import logging
+import threading
+from collections import deque
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Stage durations of the last commands kept for the metrics summary
+METRICS_WINDOW = 200
+
+
+class PipelineMetrics:
+    """Per-stage latencies of recent commands"""
+
+    STAGES = ("recognize", "interpret_wait", "interpret", "execute_wait", "execute", "total")
+
+    def __init__(self, window=METRICS_WINDOW):
+        self.samples = {stage: deque(maxlen=window) for stage in self.STAGES}
+        self.dropped = 0
+        self.preempted = 0
+        self.lock = threading.Lock()
+
+    def record(self, timings):
+        with self.lock:
+            for stage, seconds in timings.items():
+                self.samples[stage].append(seconds)
+
+    def summary(self):
+        """Return {stage: {"count", "mean_ms", "p95_ms"}} over the recent commands"""
+        result = {}
+        with self.lock:
+            for stage, samples in self.samples.items():
+                if not samples:
+                    continue
+                ordered = sorted(samples)
+                result[stage] = {
+                    "count": len(ordered),
+                    "mean_ms": 1000 * sum(ordered) / len(ordered),
+                    "p95_ms": 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                }
+        return result
+
+
+class _Command:
+    """A recognized command moving through the pipeline, with the time it entered each stage"""
+
+    __slots__ = ("text", "generation", "plan", "started", "stamps")
+
+    def __init__(self, text, generation, started):
+        self.text = text
+        self.generation = generation
+        self.plan = None
+        self.started = started
+        self.stamps = {}
+
+
+class CommandPipeline:
+    """
+    Capture, recognition, interpretation and execution on separate threads.
+
+    Each stage hands its output to the next through a bounded queue, so the
+    microphone keeps being read and recognized while a command waits on the
+    browser or the LLM. Stop commands are recognized ahead of the queue: they
+    run immediately on the recognition thread, and every command recognized
+    before them that has not executed yet is dropped.
+
+    Args:
+        get_utterance: Returns the next captured utterance, or None after a timeout
+        recognize: Turns an utterance into command text, or None
+        interpret: Decides what to do with a command without acting on it
+        execute: Acts on an interpreted command; returning "EXIT" stops the pipeline
+        is_stop: True for commands that must preempt the queued work
+        on_stop: Handles a stop command on the recognition thread
+    """
+
+    def __init__(self, get_utterance, recognize, interpret, execute, is_stop, on_stop, max_queued=2):
+        self.get_utterance = get_utterance
+        self.recognize = recognize
+        self.interpret = interpret
+        self.execute = execute
+        self.is_stop = is_stop
+        self.on_stop = on_stop
+        self.interpret_queue = queue.Queue(maxsize=max_queued)
+        self.execute_queue = queue.Queue(maxsize=max_queued)
+        self.metrics = PipelineMetrics()
+        self.generation = 0
+        self.running = threading.Event()
+        self.finished = threading.Event()
+        self.threads = []
+
+    def start(self):
+        self.running.set()
+        self.finished.clear()
+        for name, target in (("recognize", self._recognize_loop), ("interpret", self._interpret_loop),
+                             ("execute", self._execute_loop)):
+            thread = threading.Thread(target=target, name=f"CommandPipeline-{name}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=None):
+        self.running.clear()
+        self.finished.set()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def wait(self, timeout=None):
+        """Block until a command returned EXIT or the pipeline was stopped"""
+        return self.finished.wait(timeout)
+
+    def preempt(self):
+        """Drop every command that was recognized but has not been executed yet"""
+        self.generation += 1
+        self.metrics.preempted += 1
+        for pending in (self.interpret_queue, self.execute_queue):
+            while True:
+                try:
+                    pending.get_nowait()
+                except queue.Empty:
+                    break
+
+    def _put(self, target, command):
+        # Bounded queues: wait for room, but give up when the pipeline stops or the command went stale
+        while self.running.is_set() and command.generation == self.generation:
+            try:
+                target.put(command, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        self.metrics.dropped += 1
+
+    def _get(self, source):
+        while self.running.is_set():
+            try:
+                command = source.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if command.generation == self.generation:
+                return command
+            self.metrics.dropped += 1
+        return None
+
+    def _recognize_loop(self):
+        while self.running.is_set():
+            audio = self.get_utterance()
+            if audio is None:
+                continue
+            started = time.perf_counter()
+            try:
+                text = self.recognize(audio)
+            except Exception as e:
+                logger.error(f"Recognition failed: {e}")
+                continue
+            if not text:
+                continue
+
+            if self.is_stop(text):
+                self.preempt()
+                logger.info(f"Stop command '{text}' preempts queued work")
+                try:
+                    self.on_stop(text)
+                except Exception as e:
+                    logger.error(f"Error handling stop command '{text}': {e}")
+                continue
+
+            command = _Command(text, self.generation, started)
+            command.stamps["recognized"] = time.perf_counter()
+            self._put(self.interpret_queue, command)
+
+    def _interpret_loop(self):
+        while self.running.is_set():
+            command = self._get(self.interpret_queue)
+            if command is None:
+                break
+            command.stamps["interpreting"] = time.perf_counter()
+            try:
+                command.plan = self.interpret(command.text)
+            except Exception as e:
+                logger.error(f"Error interpreting '{command.text}': {e}")
+                continue
+            command.stamps["interpreted"] = time.perf_counter()
+            self._put(self.execute_queue, command)
+
+    def _execute_loop(self):
+        while self.running.is_set():
+            command = self._get(self.execute_queue)
+            if command is None:
+                break
+            command.stamps["executing"] = time.perf_counter()
+            try:
+                result = self.execute(command.plan)
+            except Exception as e:
+                logger.error(f"Error executing '{command.text}': {e}")
+                result = None
+            command.stamps["executed"] = time.perf_counter()
+            self._record(command)
+            if result == "EXIT":
+                self.running.clear()
+                self.finished.set()
+
+    def _record(self, command):
+        stamps = command.stamps
+        timings = {
+            "recognize": stamps["recognized"] - command.started,
+            "interpret_wait": stamps["interpreting"] - stamps["recognized"],
+            "interpret": stamps["interpreted"] - stamps["interpreting"],
+            "execute_wait": stamps["executing"] - stamps["interpreted"],
+            "execute": stamps["executed"] - stamps["executing"],
+            "total": stamps["executed"] - command.started,
+        }
+        self.metrics.record(timings)
+        logger.info(f"Command '{command.text}': " + ", ".join(
+            f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in timings.items()))
@@ -0,0 +1,360 @@
+import re
+import logging
+from favorites_manager import LIST_FAVORITES_PHRASES, OPEN_CATEGORY_PATTERNS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Phrase lists used by the fallback command handlers (all lowercase)
+READ_ALOUD_PHRASES = [
+    "read page", "read this page", "read aloud", "read the page",
+    "read to me", "read this to me", "read this", "read the article",
+    "read this article", "start reading"
+]
+
+LIST_VIDEOS_PHRASES = ["list videos", "show videos", "what videos", "summarize videos", "summarize results"]
+
+DESCRIBE_PAGE_PHRASES = [
+    "what's on this page", "what is on this page", "describe this page",
+    "tell me about this page", "what's on the page", "what can you see",
+    "describe what you see", "analyze this page", "page content"
+]
+
+HELP_PHRASES = ["help", "how to use", "instructions", "what can i say", "available commands"]
+
+# YouTube search command patterns
+YOUTUBE_SEARCH_PATTERNS = [
+    re.compile(r"(?:search|find|look for)(?:.+?)(?:on|in|at)(?:.+?)youtube(?:.+?)(?:for\s+)(.+)", re.IGNORECASE),
+    re.compile(r"youtube(?:.+?)(?:search|find|look for)(?:.+?)(?:for\s+)(.+)", re.IGNORECASE),
+    re.compile(r"(?:search|find|look for)(?:.+?)youtube(?:\s+for\s+)(.+)", re.IGNORECASE)
+]
+
+# YouTube video selection pattern
+VIDEO_NUMBER_PATTERN = re.compile(
+    r"(?:tell me about|what's|describe|play|show|start)(?:.+?)(?:video|) (?:number |#)?(first|second|third|fourth|fifth|1st|2nd|3rd|4th|5th|[1-9])",
+    re.IGNORECASE
+)
+VIDEO_DESCRIBE_ACTIONS = ["tell me about", "what's", "describe"]
+VIDEO_PLAY_ACTIONS = ["play", "show", "start"]
+VIDEO_POSITIONS = {
+    "first": 1, "1st": 1,
+    "second": 2, "2nd": 2,
+    "third": 3, "3rd": 3,
+    "fourth": 4, "4th": 4,
+    "fifth": 5, "5th": 5
+}
+
+# Specialized content description patterns, in priority order
+CONTENT_PATTERNS = [
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)products", re.IGNORECASE), "products"),
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)videos", re.IGNORECASE), "videos"),
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)images", re.IGNORECASE), "images"),
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)pictures", re.IGNORECASE), "images"),
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)music", re.IGNORECASE), "music"),
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)songs", re.IGNORECASE), "music"),
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)tracks", re.IGNORECASE), "music"),
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)articles", re.IGNORECASE), "articles"),
+    (re.compile(r"(?:tell|describe|what|list)(?:.+?)posts", re.IGNORECASE), "articles")
+]
+
+# Website extraction for "open ..." / "go to ..." commands
+OPEN_WEBSITE_PATTERN = re.compile(r'open\s+(.*?)(?:\s+in browser|\s+website|\s+site|\s*$)')
+GO_TO_WEBSITE_PATTERN = re.compile(r'go to\s+(.*?)(?:\s+website|\s+site|\s*$)')
+
+# Map INTENT_KEYWORDS intents to favorites categories
+INTENT_CATEGORIES = {
+    "watch_video": "videos",
+    "shopping": "shopping",
+    "social_media": "social",
+    "search": "search",
+    "news": "news",
+    "mail": "mail",
+    "movies": "movies",
+    "music": "music"
+}
+
+
+class PhraseMatcher:
+    """
+    Finds every registered phrase that occurs in a text with a single scan.
+
+    The phrases are compiled into one trie-shaped regular expression wrapped in a
+    lookahead, so the regex engine walks the text once and reports the longest
+    phrase starting at each position. Shorter phrases contained in a reported
+    phrase are added from a precomputed containment table, which gives the same
+    answer as testing `phrase in text` for every phrase.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = sorted(set(phrase for phrase in phrases if phrase))
+        self.contained = {
+            phrase: frozenset(other for other in self.phrases if other in phrase)
+            for phrase in self.phrases
+        }
+        if self.phrases:
+            self.pattern = re.compile("(?=(" + self._trie_pattern(self.phrases) + "))")
+        else:
+            self.pattern = None
+
+    def find_all(self, text):
+        """Return the set of phrases occurring anywhere in text"""
+        found = set()
+        if self.pattern is None:
+            return found
+        for match in self.pattern.finditer(text):
+            phrase = match.group(1)
+            if phrase not in found:
+                found.update(self.contained[phrase])
+        return found
+
+    @classmethod
+    def _trie_pattern(cls, phrases):
+        """Build a regex that matches the longest phrase with shared prefixes factored out"""
+        trie = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[""] = True
+        return cls._node_pattern(trie)
+
+    @classmethod
+    def _node_pattern(cls, node):
+        terminal = "" in node
+        branches = [re.escape(char) + cls._node_pattern(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1:
+            body = branches[0]
+            if terminal:
+                return "(?:" + body + ")?"
+            return body
+        body = "(?:" + "|".join(branches) + ")"
+        if terminal:
+            return body + "?"
+        return body
+
+
+class Route:
+    """A fallback command handler: literal triggers plus an optional parameter extractor"""
+
+    def __init__(self, name, triggers=None, extract=None):
+        self.name = name
+        self.triggers = frozenset(triggers) if triggers is not None else None
+        self.extract = extract
+
+
+class RouteMatch:
+    """The handler chosen for a command and the parameters extracted for it"""
+
+    def __init__(self, name, params=None):
+        self.name = name
+        self.params = params or {}
+
+    def __repr__(self):
+        return f"RouteMatch({self.name!r}, {self.params!r})"
+
+
+class CommandRouter:
+    """
+    Precompiled replacement for the linear if/elif cascade in process_command.
+
+    Every phrase list and regex anchor is compiled into a single PhraseMatcher.
+    Routing a command scans the text once, then walks the routes in the original
+    priority order and only evaluates the regexes of routes whose literal
+    triggers were found.
+    """
+
+    def __init__(self, favorites_manager, intent_keywords, mood_keywords):
+        self.favorites_manager = favorites_manager
+        self.intent_keywords = intent_keywords
+        self.mood_keywords = mood_keywords
+
+        self.routes = [
+            Route("read_aloud", READ_ALOUD_PHRASES),
+            Route("youtube_search", ["youtube"], self._extract_youtube_search),
+            Route("video_number", VIDEO_DESCRIBE_ACTIONS + VIDEO_PLAY_ACTIONS, self._extract_video_number),
+            Route("list_videos", LIST_VIDEOS_PHRASES),
+            Route("set_favorite", ["when i say", "set", "make", "change", "use", "save", "for"],
+                  self._extract_set_favorite),
+            Route("open_category", ["category"], self._extract_open_category),
+            Route("list_favorites", LIST_FAVORITES_PHRASES),
+            Route("open_website", ["open", "go to"], self._extract_open_website),
+            Route("scroll", ["scroll"], self._extract_scroll),
+            Route("click", ["click"], self._extract_click),
+            Route("back", ["back", "previous page"]),
+            Route("forward", ["forward", "next page"]),
+            Route("search_for", ["search for"], self._extract_search_for),
+            Route("refresh", ["refresh", "reload"]),
+            Route("close_browser", ["close browser", "exit"]),
+            Route("describe_page", DESCRIBE_PAGE_PHRASES),
+            Route("describe_content", ["products", "videos", "images", "pictures", "music",
+                                       "songs", "tracks", "articles", "posts"], self._extract_content_type),
+            Route("help", HELP_PHRASES),
+            Route("open_intent", None, self._extract_intent),
+        ]
+
+        # Intent and mood phrases are ranked by the position of their group
+        self.intent_rank = {}
+        for rank, (intent, keywords) in enumerate(intent_keywords.items()):
+            for keyword in keywords:
+                self.intent_rank.setdefault(keyword, (rank, INTENT_CATEGORIES.get(intent, intent)))
+        self.mood_rank = {}
+        for rank, (category, phrases) in enumerate(mood_keywords.items()):
+            for phrase in phrases:
+                self.mood_rank.setdefault(phrase, (rank, category))
+
+        all_phrases = set(self.intent_rank) | set(self.mood_rank)
+        for route in self.routes:
+            if route.triggers:
+                all_phrases.update(route.triggers)
+        self.matcher = PhraseMatcher(all_phrases)
+
+        logger.info(f"Command router compiled {len(self.matcher.phrases)} phrases into {len(self.routes)} routes")
+
+    def route(self, command):
+        """
+        Find the handler for a command
+
+        Args:
+            command: The recognized command text
+
+        Returns:
+            RouteMatch for the first route (in priority order) that accepts the command, or None
+        """
+        if not command:
+            return None
+
+        text = command.lower()
+        hits = self.matcher.find_all(text)
+
+        for route in self.routes:
+            if route.triggers is not None and hits.isdisjoint(route.triggers):
+                continue
+            if route.extract is None:
+                return RouteMatch(route.name)
+            params = route.extract(command, text, hits)
+            if params is not None:
+                return RouteMatch(route.name, params)
+        return None
+
+    def match_intent(self, text, hits=None):
+        """
+        Determine the category a free-form command refers to using keyword intents
+
+        Args:
+            text: The command text
+            hits: Phrases already found in the text (computed if not given)
+
+        Returns:
+            Dictionary with the intent and category, or None
+        """
+        lowered = text.lower()
+
+        # A set favorite command is never an open category command
+        if self.favorites_manager.is_setting_favorite_command(lowered):
+            return None
+
+        if hits is None:
+            hits = self.matcher.find_all(lowered)
+
+        # Check for direct category mentions
+        words = set(lowered.split())
+        for category in self.favorites_manager.favorites.keys():
+            if category in words:
+                return {"intent": "open_category", "category": category}
+
+        # Check for intent keywords, then mood-based intents
+        for ranks in (self.intent_rank, self.mood_rank):
+            matched = [ranks[phrase] for phrase in hits if phrase in ranks]
+            if matched:
+                return {"intent": "open_category", "category": min(matched)[1]}
+
+        return None
+
+    # Parameter extractors: return a dict to accept the command, None to fall through
+
+    def _extract_youtube_search(self, command, text, hits):
+        for pattern in YOUTUBE_SEARCH_PATTERNS:
+            match = pattern.search(command)
+            if match:
+                search_query = match.group(1).strip()
+                if search_query:
+                    return {"query": search_query}
+        return None
+
+    def _extract_video_number(self, command, text, hits):
+        match = VIDEO_NUMBER_PATTERN.search(command)
+        if not match:
+            return None
+
+        position_text = match.group(1).lower()
+        position = VIDEO_POSITIONS.get(position_text)
+        if position is None:
+            position = int(position_text) if position_text.isdigit() else 1
+
+        # Determine if it's a describe or play command
+        if any(action in hits for action in VIDEO_DESCRIBE_ACTIONS):
+            action = "describe"
+        elif any(action in hits for action in VIDEO_PLAY_ACTIONS):
+            action = "play"
+        else:
+            action = None
+        return {"position": position, "action": action}
+
+    def _extract_set_favorite(self, command, text, hits):
+        if not self.favorites_manager.is_setting_favorite_command(command):
+            return None
+        category, website = self.favorites_manager.extract_favorite_settings(command)
+        if category and website:
+            return {"category": category, "website": website}
+        return None
+
+    def _extract_open_category(self, command, text, hits):
+        for pattern in OPEN_CATEGORY_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                category = match.group(1)
+                website = self.favorites_manager.get_favorite(category)
+                if website:
+                    return {"category": category, "website": website}
+                return None
+        return None
+
+    def _extract_open_website(self, command, text, hits):
+        if "open" in hits:
+            match = OPEN_WEBSITE_PATTERN.search(text)
+        else:
+            match = GO_TO_WEBSITE_PATTERN.search(text)
+        if match and match.group(1):
+            return {"website": match.group(1)}
+        return None
+
+    def _extract_scroll(self, command, text, hits):
+        if "down" in text:
+            return {"direction": "down"}
+        if "up" in text:
+            return {"direction": "up"}
+        return {"direction": None}
+
+    def _extract_click(self, command, text, hits):
+        return {"element": text.replace("click", "").strip()}
+
+    def _extract_search_for(self, command, text, hits):
+        return {"query": text.replace("search for", "").strip()}
+
+    def _extract_content_type(self, command, text, hits):
+        for pattern, content_type in CONTENT_PATTERNS:
+            if pattern.search(command):
+                return {"content_type": content_type}
+        return None
+
+    def _extract_intent(self, command, text, hits):
+        intent_info = self.match_intent(text, hits)
+        if intent_info and intent_info["intent"] == "open_category":
+            category = intent_info["category"]
+            website = self.favorites_manager.get_favorite(category)
+            if website:
+                return {"category": category, "website": website}
+        return None
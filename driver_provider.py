@@ -0,0 +1,148 @@
+import os
+import json
+import time
+import logging
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+
+try:
+    from webdriver_manager.chrome import ChromeDriverManager
+except ImportError:  # Selenium 4.6+ can locate the driver by itself
+    ChromeDriverManager = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Where the resolved chromedriver path is pinned between runs
+DRIVER_CACHE_FILE = os.getenv("CHROMEDRIVER_CACHE", "chromedriver_path.json")
+
+# Explicit chromedriver to use; skips resolution entirely
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+
+# A pinned path is checked against the installed Chrome again after this many seconds
+PIN_MAX_AGE = 7 * 24 * 3600
+
+
+def resolve_driver_path(cache_file=DRIVER_CACHE_FILE, installer=None, max_age=PIN_MAX_AGE):
+    """
+    Return the chromedriver executable to use, resolving it over the network at most once a week
+
+    The path found by webdriver_manager is pinned in `cache_file` and reused
+    while it exists and is younger than `max_age`. When resolution fails, for
+    example without network, an older pinned path is used anyway.
+
+    Args:
+        cache_file: JSON file the resolved path is pinned in
+        installer: Callable returning the driver path, ChromeDriverManager().install by default
+
+    Returns:
+        Path of the chromedriver executable, or None to let Selenium locate it
+    """
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+
+    pinned = None
+    try:
+        with open(cache_file) as f:
+            pinned = json.load(f)
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable driver cache {cache_file}: {e}")
+
+    pinned_path = pinned.get("path") if isinstance(pinned, dict) else None
+    if pinned_path and not os.path.isfile(pinned_path):
+        pinned_path = None
+    if pinned_path and time.time() - pinned.get("resolved", 0) < max_age:
+        return pinned_path
+
+    if installer is None and ChromeDriverManager is not None:
+        installer = lambda: ChromeDriverManager().install()
+    if installer is None:
+        return pinned_path
+
+    try:
+        path = installer()
+    except Exception as e:
+        if pinned_path:
+            logger.warning(f"Could not check for a newer chromedriver, using {pinned_path}: {e}")
+            return pinned_path
+        logger.warning(f"Could not resolve chromedriver, leaving it to Selenium: {e}")
+        return None
+
+    try:
+        with open(cache_file, "w") as f:
+            json.dump({"path": path, "resolved": time.time()}, f)
+    except OSError as e:
+        logger.warning(f"Could not pin chromedriver path in {cache_file}: {e}")
+    return path
+
+
+class ChromeLaunch:
+    """
+    Chrome starting on a background thread.
+
+    Resolving the driver and opening the browser take seconds, so they run
+    while the caller initializes speech, NLTK and the LLM client; `result()`
+    waits for the browser and reports how long the launch took.
+
+    Args:
+        chrome_options: selenium ChromeOptions for the new browser
+    """
+
+    def __init__(self, chrome_options, resolve=resolve_driver_path, factory=None):
+        self.chrome_options = chrome_options
+        self.resolve = resolve
+        self.factory = factory or (lambda path, options: webdriver.Chrome(
+            service=Service(path) if path else Service(), options=options))
+        self.started = time.perf_counter()
+        self.resolve_seconds = None
+        self.launch_seconds = None
+        self.wait_seconds = None
+        self.driver = None
+        self.error = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="ChromeLaunch", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            path = self.resolve()
+            self.resolve_seconds = time.perf_counter() - self.started
+            try:
+                self.driver = self.factory(path, self.chrome_options)
+            except Exception as e:
+                if path is None:
+                    raise
+                # A pinned driver stops working when Chrome updates itself; resolve it again once
+                logger.warning(f"Chrome did not start with {path}, resolving the driver again: {e}")
+                self.driver = self.factory(self.resolve(max_age=0), self.chrome_options)
+            self.launch_seconds = time.perf_counter() - self.started
+            logger.info(f"Chrome started in {self.launch_seconds:.2f}s (driver resolved in {self.resolve_seconds:.2f}s)")
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def result(self):
+        """Wait for the browser and return the driver; raises if Chrome could not be started"""
+        called = time.perf_counter()
+        self.done.wait()
+        self.wait_seconds = time.perf_counter() - called
+        if self.error is not None:
+            raise self.error
+        overlapped = min(called - self.started, self.launch_seconds)
+        logger.info(f"Chrome ready after waiting {self.wait_seconds:.2f}s; "
+                    f"{overlapped:.2f}s of its startup overlapped other initialization")
+        return self.driver
+
+
+def start_chrome(chrome_options):
+    """Start launching Chrome in the background; returns a ChromeLaunch"""
+    return ChromeLaunch(chrome_options)
+
+
+def create_chrome(chrome_options):
+    """Launch Chrome with the pinned driver and wait for it"""
+    return start_chrome(chrome_options).result()
@@ -20,6 +20,33 @@ DEFAULT_CATEGORIES = {
     "maps": "https://www.google.com/maps"
 }
 
+# Patterns for "set favorite" commands, compiled once and shared with the command router
+SET_FAVORITE_PATTERNS = [
+    re.compile(r'(?:set|make|change)\s+(?:favorite|default)\s+(\w+)\s+(?:to|as|website to)\s+(.+)'),
+    re.compile(r'(?:set|make|change)\s+(\w+)\s+(?:favorite|default)\s+(?:to|as|website to)\s+(.+)'),
+    re.compile(r'(?:use|save)\s+(.+)\s+(?:as|for)\s+(?:my|the)\s+(\w+)\s+(?:category|site|website)'),
+    re.compile(r'(?:for)\s+(\w+)\s+(?:use|open|go to)\s+(.+)'),
+]
+
+# Patterns for "open category" commands
+OPEN_CATEGORY_PATTERNS = [
+    re.compile(r'open\s+(?:the|my)?\s*category\s+(\w+)'),
+    re.compile(r'go\s+to\s+(?:the|my)?\s*category\s+(\w+)'),
+    re.compile(r'launch\s+(?:the|my)?\s*category\s+(\w+)'),
+    re.compile(r'navigate\s+to\s+(?:the|my)?\s*category\s+(\w+)')
+]
+
+# Phrases that ask for the list of favorites
+LIST_FAVORITES_PHRASES = [
+    'list favorites',
+    'show favorites',
+    'display favorites',
+    'what are my favorites',
+    'tell me my favorites',
+    'show my favorites',
+    'list my favorites'
+]
+
 class FavoritesManager:
     def __init__(self, voice_engine=None):
         """Initialize the favorites manager"""
@@ -91,15 +118,8 @@ class FavoritesManager:
                         return True
         
         # Continue with other patterns
-        set_patterns = [
-            r'(?:set|make|change)\s+(?:favorite|default)\s+(\w+)\s+(?:to|as|website to)\s+(.+)',
-            r'(?:set|make|change)\s+(\w+)\s+(?:favorite|default)\s+(?:to|as|website to)\s+(.+)',
-            r'(?:use|save)\s+(.+)\s+(?:as|for)\s+(?:my|the)\s+(\w+)\s+(?:category|site|website)',
-            r'(?:for)\s+(\w+)\s+(?:use|open|go to)\s+(.+)',
-        ]
-        
-        for pattern in set_patterns:
-            if re.search(pattern, command.lower()):
+        for pattern in SET_FAVORITE_PATTERNS:
+            if pattern.search(command.lower()):
                 return True
         return False
     
@@ -123,18 +143,11 @@ class FavoritesManager:
                         return category, website
         
         # Continue with other patterns
-        set_patterns = [
-            r'(?:set|make|change)\s+(?:favorite|default)\s+(\w+)\s+(?:to|as|website to)\s+(.+)',
-            r'(?:set|make|change)\s+(\w+)\s+(?:favorite|default)\s+(?:to|as|website to)\s+(.+)',
-            r'(?:use|save)\s+(.+)\s+(?:as|for)\s+(?:my|the)\s+(\w+)\s+(?:category|site|website)',
-            r'(?:for)\s+(\w+)\s+(?:use|open|go to)\s+(.+)',
-        ]
-        
-        for pattern in set_patterns:
-            match = re.search(pattern, command.lower())
+        for pattern in SET_FAVORITE_PATTERNS:
+            match = pattern.search(command.lower())
             if match:
                 # Extract category and website, handling the order based on pattern
-                if "as my" in pattern or "for my" in pattern:
+                if "as my" in pattern.pattern or "for my" in pattern.pattern:
                     website = match.group(1).strip()
                     category = match.group(2).lower()
                 else:
@@ -154,29 +167,15 @@ class FavoritesManager:
     
     def is_open_category_command(self, command):
         """Check if the command is trying to open a category"""
-        category_patterns = [
-            r'open\s+(?:the|my)?\s*category\s+(\w+)',
-            r'go\s+to\s+(?:the|my)?\s*category\s+(\w+)',
-            r'launch\s+(?:the|my)?\s*category\s+(\w+)',
-            r'navigate\s+to\s+(?:the|my)?\s*category\s+(\w+)'
-        ]
-        
-        for pattern in category_patterns:
-            if re.search(pattern, command.lower()):
+        for pattern in OPEN_CATEGORY_PATTERNS:
+            if pattern.search(command.lower()):
                 return True
         return False
     
     def extract_category(self, command):
         """Extract category from an open category command"""
-        category_patterns = [
-            r'open\s+(?:the|my)?\s*category\s+(\w+)',
-            r'go\s+to\s+(?:the|my)?\s*category\s+(\w+)',
-            r'launch\s+(?:the|my)?\s*category\s+(\w+)',
-            r'navigate\s+to\s+(?:the|my)?\s*category\s+(\w+)'
-        ]
-        
-        for pattern in category_patterns:
-            match = re.search(pattern, command.lower())
+        for pattern in OPEN_CATEGORY_PATTERNS:
+            match = pattern.search(command.lower())
             if match:
                 return match.group(1).lower()
         
@@ -184,17 +183,7 @@ class FavoritesManager:
     
     def is_listing_favorites_command(self, command):
         """Check if the command is asking to list favorites"""
-        list_patterns = [
-            r'list favorites',
-            r'show favorites', 
-            r'display favorites', 
-            r'what are my favorites', 
-            r'tell me my favorites', 
-            r'show my favorites',
-            r'list my favorites'
-        ]
-        
-        for pattern in list_patterns:
+        for pattern in LIST_FAVORITES_PHRASES:
             if pattern in command.lower():
                 return True
         return False 
\ No newline at end of file
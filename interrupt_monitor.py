@@ -0,0 +1,81 @@
+import logging
+import threading
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Commands that stop reading, matched against the whole recognized phrase
+STOP_PHRASES = ["stop", "wait", "interrupt", "pause", "stop reading"]
+
+
+class InterruptMonitor:
+    """
+    Watches the microphone for stop commands while a page is read aloud.
+
+    One long-lived thread takes over the utterances of the shared capture
+    stream while monitoring is active and parks while it is not, so reading a
+    long page costs a single thread and no extra microphone, however many
+    chunks are read. A stop phrase calls `on_stop`; anything else that was
+    said is handed to `on_command` instead of being lost.
+
+    Args:
+        get_utterance: Returns the next captured utterance, or None after the given timeout
+        recognize: Turns an utterance into command text, or None if it should be ignored
+        on_stop: Called with the phrase when a stop command is heard
+        on_command: Called with any other command heard while monitoring
+    """
+
+    def __init__(self, get_utterance, recognize, on_stop, on_command=None, stop_phrases=STOP_PHRASES,
+                 poll_seconds=0.2):
+        self.get_utterance = get_utterance
+        self.recognize = recognize
+        self.on_stop = on_stop
+        self.on_command = on_command
+        self.stop_phrases = set(stop_phrases)
+        self.poll_seconds = poll_seconds
+        self.active = threading.Event()
+        self.inactive = threading.Event()
+        self.inactive.set()
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start watching for stop commands; the monitor thread is created on first use only"""
+        with self.lock:
+            self.inactive.clear()
+            self.active.set()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="InterruptMonitor", daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        """Stop watching and let other consumers have the microphone again"""
+        self.active.clear()
+
+    def wait_until_inactive(self, timeout=None):
+        """Block while the monitor owns the microphone; returns False on timeout"""
+        return self.inactive.wait(timeout)
+
+    def _run(self):
+        while True:
+            with self.lock:
+                if not self.active.is_set():
+                    self.inactive.set()
+            self.active.wait()
+            audio = self.get_utterance(self.poll_seconds)
+            if audio is None:
+                continue
+
+            try:
+                text = self.recognize(audio)
+            except Exception as e:
+                logger.debug(f"Could not recognize speech while reading: {e}")
+                text = None
+            if not text:
+                continue
+
+            if text.strip().lower() in self.stop_phrases:
+                logger.info(f"Stop command heard while reading: {text}")
+                self.on_stop(text)
+            elif self.on_command:
+                self.on_command(text)
@@ -0,0 +1,136 @@
+import os
+import json
+import time
+import logging
+from speech_backends import VOSK_MODEL_PATH
+
+try:
+    import vosk
+except ImportError:  # Optional offline recognizer
+    vosk = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Said before a command so it is sent to full recognition; everything else is treated as background speech
+WAKE_PHRASE = os.getenv("WAKE_PHRASE", "hey browser")
+
+# Acted on locally as soon as they are heard, without waiting for the utterance to end
+PRIORITY_WORDS = ["stop", "quiet"]
+
+# A wake phrase said on its own opens the gate for the next utterance within this many seconds
+WAKE_WINDOW_SECONDS = 6
+
+
+class KeywordSpotter:
+    """
+    Closed-vocabulary keyword spotting on the shared microphone stream.
+
+    Registered as a listener of AudioCapture, it decodes every chunk of an
+    utterance with a recognizer restricted to the wake phrase and the priority
+    words. Priority words fire `on_priority` from the partial result, one chunk
+    after they are spoken; when the utterance ends the keywords heard in it
+    are attached to its AudioData, so the consumer can decide whether the
+    utterance is worth a full recognition request.
+
+    Args:
+        recognizer_factory: Creates a Vosk-style recognizer from (sample_rate, grammar JSON)
+        wake_phrase: Phrase that addresses the assistant
+        priority_words: Words handled immediately by on_priority
+        on_priority: Called with the word on the capture thread, once per utterance
+    """
+
+    def __init__(self, recognizer_factory, wake_phrase=WAKE_PHRASE, priority_words=PRIORITY_WORDS,
+                 on_priority=None):
+        self.recognizer_factory = recognizer_factory
+        self.wake_phrase = wake_phrase.lower()
+        self.priority_words = [word.lower() for word in priority_words]
+        self.on_priority = on_priority
+        self.grammar = json.dumps([self.wake_phrase] + self.priority_words + ["[unk]"])
+        self.recognizer = None
+        self.fired = set()
+        self.last_wake = 0.0
+
+    def open(self, sample_rate):
+        """Called by AudioCapture when the stream opens"""
+        self.recognizer = self.recognizer_factory(sample_rate, self.grammar)
+
+    def start_utterance(self, chunks):
+        self.fired = set()
+        for chunk in chunks:
+            self.feed(chunk)
+
+    def feed(self, chunk):
+        if self.recognizer is None:
+            return
+        self.recognizer.AcceptWaveform(chunk)
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        for word in partial.split():
+            if word in self.priority_words and word not in self.fired:
+                self.fired.add(word)
+                logger.info(f"Priority word heard: {word}")
+                if self.on_priority:
+                    self.on_priority(word)
+
+    def end_utterance(self, audio):
+        """Attach the keywords of the finished utterance to its audio (None if it was discarded)"""
+        if self.recognizer is None:
+            return
+        text = json.loads(self.recognizer.FinalResult()).get("text", "")
+        self.recognizer.Reset()
+        keywords = set(self.fired)
+        keywords.update(word for word in text.split() if word in self.priority_words)
+        if self.wake_phrase in text:
+            keywords.add(self.wake_phrase)
+            self.last_wake = time.monotonic()
+        if audio is not None:
+            audio.keywords = keywords
+            audio.wake_only = text.strip() == self.wake_phrase
+
+    def accepts(self, audio):
+        """
+        True if an utterance should be sent to full recognition
+
+        That is the case when it contains the wake phrase, or when it follows a
+        wake phrase that was said on its own a moment ago.
+        """
+        keywords = getattr(audio, "keywords", None)
+        if keywords is None:
+            # Captured before the spotter was listening
+            return True
+        if self.wake_phrase in keywords:
+            return not getattr(audio, "wake_only", False)
+        if time.monotonic() - self.last_wake < WAKE_WINDOW_SECONDS:
+            # The window is good for one command
+            self.last_wake = 0.0
+            return True
+        return False
+
+    def strip_wake_phrase(self, text):
+        """Remove the wake phrase from a transcript"""
+        text = text.lower()
+        index = text.find(self.wake_phrase)
+        if index == -1:
+            return text
+        return (text[:index] + text[index + len(self.wake_phrase):]).strip(" ,")
+
+
+def create_keyword_spotter(model=None, model_path=None, **options):
+    """
+    Create a KeywordSpotter on a Vosk model, or return None if Vosk is not available
+
+    Args:
+        model: Already loaded vosk.Model to share, e.g. the one of the Vosk speech backend
+        model_path: Model directory to load if no model is given
+    """
+    if vosk is None:
+        logger.info("Keyword spotting disabled: the vosk package is not installed")
+        return None
+    if model is None:
+        model_path = model_path or VOSK_MODEL_PATH
+        if not os.path.isdir(model_path):
+            logger.info(f"Keyword spotting disabled: no Vosk model in {model_path!r}")
+            return None
+        vosk.SetLogLevel(-1)
+        model = vosk.Model(model_path)
+    return KeywordSpotter(lambda sample_rate, grammar: vosk.KaldiRecognizer(model, sample_rate, grammar), **options)
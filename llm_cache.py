@@ -0,0 +1,152 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Words that change the meaning of a command even though NLTK lists them as stopwords
+NEGATION_WORDS = {"no", "not", "nor", "don't", "dont"}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9'.\-]*")
+
+
+def fingerprint(*values):
+    """Stable hash of JSON-serializable values, used to detect changed command definitions"""
+    payload = json.dumps(values, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Disk-backed cache of LLM command interpretations.
+
+    Entries are keyed on a normalized utterance (lowercased, stopwords removed)
+    plus the hash of the system prompt that produced them. The cache keeps at
+    most `max_entries` in LRU order, drops entries older than `ttl` seconds and
+    discards everything when the command definitions fingerprint changes.
+    """
+
+    def __init__(self, cache_file='llm_cache.json', definitions_fingerprint="", stop_words=None,
+                 protected_words=None, max_entries=1000, ttl=7 * 24 * 3600):
+        self.cache_file = cache_file
+        self.definitions_fingerprint = definitions_fingerprint
+        self.stop_words = set(stop_words or ()) - set(protected_words or ()) - NEGATION_WORDS
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def normalize(self, utterance):
+        """Normalize an utterance so equivalent phrasings share a cache entry"""
+        tokens = TOKEN_PATTERN.findall(utterance.lower())
+        return " ".join(token.rstrip(".") for token in tokens if token not in self.stop_words)
+
+    def make_key(self, utterance, prompt_hash):
+        return f"{prompt_hash}:{self.normalize(utterance)}"
+
+    def get(self, utterance, prompt_hash):
+        """
+        Look up a cached interpretation
+
+        Args:
+            utterance: The user's command text
+            prompt_hash: Hash of the system prompt the interpretation was produced with
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        key = self.make_key(utterance, prompt_hash)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if time.time() - entry["created"] > self.ttl:
+                del self.entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+        logger.info(f"LLM cache hit for '{utterance}'")
+        return entry["value"]
+
+    def put(self, utterance, prompt_hash, value):
+        """Store an interpretation and persist the cache"""
+        key = self.make_key(utterance, prompt_hash)
+        with self.lock:
+            self.entries[key] = {"value": value, "created": time.time()}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        self.save()
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        self.save()
+
+    def stats(self):
+        """Return hit/miss statistics for the cache"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self.entries),
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def load(self):
+        """Load cached entries from file, dropping them if the command definitions changed"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading LLM cache: {e}")
+            return
+
+        if data.get("fingerprint") != self.definitions_fingerprint:
+            logger.info("Command definitions changed, invalidating LLM cache")
+            return
+
+        now = time.time()
+        entries = sorted(data.get("entries", {}).items(), key=lambda item: item[1].get("used", 0))
+        for key, entry in entries:
+            if now - entry["created"] <= self.ttl:
+                self.entries[key] = {"value": entry["value"], "created": entry["created"]}
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        logger.info(f"Loaded {len(self.entries)} cached LLM interpretations")
+
+    def save(self):
+        """Save the cache to file, preserving LRU order"""
+        if not self.cache_file:
+            return
+        with self.lock:
+            entries = {key: {"value": entry["value"], "created": entry["created"], "used": position}
+                       for position, (key, entry) in enumerate(self.entries.items())}
+        data = {"fingerprint": self.definitions_fingerprint, "entries": entries}
+        try:
+            temp_file = self.cache_file + ".tmp"
+            with open(temp_file, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_file, self.cache_file)
+        except Exception as e:
+            logger.error(f"Error saving LLM cache: {e}")
@@ -0,0 +1,366 @@
+import os
+import time
+import random
+import bisect
+import asyncio
+import logging
+import threading
+import concurrent.futures
+from collections import Counter
+import groq
+
+try:
+    import httpx
+except ImportError:  # Installed with groq; without it the SDK's default HTTP client is used
+    httpx = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Model used for every completion unless a call asks for another one
+LLM_MODEL = os.getenv("LLM_MODEL", "llama3-70b-8192")
+
+# Default deadline of a call in seconds, including retries
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "15"))
+
+# Completions allowed in flight at once; further calls wait for a slot within their deadline
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# Extra attempts for idempotent calls that failed with a transient error
+LLM_MAX_RETRIES = 2
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 5, 10, 30]
+
+# Errors worth retrying: connection problems, timeouts, rate limits and server errors
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "RateLimitError", "InternalServerError"}
+
+
+def is_retryable(error):
+    """True for transient errors that may succeed when the call is repeated"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(error).__name__ in RETRYABLE_ERRORS:
+        return True
+    status = getattr(error, "status_code", None)
+    return isinstance(status, int) and (status in (408, 409, 429) or status >= 500)
+
+
+class LLMMetrics:
+    """
+    Latency histogram, token counts and errors of the completions, per purpose.
+
+    Thread safe; `summary()` gives one line per purpose for the log.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = Counter()
+        self.histograms = {}
+        self.prompt_tokens = Counter()
+        self.completion_tokens = Counter()
+        self.errors = Counter()
+        self.retries = Counter()
+
+    def record(self, purpose, seconds, usage=None, error=None):
+        with self.lock:
+            self.calls[purpose] += 1
+            histogram = self.histograms.setdefault(purpose, [0] * (len(LATENCY_BUCKETS) + 1))
+            histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            if usage is not None:
+                prompt_tokens = getattr(usage, "prompt_tokens", None)
+                completion_tokens = getattr(usage, "completion_tokens", None)
+                if isinstance(prompt_tokens, int):
+                    self.prompt_tokens[purpose] += prompt_tokens
+                if isinstance(completion_tokens, int):
+                    self.completion_tokens[purpose] += completion_tokens
+            if error is not None:
+                self.errors[(purpose, type(error).__name__)] += 1
+
+    def record_retry(self, purpose):
+        with self.lock:
+            self.retries[purpose] += 1
+
+    def histogram(self, purpose):
+        """Number of calls per latency bucket, keyed by the bucket's upper bound ("inf" for the last)"""
+        with self.lock:
+            counts = list(self.histograms.get(purpose, [0] * (len(LATENCY_BUCKETS) + 1)))
+        return dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ["inf"], counts))
+
+    def summary(self):
+        with self.lock:
+            purposes = sorted(self.calls)
+        lines = []
+        for purpose in purposes:
+            buckets = " ".join(f"<={bound}s:{count}" for bound, count in self.histogram(purpose).items() if count)
+            errors = sum(count for (failed, _), count in self.errors.items() if failed == purpose)
+            lines.append(f"{purpose}: {self.calls[purpose]} calls [{buckets}], "
+                         f"{self.prompt_tokens[purpose]}+{self.completion_tokens[purpose]} tokens, "
+                         f"{errors} errors, {self.retries[purpose]} retries")
+        return "; ".join(lines) if lines else "no LLM calls"
+
+
+class LLMGateway:
+    """
+    The one path every LLM completion of the project goes through.
+
+    Holds a single Groq client on a pooled keep-alive HTTP connection, so
+    consecutive calls skip the TLS handshake. Each call has a deadline that
+    covers waiting for a concurrency slot, every attempt and the backoff
+    between them, so a hung request can no longer stall the voice loop.
+    Idempotent calls are retried with full-jitter exponential backoff on
+    transient errors; streams are never retried. Every call is recorded in
+    `metrics`.
+
+    Independent completions can run concurrently with `complete_concurrently`,
+    which drives the SDK's async client on an event loop thread owned by the
+    gateway; sync and async calls share the same concurrency slots.
+
+    Args:
+        api_key: Groq API key; without one the gateway is unavailable
+        client_factory: Creates the client from (api_key, timeout); the pooled Groq client by default
+        async_client_factory: Same for the async client, created on the event loop thread
+    """
+
+    def __init__(self, api_key=None, client_factory=None, model=LLM_MODEL, timeout=LLM_TIMEOUT,
+                 max_concurrency=LLM_MAX_CONCURRENCY, max_retries=LLM_MAX_RETRIES, backoff_seconds=0.25,
+                 async_client_factory=None):
+        self.api_key = api_key or os.getenv("GROQ_API_KEY")
+        self.async_client_factory = async_client_factory or self._create_async_client
+        self.async_client = None
+        self.loop = None
+        self.loop_lock = threading.Lock()
+        self.model = model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.metrics = LLMMetrics()
+        self.client = None
+        if self.api_key:
+            self.client = (client_factory or self._create_client)(self.api_key, timeout)
+        else:
+            logger.warning("GROQ_API_KEY not set. LLM functionality will be limited.")
+
+    @staticmethod
+    def _create_client(api_key, timeout):
+        options = {}
+        if httpx is not None:
+            options["http_client"] = httpx.Client(
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=LLM_MAX_CONCURRENCY, max_keepalive_connections=LLM_MAX_CONCURRENCY,
+                                    keepalive_expiry=60)
+            )
+        # Retries are done by the gateway, within the call's deadline
+        return groq.Client(api_key=api_key, timeout=timeout, max_retries=0, **options)
+
+    @staticmethod
+    def _create_async_client(api_key, timeout):
+        options = {}
+        if httpx is not None:
+            options["http_client"] = httpx.AsyncClient(
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=LLM_MAX_CONCURRENCY, max_keepalive_connections=LLM_MAX_CONCURRENCY,
+                                    keepalive_expiry=60)
+            )
+        return groq.AsyncClient(api_key=api_key, timeout=timeout, max_retries=0, **options)
+
+    @property
+    def available(self):
+        return self.client is not None
+
+    def complete(self, messages, purpose, temperature=0.2, max_tokens=None, timeout=None, idempotent=True):
+        """
+        Run a chat completion and return the text of the answer
+
+        Args:
+            messages: Chat messages as a list of role/content dictionaries
+            purpose: Name the call is recorded under in the metrics
+            timeout: Deadline for the whole call in seconds, the gateway default if None
+            idempotent: Whether the call may be repeated after a transient error
+
+        Raises:
+            RuntimeError if no API key is configured, TimeoutError if the deadline passes,
+            or the error of the last attempt
+        """
+        if not self.available:
+            raise RuntimeError("LLM gateway has no API key")
+        deadline = time.monotonic() + (timeout or self.timeout)
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                response = self._call(deadline, messages, temperature, max_tokens, stream=False)
+            except Exception as e:
+                delay = self._retry_delay(e, purpose, start, attempt, idempotent, deadline)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self.metrics.record(purpose, time.monotonic() - start, usage=getattr(response, "usage", None))
+            return response.choices[0].message.content.strip()
+
+    async def acomplete(self, messages, purpose, temperature=0.2, max_tokens=None, timeout=None, idempotent=True):
+        """Async version of complete(); must run on the gateway's event loop"""
+        if not self.available:
+            raise RuntimeError("LLM gateway has no API key")
+        deadline = time.monotonic() + (timeout or self.timeout)
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                response = await self._acall(deadline, messages, temperature, max_tokens)
+            except Exception as e:
+                delay = self._retry_delay(e, purpose, start, attempt, idempotent, deadline)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self.metrics.record(purpose, time.monotonic() - start, usage=getattr(response, "usage", None))
+            return response.choices[0].message.content.strip()
+
+    def complete_concurrently(self, calls, timeout=None, should_stop=None, poll_seconds=0.1):
+        """
+        Run independent completions at the same time and yield each result as it arrives
+
+        The wall-clock time is that of the slowest call rather than the sum
+        of all of them. Closing the generator early, or `should_stop`
+        returning True while results are awaited, cancels the calls that are
+        still running.
+
+        Args:
+            calls: Dictionary mapping a key to the keyword arguments of complete()
+            timeout: Deadline of each call, the gateway default if None
+            should_stop: Optional callable checked every `poll_seconds` while waiting
+            poll_seconds: How often should_stop is checked
+
+        Yields:
+            (key, text, error) tuples in order of completion; text is None if the call failed
+        """
+        loop = self._event_loop()
+        futures = {
+            asyncio.run_coroutine_threadsafe(self.acomplete(timeout=timeout, **call), loop): key
+            for key, call in calls.items()
+        }
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = concurrent.futures.wait(pending, timeout=poll_seconds if should_stop else None,
+                                                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    yield futures[future], None if error else future.result(), error
+                if should_stop and pending and should_stop():
+                    logger.info(f"Cancelling {len(pending)} LLM calls")
+                    return
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def stream(self, messages, purpose, temperature=0.2, max_tokens=None, timeout=None):
+        """
+        Run a streaming chat completion and yield the text deltas as they arrive
+
+        The concurrency slot is held until the generator is exhausted or
+        closed; closing it drops the connection so the model stops generating.
+        `timeout` bounds waiting for a slot and for each chunk.
+        """
+        if not self.available:
+            raise RuntimeError("LLM gateway has no API key")
+        deadline = time.monotonic() + (timeout or self.timeout)
+        start = time.monotonic()
+        try:
+            stream = self._call(deadline, messages, temperature, max_tokens, stream=True, release=False)
+        except Exception as e:
+            self.metrics.record(purpose, time.monotonic() - start, error=e)
+            raise
+        usage = None
+        error = None
+        try:
+            for chunk in stream:
+                extra = getattr(chunk, "x_groq", None)
+                usage = getattr(extra, "usage", None) or usage
+                if chunk.choices:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            stream.close()
+            self.slots.release()
+            self.metrics.record(purpose, time.monotonic() - start, usage=usage, error=error)
+
+    def _retry_delay(self, error, purpose, start, attempt, idempotent, deadline):
+        """Record a failed attempt; return the backoff before the next one, or None to give up"""
+        self.metrics.record(purpose, time.monotonic() - start, error=error)
+        delay = random.uniform(0, self.backoff_seconds * 2 ** attempt)
+        if not idempotent or attempt >= self.max_retries or not is_retryable(error) \
+                or time.monotonic() + delay >= deadline:
+            return None
+        self.metrics.record_retry(purpose)
+        logger.warning(f"LLM {purpose} call failed ({type(error).__name__}), retrying in {delay:.2f}s")
+        return delay
+
+    def _event_loop(self):
+        with self.loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="LLM-async", daemon=True).start()
+            return self.loop
+
+    async def _acall(self, deadline, messages, temperature, max_tokens):
+        # The slots are shared with the sync calls; polling keeps a cancelled call from holding one
+        while not self.slots.acquire(blocking=False):
+            if time.monotonic() >= deadline:
+                raise TimeoutError("No LLM slot became free before the deadline")
+            await asyncio.sleep(0.01)
+        try:
+            if self.async_client is None:
+                self.async_client = self.async_client_factory(self.api_key, self.timeout)
+            options = {"max_tokens": max_tokens} if max_tokens else {}
+            remaining = max(0.1, deadline - time.monotonic())
+            return await asyncio.wait_for(self.async_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                timeout=remaining,
+                **options
+            ), remaining)
+        finally:
+            self.slots.release()
+
+    def _call(self, deadline, messages, temperature, max_tokens, stream, release=True):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not self.slots.acquire(timeout=remaining):
+            raise TimeoutError("No LLM slot became free before the deadline")
+        try:
+            options = {"max_tokens": max_tokens} if max_tokens else {}
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temperature,
+                stream=stream,
+                timeout=max(0.1, deadline - time.monotonic()),
+                **options
+            )
+        except BaseException:
+            self.slots.release()
+            raise
+        if release:
+            self.slots.release()
+        return response
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway(api_key=None):
+    """Return the process-wide LLM gateway, creating it on first use"""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway(api_key)
+        return _gateway
@@ -0,0 +1,160 @@
+import re
+import logging
+from bs4 import Tag
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Elements whose text contributes to the score of their parent and grandparent
+SCORED_TAGS = {"p", "pre", "td", "blockquote"}
+
+# Base score of a candidate by tag, as in Readability
+TAG_SCORES = {
+    "article": 10, "div": 5, "main": 5, "section": 3, "pre": 3, "td": 3, "blockquote": 3,
+    "address": -3, "ol": -3, "ul": -3, "dl": -3, "dd": -3, "dt": -3, "li": -3, "form": -3,
+    "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+}
+
+# Class and id words that make an element more or less likely to hold the main content
+POSITIVE_NAMES = re.compile(r"article|body|content|entry|main|page|post|text|blog|story", re.IGNORECASE)
+NEGATIVE_NAMES = re.compile(
+    r"comment|footer|footnote|masthead|nav|sidebar|banner|cookie|consent|share|social|related|promo|"
+    r"advert|\bad[-_]|sponsor|popup|modal|menu|breadcrumb|subscribe|newsletter|widget", re.IGNORECASE)
+NAME_WEIGHT = 25
+
+# Elements that are never part of the main content
+UNLIKELY_TAGS = {"nav", "aside", "footer", "header", "form", "script", "style", "noscript", "template"}
+
+HEADING_TAGS = {"h1", "h2", "h3"}
+
+# Scored elements with less text are ignored
+MIN_TEXT_LENGTH = 25
+
+# Below this much text the scored region is probably not the real content
+MIN_CONTENT_LENGTH = 250
+
+
+def _names(element):
+    classes = element.get("class") or []
+    if isinstance(classes, str):
+        classes = [classes]
+    return " ".join(classes) + " " + (element.get("id") or "")
+
+
+def name_weight(element):
+    """Score adjustment from the element's class and id"""
+    names = _names(element)
+    weight = 0
+    if NEGATIVE_NAMES.search(names):
+        weight -= NAME_WEIGHT
+    if POSITIVE_NAMES.search(names):
+        weight += NAME_WEIGHT
+    return weight
+
+
+def _is_unlikely(element):
+    if element.name in UNLIKELY_TAGS:
+        return True
+    names = _names(element)
+    return bool(NEGATIVE_NAMES.search(names)) and not POSITIVE_NAMES.search(names) and element.name not in ("body", "html")
+
+
+def link_density(element):
+    """Share of an element's text that is inside links"""
+    text_length = len(element.get_text(strip=True))
+    if not text_length:
+        return 0.0
+    link_length = sum(len(link.get_text(strip=True)) for link in element.find_all("a"))
+    return min(1.0, link_length / text_length)
+
+
+def score_candidates(soup):
+    """
+    Score the elements that may hold the main content
+
+    Every paragraph-like element with enough text adds to the score of its
+    parent and, half as much, its grandparent; the score grows with the text
+    length and number of commas. Candidates start from a score based on their
+    tag and class/id names, and the total is scaled down by link density.
+
+    Returns:
+        Dictionary mapping id(element) to (element, final score). Tags compare
+        and hash by content, so the elements themselves cannot be keys.
+    """
+    scores = {}
+    unlikely_cache = {}
+
+    def inside_unlikely(element):
+        # Memoized per element, so each ancestor chain is only checked once
+        chain = []
+        result = False
+        while element is not None and isinstance(element, Tag):
+            if id(element) in unlikely_cache:
+                result = unlikely_cache[id(element)]
+                break
+            chain.append(element)
+            if _is_unlikely(element):
+                result = True
+                break
+            element = element.parent
+        for visited in chain:
+            unlikely_cache[id(visited)] = result
+        return result
+
+    for element in soup.find_all(SCORED_TAGS):
+        if inside_unlikely(element):
+            continue
+        text = element.get_text(" ", strip=True)
+        if len(text) < MIN_TEXT_LENGTH:
+            continue
+
+        content_score = 1 + text.count(",") + min(len(text) // 100, 3)
+        for depth, ancestor in enumerate((element.parent, element.parent.parent if element.parent else None)):
+            if not isinstance(ancestor, Tag) or ancestor.name in ("html", "[document]"):
+                break
+            if id(ancestor) not in scores:
+                scores[id(ancestor)] = [ancestor, TAG_SCORES.get(ancestor.name, 0) + name_weight(ancestor)]
+            scores[id(ancestor)][1] += content_score / (depth + 1)
+
+    return {key: (candidate, score * (1 - link_density(candidate))) for key, (candidate, score) in scores.items()}
+
+
+def find_main_content(soup):
+    """
+    Find the main content region of a page, Readability style
+
+    Returns the best scoring candidate together with sibling blocks that score
+    well or are long, link-poor paragraphs, plus the heading directly before
+    them, in document order. Returns an empty list if nothing scored or the
+    region holds too little text to be the main content.
+    """
+    scores = score_candidates(soup)
+    if not scores:
+        return []
+
+    top, top_score = max(scores.values(), key=lambda item: item[1])
+    threshold = max(10, top_score * 0.2)
+    parent = top.parent
+
+    blocks = []
+    siblings = [child for child in parent.children if isinstance(child, Tag)] if parent else [top]
+    for sibling in siblings:
+        if sibling is top:
+            blocks.append(sibling)
+        elif id(sibling) in scores and scores[id(sibling)][1] >= threshold:
+            blocks.append(sibling)
+        elif sibling.name == "p":
+            text = sibling.get_text(" ", strip=True)
+            if len(text) > 80 and link_density(sibling) < 0.25:
+                blocks.append(sibling)
+
+    if sum(len(block.get_text(strip=True)) for block in blocks) < MIN_CONTENT_LENGTH:
+        return []
+
+    # Keep the title when it sits just before the content instead of inside it
+    heading = blocks[0].find_previous_sibling()
+    if heading is not None and heading.name in HEADING_TAGS:
+        blocks.insert(0, heading)
+
+    logger.debug(f"Main content: <{top.name} class={top.get('class')}> score {top_score:.1f}, {len(blocks)} blocks")
+    return blocks
@@ -0,0 +1,159 @@
+import os
+import re
+import json
+import logging
+from prompt_registry import estimate_tokens
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Most tokens the page content of one prompt may use
+PAGE_INFO_TOKEN_BUDGET = int(os.getenv("PAGE_INFO_TOKEN_BUDGET", "1500"))
+
+# Longer strings are cut, names and titles rarely need more
+MAX_STRING_LENGTH = 160
+
+# Strings are never cut shorter than this while fitting the budget
+MIN_STRING_LENGTH = 40
+
+# Categories in order of precedence: an entry found in several keeps the first
+CATEGORY_ORDER = ["products", "videos", "music", "cards", "images", "links"]
+
+# Fields holding URLs, which cost many tokens and tell the LLM little
+URL_FIELDS = {"src", "href", "url"}
+
+# Fields naming an entry; entries with the same name in several categories are one element
+LABEL_FIELDS = ("name", "title", "alt", "text")
+
+URL_PATTERN = re.compile(r"^(https?:|//|data:|www\.)", re.IGNORECASE)
+
+# Compact JSON for prompts: no indentation or spaces after separators
+COMPACT_SEPARATORS = (",", ":")
+
+
+def _compact_string(value, max_length):
+    value = " ".join(value.split())
+    if len(value) > max_length:
+        value = value[:max_length - 1].rstrip() + "…"
+    return value
+
+
+def compact_entry(entry, max_length=MAX_STRING_LENGTH):
+    """
+    Copy of a page_info entry without URLs and empty fields, with long strings cut
+
+    Returns:
+        The compacted dictionary, or None if nothing worth sending is left
+    """
+    compacted = {}
+    for key, value in entry.items():
+        if key in URL_FIELDS or value is None:
+            continue
+        if isinstance(value, str):
+            if URL_PATTERN.match(value.strip()):
+                continue
+            value = _compact_string(value, max_length)
+            if not value:
+                continue
+        compacted[key] = value
+    return compacted or None
+
+
+def _label(entry):
+    for field in LABEL_FIELDS:
+        if entry.get(field):
+            return entry[field].lower()
+    return json.dumps(entry, sort_keys=True)
+
+
+def distinct_entries(page_info, categories):
+    """
+    Compacted entries of each category, each element once
+
+    An entry whose name already appeared, in the same or an earlier category
+    of `categories`, is dropped.
+
+    Returns:
+        Dictionary mapping each category to its distinct compacted entries
+    """
+    seen = set()
+    distinct = {}
+    for category in categories:
+        distinct[category] = []
+        for entry in page_info.get(category, []):
+            compacted = compact_entry(entry)
+            if compacted is None:
+                continue
+            label = _label(compacted)
+            if label in seen:
+                continue
+            seen.add(label)
+            distinct[category].append(compacted)
+    return distinct
+
+
+def count_distinct(page_info, category):
+    """Number of distinct entries of one category, as a prompt about that category alone counts them"""
+    return len(distinct_entries(page_info, [category])[category])
+
+
+def compact_page_info(page_info, categories=CATEGORY_ORDER, per_category=5, token_budget=PAGE_INFO_TOKEN_BUDGET,
+                      purpose="prompt"):
+    """
+    Reduce the entries of page_info to what a prompt needs, within a token budget
+
+    Entries are stripped of URLs and empty fields and their strings are cut.
+    An entry whose name already appeared, in the same or an earlier category,
+    is dropped, so an element matched as both product and card is sent once.
+    At most `per_category` entries are kept per category; while the compact
+    JSON is over `token_budget`, entries are taken from the longest category,
+    then strings are shortened.
+
+    Args:
+        page_info: Dictionary from analyze_page_structure
+        categories: page_info keys to compact, in order of precedence
+        per_category: Most entries sent per category
+        token_budget: Most tokens the JSON of all categories may use, by estimate_tokens
+        purpose: Name of the prompt in the log
+
+    Returns:
+        Dictionary with "items" (category to compacted entries), "counts" (category to the
+        number of distinct entries on the page), "tokens_before" and "tokens_after"
+    """
+    categories = sorted(categories, key=lambda category: CATEGORY_ORDER.index(category)
+                        if category in CATEGORY_ORDER else len(CATEGORY_ORDER))
+    # What the prompt used to carry: the first entries of each category, pretty printed
+    tokens_before = estimate_tokens(json.dumps(
+        {category: page_info.get(category, [])[:per_category] for category in categories}, indent=2))
+
+    distinct = distinct_entries(page_info, categories)
+    items = {category: entries[:per_category] for category, entries in distinct.items()}
+
+    def tokens():
+        return estimate_tokens(json.dumps(items, separators=COMPACT_SEPARATORS, ensure_ascii=False))
+
+    while tokens() > token_budget:
+        longest = max(items, key=lambda category: len(items[category]), default=None)
+        if longest is None or len(items[longest]) <= 1:
+            break
+        items[longest].pop()
+
+    max_length = MAX_STRING_LENGTH
+    while tokens() > token_budget and max_length > MIN_STRING_LENGTH:
+        max_length //= 2
+        items = {category: [compact_entry(entry, max_length) for entry in entries]
+                 for category, entries in items.items()}
+
+    tokens_after = tokens()
+    logger.info(f"Page info for {purpose}: ~{tokens_before} -> ~{tokens_after} tokens (budget {token_budget})")
+    return {
+        "items": items,
+        "counts": {category: len(entries) for category, entries in distinct.items()},
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after
+    }
+
+
+def to_prompt_json(entries):
+    """Entries as compact JSON for a prompt"""
+    return json.dumps(entries, separators=COMPACT_SEPARATORS, ensure_ascii=False)
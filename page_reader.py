@@ -0,0 +1,169 @@
+import logging
+from bs4 import Tag, NavigableString
+from page_snapshot import NON_TEXT_STRINGS
+from main_content import find_main_content
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Elements that start a new paragraph when spoken
+BLOCK_TAGS = {
+    "address", "article", "blockquote", "body", "dd", "div", "dl", "dt", "figcaption", "figure", "h1", "h2", "h3",
+    "h4", "h5", "h6", "header", "hr", "li", "main", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul", "br"
+}
+
+# Elements whose text is never read aloud
+SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg", "canvas", "nav", "aside", "footer", "form", "button", "select"}
+
+# Headings are always read, whatever their length
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+# Lines with fewer words are usually labels or menu entries, not content
+MIN_PARAGRAPH_WORDS = 4
+
+# Longest paragraph built from joined short blocks
+MAX_JOINED_WORDS = 40
+
+
+def main_content_root(soup):
+    """Return the element holding the main content: <main>, role=main, <article>, or the body"""
+    return (soup.find("main") or soup.find(attrs={"role": "main"}) or soup.find("article")
+            or soup.body or soup)
+
+
+def iter_paragraphs(root, min_words=MIN_PARAGRAPH_WORDS):
+    """
+    Yield the paragraphs under an element in document order
+
+    Text is collected while the tree is walked and flushed at every block
+    boundary, so only the paragraph being built is held on top of the parsed
+    tree and the first paragraph is yielded before the rest of `root` is walked.
+    Runs of short blocks, like the cells of a track list, are read together as
+    one comma separated paragraph; a lone short label is skipped, and so are
+    short blocks without letters, like track numbers and durations.
+
+    Args:
+        root: Element to read, usually main_content_root(soup)
+        min_words: Paragraphs with fewer words are skipped or joined with their neighbours
+    """
+    buffer = []
+    short_blocks = []
+    short_words = 0
+
+    def flush(heading=False):
+        nonlocal short_words
+        paragraph = " ".join("".join(buffer).split())
+        buffer.clear()
+        if not paragraph:
+            return []
+        words = len(paragraph.split())
+        if heading or words >= min_words:
+            paragraphs = [", ".join(short_blocks)] if short_words >= min_words else []
+            short_blocks.clear()
+            short_words = 0
+            return paragraphs + [paragraph]
+        if not any(character.isalpha() for character in paragraph):
+            return []
+        short_blocks.append(paragraph)
+        short_words += words
+        if short_words >= MAX_JOINED_WORDS:
+            paragraphs = [", ".join(short_blocks)]
+            short_blocks.clear()
+            short_words = 0
+            return paragraphs
+        return []
+
+    # Explicit stack of (element, children iterator) so deep pages do not hit the recursion limit
+    stack = [(root, iter(root.contents))]
+    while stack:
+        element, children = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if element.name in BLOCK_TAGS:
+                yield from flush(heading=element.name in HEADING_TAGS)
+            continue
+
+        if isinstance(child, Tag):
+            if child.name in SKIPPED_TAGS:
+                continue
+            if child.name in BLOCK_TAGS:
+                yield from flush()
+            stack.append((child, iter(child.contents)))
+        elif isinstance(child, NavigableString) and not isinstance(child, NON_TEXT_STRINGS):
+            buffer.append(child)
+
+    yield from flush()
+    if short_words >= min_words:
+        yield ", ".join(short_blocks)
+
+
+def main_content_blocks(soup):
+    """The scored main content blocks, or the main region if nothing scored"""
+    return find_main_content(soup) or [main_content_root(soup)]
+
+
+def iter_main_paragraphs(soup, blocks=None):
+    """
+    Yield the paragraphs of the main content
+
+    Args:
+        soup: Parsed page
+        blocks: main_content_blocks(soup) if already known; scoring them visits the whole page
+    """
+    for block in blocks if blocks is not None else main_content_blocks(soup):
+        yield from iter_paragraphs(block)
+
+
+def main_content_text(soup):
+    """Text of the main content with its headings, one paragraph per line"""
+    return "\n".join(iter_main_paragraphs(soup))
+
+
+class PageReader:
+    """
+    Reads the main content of the current page paragraph by paragraph.
+
+    Remembers how far it got on the current URL, so reading resumes from the
+    paragraph that was interrupted after "stop reading". Finishing the page or
+    moving to another URL starts over from the top.
+
+    The page comes already parsed from the shared snapshot. Finding the main
+    content scores every paragraph of the page, so it finishes before the
+    first paragraph is yielded; the result is kept on the snapshot, so
+    resuming does not score the page again. Paragraph text is then built
+    while the main content is walked, one paragraph at a time.
+    """
+
+    def __init__(self, snapshots):
+        self.snapshots = snapshots
+        self.url = None
+        self.position = 0
+
+    def can_resume(self, url):
+        """True if reading this URL stopped part way through"""
+        return url == self.url and self.position > 0
+
+    def paragraphs(self):
+        """Yield the paragraphs still to be read on the current page"""
+        snapshot = self.snapshots.current()
+        if snapshot.url != self.url:
+            self.url = snapshot.url
+            self.position = 0
+
+        start = self.position
+        if start:
+            logger.info(f"Resuming reading at paragraph {start + 1}")
+        blocks = snapshot.view("main content", lambda snapshot: main_content_blocks(snapshot.soup))
+        for index, paragraph in enumerate(iter_main_paragraphs(snapshot.soup, blocks)):
+            if index < start:
+                continue
+            # Saved before speaking, so an interrupted paragraph is read again on resume
+            self.position = index
+            yield paragraph
+
+        self.position = 0
+
+    def reset(self):
+        self.url = None
+        self.position = 0
@@ -0,0 +1,188 @@
+import time
+import logging
+from bs4 import BeautifulSoup, Comment, Declaration, Doctype, ProcessingInstruction
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# lxml parses large pages several times faster than the pure Python parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Strings that are not visible page text
+NON_TEXT_STRINGS = (Comment, Declaration, Doctype, ProcessingInstruction)
+NON_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+# Installs a MutationObserver that counts DOM changes and returns a fingerprint
+# of the current document. A new document (navigation or reload) gets a new id,
+# so the fingerprint changes even when the URL stays the same.
+#
+# Only structural changes are counted: elements added or removed, and changes
+# to src, href, alt and title. Text-only updates (tickers, clocks, counters)
+# and injected scripts, styles and meta tags are ignored, since they would
+# otherwise invalidate the snapshot on almost every call; a snapshot may
+# therefore carry slightly stale text. Pages that keep inserting elements,
+# such as rotating ad slots or infinite feeds, still change the fingerprint on
+# every call, and their snapshot is effectively never reused.
+DOM_FINGERPRINT_SCRIPT = """
+var state = window.__phonicflowSnapshot;
+if (!state) {
+    state = window.__phonicflowSnapshot = {
+        id: Date.now().toString(36) + Math.random().toString(36).slice(2),
+        mutations: 0
+    };
+    var ignored = {SCRIPT: 1, STYLE: 1, LINK: 1, META: 1, NOSCRIPT: 1};
+    var structural = function(nodes) {
+        for (var i = 0; i < nodes.length; i++) {
+            if (nodes[i].nodeType === 1 && !ignored[nodes[i].nodeName]) return true;
+        }
+        return false;
+    };
+    try {
+        new MutationObserver(function(records) {
+            for (var i = 0; i < records.length; i++) {
+                var record = records[i];
+                if (record.type === 'attributes' || structural(record.addedNodes) || structural(record.removedNodes)) {
+                    state.mutations++;
+                }
+            }
+        }).observe(document.documentElement, {
+            childList: true, subtree: true,
+            attributes: true, attributeFilter: ['src', 'href', 'alt', 'title']
+        });
+    } catch (e) {
+        state.observer_error = String(e);
+    }
+}
+return state.id + ':' + state.mutations + ':' + document.readyState;
+"""
+
+
+def visible_text(soup):
+    """
+    Extract readable text from a parsed page without modifying the tree
+
+    Skips scripts, styles, comments and other non-visible strings, then puts
+    each line and double-space separated phrase on its own line.
+    """
+    strings = []
+    for string in soup.find_all(string=True):
+        if isinstance(string, NON_TEXT_STRINGS) or string.parent.name in NON_TEXT_TAGS:
+            continue
+        strings.append(string)
+    text = "".join(strings)
+
+    # Break into lines and remove leading and trailing space on each
+    lines = (line.strip() for line in text.splitlines())
+
+    # Break multi-headlines into a line each
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+
+    # Drop blank lines
+    return '\n'.join(chunk for chunk in chunks if chunk)
+
+
+class PageSnapshot:
+    """
+    The page source of one document state, parsed at most once.
+
+    Views derived from the page (visible text, page structure, YouTube search
+    results) are built lazily on first use and cached on the snapshot, so every
+    feature that looks at the same page shares a single parse.
+    """
+
+    def __init__(self, url, fingerprint, page_source, parser=HTML_PARSER):
+        self.url = url
+        self.fingerprint = fingerprint
+        self.page_source = page_source
+        self.parser = parser
+        self.created = time.time()
+        self._soup = None
+        self._views = {}
+
+    @property
+    def soup(self):
+        """The parsed document; treat it as read-only since it is shared"""
+        if self._soup is None:
+            start = time.perf_counter()
+            self._soup = BeautifulSoup(self.page_source, self.parser)
+            logger.debug(f"Parsed {len(self.page_source)} bytes with {self.parser} in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return self._soup
+
+    @property
+    def title(self):
+        return self.soup.title.string if self.soup.title else None
+
+    @property
+    def text(self):
+        """Visible text of the page, one line per block"""
+        return self.view("text", lambda snapshot: visible_text(snapshot.soup))
+
+    def view(self, name, build):
+        """
+        Return a derived view of the page, building it on first use
+
+        Args:
+            name: Name the view is cached under
+            build: Callable taking this snapshot and returning the view
+        """
+        if name not in self._views:
+            self._views[name] = build(self)
+        return self._views[name]
+
+    def matches(self, url, fingerprint):
+        return self.url == url and fingerprint is not None and self.fingerprint == fingerprint
+
+    def __repr__(self):
+        return f"PageSnapshot({self.url!r}, {self.fingerprint!r}, views={sorted(self._views)})"
+
+
+class PageSnapshotCache:
+    """
+    Hands out the PageSnapshot for the driver's current page.
+
+    The snapshot is keyed on the URL plus a DOM fingerprint maintained by a
+    MutationObserver in the page, so it is replaced after navigation, reload or
+    a structural DOM change, and reused otherwise (see DOM_FINGERPRINT_SCRIPT
+    for what counts as a change).
+    """
+
+    def __init__(self, driver, parser=HTML_PARSER):
+        self.driver = driver
+        self.parser = parser
+        self.snapshot = None
+        self.hits = 0
+        self.misses = 0
+
+    def dom_fingerprint(self):
+        """Return the fingerprint of the current document, or None if it cannot be determined"""
+        try:
+            fingerprint = self.driver.execute_script(DOM_FINGERPRINT_SCRIPT)
+        except Exception as e:
+            logger.debug(f"Could not read DOM fingerprint: {e}")
+            return None
+        return fingerprint if isinstance(fingerprint, str) else None
+
+    def current(self):
+        """Return a snapshot of the current page, reusing the last one if the page is unchanged"""
+        url = self.driver.current_url
+        fingerprint = self.dom_fingerprint()
+        if self.snapshot is not None and self.snapshot.matches(url, fingerprint):
+            self.hits += 1
+            return self.snapshot
+
+        self.misses += 1
+        page_source = self.driver.page_source
+        # Fingerprint again after fetching the source, so changes made meanwhile are not cached
+        if fingerprint is not None and self.dom_fingerprint() != fingerprint:
+            fingerprint = None
+        self.snapshot = PageSnapshot(url, fingerprint, page_source, self.parser)
+        logger.debug(f"New page snapshot for {url} ({fingerprint})")
+        return self.snapshot
+
+    def invalidate(self):
+        """Drop the cached snapshot, e.g. after the assistant navigated or clicked"""
+        self.snapshot = None
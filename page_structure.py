@@ -0,0 +1,297 @@
+import logging
+from bs4 import Tag
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Maximum number of matched elements examined per category
+PRODUCT_LIMIT = 10
+VIDEO_LIMIT = 10
+CARD_LIMIT = 10
+MUSIC_LIMIT = 10
+IMAGE_LIMIT = 15
+LINK_LIMIT = 10
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4"}
+LINK_HEADING_TAGS = {"h1", "h2", "h3"}
+ICON_SIZES = {"16", "24", "32"}
+
+
+class NodeInfo:
+    """The tag, class and id tokens of one element, computed once per node"""
+
+    __slots__ = ("tag", "name", "classes", "class_attr", "id")
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.name = tag.name
+        classes = tag.get("class") or []
+        if isinstance(classes, str):
+            classes = classes.split()
+        self.classes = classes
+        self.class_attr = " ".join(classes)
+        self.id = tag.get("id") or ""
+
+    def class_contains(self, *needles):
+        """Equivalent of the CSS selector [class*=needle] for any of the needles"""
+        return any(needle in self.class_attr for needle in needles)
+
+    def has_class(self, *names):
+        """Equivalent of the CSS selector .name for any of the names"""
+        return any(name in self.classes for name in names)
+
+
+def _is_product(node):
+    # .product, [class*=product], [id*=product], .item, [data-component*=product]
+    return (node.class_contains("product") or "product" in node.id or node.has_class("item")
+            or "product" in (node.tag.get("data-component") or ""))
+
+
+def _is_video(node):
+    # video, [class*=video], [id*=video], iframe[src*=youtube], iframe[src*=vimeo]
+    if node.name == "video" or node.class_contains("video") or "video" in node.id:
+        return True
+    if node.name == "iframe":
+        src = node.tag.get("src") or ""
+        return "youtube" in src or "vimeo" in src
+    return False
+
+
+def _is_card(node):
+    # article, .card, [class*=card], .post, [class*=post], .item, [class*=item]
+    return node.name == "article" or node.class_contains("card", "post", "item")
+
+
+def _is_music(node):
+    # audio, [class*=track], [class*=song], [class*=music], [class*=playlist]
+    return node.name == "audio" or node.class_contains("track", "song", "music", "playlist")
+
+
+def _is_image(node):
+    # img[alt] without the common icon widths and heights
+    if node.name != "img" or node.tag.get("alt") is None:
+        return False
+    return node.tag.get("width") not in ICON_SIZES and node.tag.get("height") not in ICON_SIZES
+
+
+def _is_duration(node):
+    return node.class_contains("duration", "length", "time")
+
+
+# Field selectors run inside each matched container, as (field, predicate) pairs
+PRODUCT_FIELDS = (
+    ("name", lambda node: node.has_class("product-title", "name") or node.name in ("h2", "h3") or node.class_contains("title")),
+    ("price", lambda node: node.class_contains("price")),
+    ("seller", lambda node: node.class_contains("seller", "vendor")),
+    ("rating", lambda node: node.class_contains("rating") or node.has_class("stars")),
+    ("description", lambda node: node.class_contains("description")),
+)
+
+VIDEO_FIELDS = (
+    ("duration", _is_duration),
+    ("source", lambda node: node.name == "source"),
+)
+
+CARD_FIELDS = (
+    ("title", lambda node: node.name in HEADING_TAGS or node.class_contains("title", "heading")),
+    ("author", lambda node: node.class_contains("author", "byline")),
+    ("date", lambda node: node.name == "time" or node.class_contains("date", "time")),
+    ("summary", lambda node: node.name == "p" or node.class_contains("summary", "excerpt")),
+)
+
+MUSIC_FIELDS = (
+    ("title", lambda node: node.class_contains("title", "name")),
+    ("artist", lambda node: node.class_contains("artist", "singer")),
+    ("album", lambda node: node.class_contains("album")),
+    ("duration", _is_duration),
+)
+
+
+def _text(element):
+    """Safely extract text from an element that might be None"""
+    if element:
+        return element.get_text(strip=True)
+    return None
+
+
+class _Container:
+    """A matched product, video, card or music element collecting its first matching descendants"""
+
+    __slots__ = ("node", "fields", "found", "pending", "heading")
+
+    def __init__(self, node, fields, heading=None):
+        self.node = node
+        self.fields = fields
+        self.found = {}
+        self.pending = len(fields)
+        self.heading = heading
+
+    def visit(self, node):
+        for field, predicate in self.fields:
+            if field not in self.found and predicate(node):
+                self.found[field] = node.tag
+                self.pending -= 1
+
+
+def _product_info(container):
+    found = container.found
+    return {
+        "name": _text(found.get("name")),
+        "price": _text(found.get("price")),
+        "seller": _text(found.get("seller")),
+        "rating": _text(found.get("rating")),
+        "description": _text(found.get("description"))
+    }
+
+
+def _video_info(container):
+    video = container.node.tag
+    source = container.found.get("source")
+    return {
+        "title": video.get('title') or video.get('alt') or video.get('aria-label') or _text(container.heading),
+        "creator": None,
+        "duration": video.get('duration') or _text(container.found.get("duration")),
+        "src": video.get('src') or (source.get('src') if source else None)
+    }
+
+
+def _card_info(container):
+    found = container.found
+    return {
+        "title": _text(found.get("title")),
+        "author": _text(found.get("author")),
+        "date": _text(found.get("date")),
+        "summary": _text(found.get("summary"))
+    }
+
+
+def _music_info(container):
+    music = container.node.tag
+    found = container.found
+    return {
+        "title": _text(found.get("title")) or music.get('title') or music.get('aria-label'),
+        "artist": _text(found.get("artist")),
+        "album": _text(found.get("album")),
+        "duration": _text(found.get("duration"))
+    }
+
+
+def extract_page_structure(soup, url):
+    """
+    Extract products, videos, cards, music, images and links in a single walk of the tree
+
+    Every element is classified once by its tag, class and id tokens. Matched
+    containers stay open while their subtree is walked and pick up the first
+    descendant matching each of their fields, which is what select_one would
+    return. The walk stops as soon as every category has reached its limit and
+    no open container is still missing a field.
+
+    Args:
+        soup: Parsed BeautifulSoup document
+        url: URL of the page
+
+    Returns:
+        The page_info dictionary used by describe_page and describe_content_type
+    """
+    page_info = {
+        "title": soup.title.string if soup.title else "No title found",
+        "url": url,
+        "products": [],
+        "videos": [],
+        "articles": [],
+        "cards": [],
+        "music": [],
+        "images": [],
+        "links": []
+    }
+
+    products, videos, cards, music = [], [], [], []
+    image_count = link_count = 0
+    open_containers = []
+    open_anchors = 0
+    last_heading = None
+
+    def finished():
+        return (len(products) >= PRODUCT_LIMIT and len(videos) >= VIDEO_LIMIT and len(cards) >= CARD_LIMIT
+                and len(music) >= MUSIC_LIMIT and image_count >= IMAGE_LIMIT and link_count >= LINK_LIMIT
+                and not any(container.pending for container in open_containers))
+
+    # Explicit stack of (element, children iterator, containers opened, opened an anchor)
+    stack = [(soup, iter(soup.contents), 0, False)]
+    while stack:
+        element, children, opened, anchor = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            if opened:
+                del open_containers[-opened:]
+            if anchor:
+                open_anchors -= 1
+            continue
+        if not isinstance(child, Tag):
+            continue
+
+        node = NodeInfo(child)
+
+        # Fill the fields of every enclosing container (select_one semantics)
+        for container in open_containers:
+            if container.pending:
+                container.visit(node)
+
+        opened = 0
+        if len(products) < PRODUCT_LIMIT and _is_product(node):
+            products.append(_Container(node, PRODUCT_FIELDS))
+            open_containers.append(products[-1])
+            opened += 1
+        if len(videos) < VIDEO_LIMIT and _is_video(node):
+            # The title falls back to the closest heading before the video (find_previous semantics)
+            videos.append(_Container(node, VIDEO_FIELDS, heading=last_heading))
+            open_containers.append(videos[-1])
+            opened += 1
+        if len(cards) < CARD_LIMIT and _is_card(node):
+            cards.append(_Container(node, CARD_FIELDS))
+            open_containers.append(cards[-1])
+            opened += 1
+        if len(music) < MUSIC_LIMIT and _is_music(node):
+            music.append(_Container(node, MUSIC_FIELDS))
+            open_containers.append(music[-1])
+            opened += 1
+
+        if image_count < IMAGE_LIMIT and _is_image(node):
+            image_count += 1
+            alt = child.get('alt')
+            if alt and alt.strip():
+                page_info["images"].append({"alt": alt, "src": child.get('src')})
+
+        # Headings inside real links, and anchors explicitly marked as main links
+        if link_count < LINK_LIMIT and ((node.name in LINK_HEADING_TAGS and open_anchors)
+                                         or (node.name == "a" and node.has_class("main-link", "primary-link"))):
+            link_count += 1
+            text = child.get_text(strip=True)
+            if text:
+                page_info["links"].append({"text": text, "href": child.get('href')})
+
+        if node.name in HEADING_TAGS:
+            last_heading = child
+
+        anchor = False
+        if node.name == "a":
+            href = child.get("href")
+            anchor = href is not None and href != "" and not href.startswith("#")
+            if anchor:
+                open_anchors += 1
+
+        stack.append((child, iter(child.contents), opened, anchor))
+
+        if finished():
+            logger.debug("All page structure categories filled, stopping walk early")
+            break
+
+    for containers, key, build in ((products, "products", _product_info), (videos, "videos", _video_info),
+                                   (cards, "cards", _card_info), (music, "music", _music_info)):
+        for container in containers:
+            info = build(container)
+            if any(info.values()):
+                page_info[key].append(info)
+
+    return page_info
@@ -0,0 +1,265 @@
+import json
+import logging
+from page_structure import PRODUCT_LIMIT, VIDEO_LIMIT, CARD_LIMIT, MUSIC_LIMIT, IMAGE_LIMIT, LINK_LIMIT
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Runs the extractor installed by EXTRACTOR_SCRIPT, or returns null if this document does not have it yet
+CALL_EXTRACTOR_SCRIPT = """
+var extract = window.__phonicflowExtractPageStructure;
+return extract ? extract(arguments[0]) : null;
+"""
+
+# In-browser port of page_structure.extract_page_structure. It walks the live
+# DOM once with the same classification rules and returns the page_info as a
+# compact JSON string, so only the extracted fields cross the WebDriver wire.
+EXTRACTOR_SCRIPT = """
+window.__phonicflowExtractPageStructure = function(limits) {
+    var HEADING_TAGS = {h1: 1, h2: 1, h3: 1, h4: 1};
+    var LINK_HEADING_TAGS = {h1: 1, h2: 1, h3: 1};
+    var ICON_SIZES = {'16': 1, '24': 1, '32': 1};
+    var SKIPPED_TEXT = {script: 1, style: 1, template: 1, rt: 1, rp: 1};
+
+    function attr(el, name) {
+        return el.hasAttribute(name) ? el.getAttribute(name) : null;
+    }
+
+    // BeautifulSoup get_text(strip=True): stripped text nodes joined without separator,
+    // skipping the strings BeautifulSoup keeps in special containers (scripts, styles, ruby text)
+    function text(el) {
+        if (!el) return null;
+        var parts = [];
+        var walker = document.createTreeWalker(el, NodeFilter.SHOW_TEXT | NodeFilter.SHOW_CDATA_SECTION);
+        var node;
+        while ((node = walker.nextNode())) {
+            if (SKIPPED_TEXT[node.parentNode.localName]) continue;
+            var value = node.data.trim();
+            if (value) parts.push(value);
+        }
+        return parts.join('');
+    }
+
+    // BeautifulSoup .string: the text of an element with a single (nested) text child
+    function singleString(el) {
+        while (el.childNodes.length === 1) {
+            var child = el.childNodes[0];
+            if (child.nodeType === Node.TEXT_NODE) return child.data;
+            if (child.nodeType !== Node.ELEMENT_NODE) return null;
+            el = child;
+        }
+        return null;
+    }
+
+    function info(el) {
+        var classAttr = el.getAttribute('class') || '';
+        var classes = classAttr.split(/\\s+/).filter(Boolean);
+        return {el: el, name: el.localName, classes: classes, classAttr: classes.join(' '), id: el.getAttribute('id') || ''};
+    }
+    function classContains(node) {
+        for (var i = 1; i < arguments.length; i++) if (node.classAttr.indexOf(arguments[i]) !== -1) return true;
+        return false;
+    }
+    function hasClass(node) {
+        for (var i = 1; i < arguments.length; i++) if (node.classes.indexOf(arguments[i]) !== -1) return true;
+        return false;
+    }
+
+    function isProduct(n) {
+        return classContains(n, 'product') || n.id.indexOf('product') !== -1 || hasClass(n, 'item') ||
+            (attr(n.el, 'data-component') || '').indexOf('product') !== -1;
+    }
+    function isVideo(n) {
+        if (n.name === 'video' || classContains(n, 'video') || n.id.indexOf('video') !== -1) return true;
+        if (n.name === 'iframe') {
+            var src = attr(n.el, 'src') || '';
+            return src.indexOf('youtube') !== -1 || src.indexOf('vimeo') !== -1;
+        }
+        return false;
+    }
+    function isCard(n) { return n.name === 'article' || classContains(n, 'card', 'post', 'item'); }
+    function isMusic(n) { return n.name === 'audio' || classContains(n, 'track', 'song', 'music', 'playlist'); }
+    function isImage(n) {
+        if (n.name !== 'img' || attr(n.el, 'alt') === null) return false;
+        return !ICON_SIZES[attr(n.el, 'width')] && !ICON_SIZES[attr(n.el, 'height')];
+    }
+    function isDuration(n) { return classContains(n, 'duration', 'length', 'time'); }
+
+    var PRODUCT_FIELDS = [
+        ['name', function(n) { return hasClass(n, 'product-title', 'name') || n.name === 'h2' || n.name === 'h3' || classContains(n, 'title'); }],
+        ['price', function(n) { return classContains(n, 'price'); }],
+        ['seller', function(n) { return classContains(n, 'seller', 'vendor'); }],
+        ['rating', function(n) { return classContains(n, 'rating') || hasClass(n, 'stars'); }],
+        ['description', function(n) { return classContains(n, 'description'); }]
+    ];
+    var VIDEO_FIELDS = [
+        ['duration', isDuration],
+        ['source', function(n) { return n.name === 'source'; }]
+    ];
+    var CARD_FIELDS = [
+        ['title', function(n) { return HEADING_TAGS[n.name] === 1 || classContains(n, 'title', 'heading'); }],
+        ['author', function(n) { return classContains(n, 'author', 'byline'); }],
+        ['date', function(n) { return n.name === 'time' || classContains(n, 'date', 'time'); }],
+        ['summary', function(n) { return n.name === 'p' || classContains(n, 'summary', 'excerpt'); }]
+    ];
+    var MUSIC_FIELDS = [
+        ['title', function(n) { return classContains(n, 'title', 'name'); }],
+        ['artist', function(n) { return classContains(n, 'artist', 'singer'); }],
+        ['album', function(n) { return classContains(n, 'album'); }],
+        ['duration', isDuration]
+    ];
+
+    function container(node, fields, heading) {
+        return {node: node, fields: fields, found: {}, pending: fields.length, heading: heading};
+    }
+    function visit(c, node) {
+        for (var i = 0; i < c.fields.length; i++) {
+            var field = c.fields[i][0];
+            if (!(field in c.found) && c.fields[i][1](node)) {
+                c.found[field] = node.el;
+                c.pending--;
+            }
+        }
+    }
+
+    var titleEl = document.getElementsByTagName('title')[0];
+    var pageInfo = {
+        title: titleEl ? singleString(titleEl) : 'No title found',
+        products: [], videos: [], articles: [], cards: [], music: [], images: [], links: []
+    };
+    var products = [], videos = [], cards = [], music = [];
+    var imageCount = 0, linkCount = 0, openAnchors = 0, lastHeading = null;
+    var open = [];
+
+    function finished() {
+        if (products.length < limits.products || videos.length < limits.videos || cards.length < limits.cards ||
+            music.length < limits.music || imageCount < limits.images || linkCount < limits.links) return false;
+        for (var i = 0; i < open.length; i++) if (open[i].pending) return false;
+        return true;
+    }
+
+    // Explicit stack walk in document order, mirroring the Python extractor
+    var stack = [{el: document, child: document.firstElementChild, opened: 0, anchor: false}];
+    while (stack.length) {
+        var frame = stack[stack.length - 1];
+        var el = frame.child;
+        if (!el) {
+            stack.pop();
+            open.length -= frame.opened;
+            if (frame.anchor) openAnchors--;
+            continue;
+        }
+        frame.child = el.nextElementSibling;
+
+        var node = info(el);
+        for (var i = 0; i < open.length; i++) if (open[i].pending) visit(open[i], node);
+
+        var opened = 0;
+        if (products.length < limits.products && isProduct(node)) { products.push(container(node, PRODUCT_FIELDS)); open.push(products[products.length - 1]); opened++; }
+        if (videos.length < limits.videos && isVideo(node)) { videos.push(container(node, VIDEO_FIELDS, lastHeading)); open.push(videos[videos.length - 1]); opened++; }
+        if (cards.length < limits.cards && isCard(node)) { cards.push(container(node, CARD_FIELDS)); open.push(cards[cards.length - 1]); opened++; }
+        if (music.length < limits.music && isMusic(node)) { music.push(container(node, MUSIC_FIELDS)); open.push(music[music.length - 1]); opened++; }
+
+        if (imageCount < limits.images && isImage(node)) {
+            imageCount++;
+            var alt = attr(el, 'alt');
+            if (alt && alt.trim()) pageInfo.images.push({alt: alt, src: attr(el, 'src')});
+        }
+
+        if (linkCount < limits.links && ((LINK_HEADING_TAGS[node.name] && openAnchors) ||
+                                         (node.name === 'a' && hasClass(node, 'main-link', 'primary-link')))) {
+            linkCount++;
+            var linkText = text(el);
+            if (linkText) pageInfo.links.push({text: linkText, href: attr(el, 'href')});
+        }
+
+        if (HEADING_TAGS[node.name]) lastHeading = el;
+
+        var anchor = false;
+        if (node.name === 'a') {
+            var href = attr(el, 'href');
+            anchor = href !== null && href !== '' && href.charAt(0) !== '#';
+            if (anchor) openAnchors++;
+        }
+
+        // Template contents live in a separate fragment in the live DOM and are not walked
+        stack.push({el: el, child: el.firstElementChild, opened: opened, anchor: anchor});
+
+        if (finished()) break;
+    }
+
+    function any(obj) {
+        for (var key in obj) if (obj[key]) return true;
+        return false;
+    }
+    function or() {
+        for (var i = 0; i < arguments.length; i++) if (arguments[i]) return arguments[i];
+        return arguments[arguments.length - 1];
+    }
+
+    products.forEach(function(c) {
+        var item = {name: text(c.found.name), price: text(c.found.price), seller: text(c.found.seller),
+                    rating: text(c.found.rating), description: text(c.found.description)};
+        if (any(item)) pageInfo.products.push(item);
+    });
+    videos.forEach(function(c) {
+        var video = c.node.el, source = c.found.source;
+        var item = {
+            title: or(attr(video, 'title'), attr(video, 'alt'), attr(video, 'aria-label'), text(c.heading)),
+            creator: null,
+            duration: or(attr(video, 'duration'), text(c.found.duration)),
+            src: or(attr(video, 'src'), source ? attr(source, 'src') : null)
+        };
+        if (any(item)) pageInfo.videos.push(item);
+    });
+    cards.forEach(function(c) {
+        var item = {title: text(c.found.title), author: text(c.found.author), date: text(c.found.date), summary: text(c.found.summary)};
+        if (any(item)) pageInfo.cards.push(item);
+    });
+    music.forEach(function(c) {
+        var el = c.node.el;
+        var item = {title: or(text(c.found.title), attr(el, 'title'), attr(el, 'aria-label')), artist: text(c.found.artist),
+                    album: text(c.found.album), duration: text(c.found.duration)};
+        if (any(item)) pageInfo.music.push(item);
+    });
+
+    return JSON.stringify(pageInfo);
+};
+"""
+
+# Category limits passed to the in-browser extractor
+LIMITS = {
+    "products": PRODUCT_LIMIT,
+    "videos": VIDEO_LIMIT,
+    "cards": CARD_LIMIT,
+    "music": MUSIC_LIMIT,
+    "images": IMAGE_LIMIT,
+    "links": LINK_LIMIT,
+}
+
+
+def extract_page_structure_in_browser(driver):
+    """
+    Extract the page_info dictionary inside the browser
+
+    Installs the extractor in the current document on first use and calls it
+    with a short script afterwards; a new document gets it installed again.
+
+    Args:
+        driver: Selenium webdriver instance
+
+    Returns:
+        The same page_info dictionary as page_structure.extract_page_structure
+    """
+    result = driver.execute_script(CALL_EXTRACTOR_SCRIPT, LIMITS)
+    if result is None:
+        logger.debug("Installing page structure extractor in the current document")
+        result = driver.execute_script(EXTRACTOR_SCRIPT + CALL_EXTRACTOR_SCRIPT, LIMITS)
+    if not isinstance(result, str):
+        raise ValueError(f"Unexpected result from the page structure extractor: {type(result).__name__}")
+
+    extracted = json.loads(result)
+    page_info = {"title": extracted["title"], "url": driver.current_url}
+    for key in ("products", "videos", "articles", "cards", "music", "images", "links"):
+        page_info[key] = extracted[key]
+    return page_info
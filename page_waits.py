@@ -0,0 +1,152 @@
+import json
+import time
+import logging
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Document states in which the page can be read and clicked
+USABLE_STATES = ("interactive", "complete")
+
+# Fallback when the DevTools performance log is not enabled: the number of
+# resources the page has requested so far
+RESOURCE_COUNT_SCRIPT = "return performance.getEntriesByType('resource').length;"
+
+
+def enable_network_log(chrome_options):
+    """
+    Ask Chrome for the DevTools performance log, which the network idle check reads
+
+    Args:
+        chrome_options: selenium ChromeOptions to update before the driver is created
+    """
+    chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+
+class PageWaiter:
+    """
+    Waits until a page is usable instead of sleeping for a fixed time.
+
+    A wait returns as soon as the document is interactive, an optional
+    element condition holds and, if asked for, the network has gone quiet.
+    Network activity is followed through the Chrome DevTools performance log:
+    the network is idle when at most `max_inflight` requests have been open
+    for `idle_seconds`, which tolerates analytics beacons and long polls.
+    Without the log, the resource timing count of the page has to stay the
+    same for `idle_seconds` instead.
+
+    Every wait is logged with its duration and the time saved over the fixed
+    sleep it replaces, and kept in `timings`.
+
+    Args:
+        driver: Selenium WebDriver instance
+        timeout: Longest a wait may take, in seconds
+    """
+
+    def __init__(self, driver, timeout=10, poll_seconds=0.05, idle_seconds=0.5, max_inflight=2):
+        self.driver = driver
+        self.timeout = timeout
+        self.poll_seconds = poll_seconds
+        self.idle_seconds = idle_seconds
+        self.max_inflight = max_inflight
+        self.inflight = set()
+        self.network_log = True
+        self.timings = []
+
+    def ready(self, label, replaces=0.0, condition=None, network_idle=False, timeout=None):
+        """
+        Wait until the current page is usable
+
+        Args:
+            label: Name of the wait in the timing log
+            replaces: Seconds of the fixed sleep this wait replaces, to report the time saved
+            condition: Optional callable taking the driver, e.g. a selenium expected condition;
+                the page is usable once it returns something truthy
+            network_idle: Also wait until the network has gone quiet
+            timeout: Overrides the default timeout for this wait
+
+        Returns:
+            True if the page became usable, False if the wait timed out
+        """
+        start = time.monotonic()
+        deadline = start + (timeout if timeout is not None else self.timeout)
+
+        ready = self._poll(deadline, self._document_usable)
+        if ready and condition is not None:
+            ready = self._poll(deadline, condition)
+        if ready and network_idle:
+            ready = self._network_idle(deadline)
+
+        elapsed = time.monotonic() - start
+        saved = replaces - elapsed
+        self.timings.append((label, elapsed, saved))
+        if ready:
+            logger.info(f"{label} ready in {elapsed:.2f}s ({saved:+.2f}s against a fixed {replaces:.1f}s wait)")
+        else:
+            logger.warning(f"{label} not ready after {elapsed:.2f}s, continuing anyway")
+        return ready
+
+    def _poll(self, deadline, check):
+        while True:
+            try:
+                if check(self.driver):
+                    return True
+            except Exception as e:
+                # The page may be replaced while it is checked
+                logger.debug(f"Page check failed: {e}")
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.poll_seconds)
+
+    @staticmethod
+    def _document_usable(driver):
+        return driver.execute_script("return document.readyState;") in USABLE_STATES
+
+    def _network_idle(self, deadline):
+        quiet_since = None
+        last_count = None
+        while True:
+            now = time.monotonic()
+            if self.network_log:
+                busy = self._read_network_log() > self.max_inflight
+            else:
+                try:
+                    count = self.driver.execute_script(RESOURCE_COUNT_SCRIPT)
+                except Exception as e:
+                    logger.debug(f"Could not count page resources: {e}")
+                    count = None
+                busy = count != last_count
+                last_count = count
+
+            if busy:
+                quiet_since = None
+            elif quiet_since is None:
+                quiet_since = now
+            elif now - quiet_since >= self.idle_seconds:
+                return True
+
+            if now >= deadline:
+                return False
+            time.sleep(self.poll_seconds)
+
+    def _read_network_log(self):
+        """Apply the pending DevTools network events and return the number of open requests"""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logger.info(f"DevTools performance log unavailable, using resource timing instead: {e}")
+            self.network_log = False
+            return 0
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get("method")
+            request_id = message.get("params", {}).get("requestId")
+            if method == "Network.requestWillBeSent":
+                self.inflight.add(request_id)
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                self.inflight.discard(request_id)
+        return len(self.inflight)
@@ -0,0 +1,126 @@
+import json
+import queue
+import logging
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Largest event body accepted from the page
+MAX_EVENT_BYTES = 16 * 1024
+
+
+class PanelEventBridge:
+    """
+    Local HTTP endpoint the injected panel posts its events to.
+
+    Listens on 127.0.0.1 on a free port; the page sends each event as soon as
+    it happens, so nothing is polled while the panel is idle. Every event
+    carries a random token known only to the injected script, so other pages
+    cannot drive the browser through the port. Events are handled in arrival
+    order on one worker thread, and the HTTP request returns immediately.
+
+    Args:
+        handlers: Dictionary mapping event type to a callable taking the event dictionary
+    """
+
+    def __init__(self, handlers, host="127.0.0.1", port=0):
+        self.handlers = handlers
+        self.token = secrets.token_urlsafe(16)
+        self.events = queue.Queue()
+        self.received = 0
+        self.rejected = 0
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.url = f"http://{host}:{self.server.server_address[1]}/event"
+        self.threads = []
+
+    def start(self):
+        for name, target in (("PanelBridge-http", self.server.serve_forever), ("PanelBridge-events", self._dispatch)):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        logger.info(f"Panel event bridge listening on {self.url}")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.events.put(None)
+
+    def post_script(self):
+        """
+        JavaScript defining window.postPanelEvent(event) for the injected page
+
+        The body is sent as text/plain, which is a simple CORS request, so the
+        event is delivered with a single request and no preflight.
+        """
+        return f"""
+            window.postPanelEvent = function(event) {{
+                event.token = {json.dumps(self.token)};
+                return fetch({json.dumps(self.url)}, {{
+                    method: 'POST',
+                    headers: {{'Content-Type': 'text/plain'}},
+                    body: JSON.stringify(event)
+                }}).catch(function(error) {{
+                    console.error('Browser Assistant bridge unavailable', error);
+                }});
+            }};
+        """
+
+    def accept(self, body):
+        """Validate a posted event and queue it; returns the HTTP status"""
+        try:
+            event = json.loads(body)
+        except ValueError:
+            return 400
+        if not isinstance(event, dict) or not secrets.compare_digest(str(event.get("token", "")), self.token):
+            self.rejected += 1
+            return 403
+        if event.get("type") not in self.handlers:
+            return 404
+        self.received += 1
+        self.events.put(event)
+        return 204
+
+    def _dispatch(self):
+        while True:
+            event = self.events.get()
+            if event is None:
+                break
+            try:
+                self.handlers[event["type"]](event)
+            except Exception as e:
+                logger.error(f"Error handling panel event {event['type']}: {e}")
+
+    def _handler_class(self):
+        bridge = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _cors(self):
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.send_header("Access-Control-Allow-Methods", "POST")
+                self.send_header("Access-Control-Allow-Headers", "Content-Type")
+                # Chrome asks before public pages may reach a local address
+                self.send_header("Access-Control-Allow-Private-Network", "true")
+
+            def do_OPTIONS(self):
+                self.send_response(204)
+                self._cors()
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if self.path != "/event" or length > MAX_EVENT_BYTES:
+                    status = 404 if self.path != "/event" else 413
+                else:
+                    status = bridge.accept(self.rfile.read(length))
+                self.send_response(status)
+                self._cors()
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                logger.debug("Panel bridge: " + format % args)
+
+        return Handler
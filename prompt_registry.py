@@ -0,0 +1,207 @@
+import re
+import hashlib
+import logging
+import textwrap
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Word pieces for the local token estimator: letters, digits and single punctuation marks
+TOKEN_PIECES = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text):
+    """
+    Fast local estimate of how many LLM tokens a text uses
+
+    Counts words, numbers and punctuation marks; long words count as several
+    tokens, as they are split by BPE tokenizers.
+    """
+    if not text:
+        return 0
+    return sum(1 + (len(piece) - 1) // 6 for piece in TOKEN_PIECES.findall(text))
+
+
+class Prompt:
+    """
+    An immutable, prebuilt prompt.
+
+    Exposes a stable hash of its text, a token estimate and a cache key that
+    combines the prompt name, version and hash.
+    """
+
+    __slots__ = ("name", "version", "text", "sha256", "token_estimate")
+
+    def __init__(self, name, version, text):
+        text = textwrap.dedent(text).strip()
+        object.__setattr__(self, "name", name)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "text", text)
+        object.__setattr__(self, "sha256", hashlib.sha256(text.encode("utf-8")).hexdigest())
+        object.__setattr__(self, "token_estimate", estimate_tokens(text))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Prompt objects are immutable")
+
+    @property
+    def key(self):
+        """Identifier for caches: changes whenever the prompt text or version changes"""
+        return f"{self.name}@v{self.version}:{self.sha256[:12]}"
+
+    def render(self, **values):
+        """Fill the placeholders of a template prompt"""
+        return self.text.format(**values)
+
+    def __repr__(self):
+        return f"Prompt({self.key!r}, ~{self.token_estimate} tokens)"
+
+
+# All prompts, keyed by name
+PROMPTS = {}
+
+
+def register_prompt(name, version, text):
+    """Build a prompt once and register it under its name"""
+    prompt = Prompt(name, version, text)
+    existing = PROMPTS.get(name)
+    if existing is not None and existing.sha256 != prompt.sha256 and existing.version == version:
+        logger.warning(f"Prompt '{name}' changed without a version bump")
+    PROMPTS[name] = prompt
+    logger.debug(f"Registered {prompt!r}")
+    return prompt
+
+
+def get_prompt(name):
+    """Return the registered prompt with the given name"""
+    return PROMPTS[name]
+
+
+def build_command_interpreter_prompt(supported_commands, command_examples):
+    """Build the system prompt used to interpret voice commands"""
+    examples = "\n".join(f"{command}: {', '.join(phrases)}" for command, phrases in command_examples.items())
+    return (
+        "You are an assistant that interprets natural language commands for a voice-controlled browser.\n"
+        "Your task is to analyze the user's query and determine which command they want to execute.\n"
+        "\n"
+        "Here are the supported commands:\n"
+        f"{', '.join(supported_commands)}\n"
+        "\n"
+        "Some example phrasings for each command:\n"
+        f"{examples}\n"
+        + textwrap.dedent("""
+        Respond with a JSON object in the following format:
+        {
+          "command": "The matched command name from the list above",
+          "parameters": {
+            "param1": "value1",
+            "param2": "value2"
+          }
+        }
+
+        Examples:
+        User: "Open Google"
+        Response: {"command": "Open website", "parameters": {"website": "google.com"}}
+
+        User: "I want to watch some videos"
+        Response: {"command": "Open category website", "parameters": {"category": "videos"}}
+
+        User: "Set my shopping favorite to Amazon"
+        Response: {"command": "Set favorite category", "parameters": {"category": "shopping", "website": "amazon.com"}}
+
+        User: "Tell me what's on this page"
+        Response: {"command": "Describe page", "parameters": {}}
+
+        DO NOT include any explanation, just the JSON object.
+        """)
+    )
+
+
+# System prompt for AdvancedPageAnalyzer.analyze_with_llm
+PAGE_ANALYSIS_SYSTEM = register_prompt("page_analysis.system", 1, """
+    You are a specialized web page analyzer that can identify and categorize content on websites.
+    Analyze the provided website content and identify the following elements:
+
+    1. Products - with details about name, price, seller, ratings
+    2. Videos - with details about title, creator, duration
+    3. Music/Audio tracks - with details about title, artist, album
+    4. Articles/Blog posts - with title, author, date
+    5. Images - with description of what they show (from alt text)
+    6. Interactive elements - buttons, forms, etc.
+
+    For each category, provide structured information in a conversational format that describes what's on the page.
+    If you detect a specific type of website (e-commerce, video platform, news site, etc.), mention that.
+
+    Return your analysis in a JSON format with a 'description' field containing a conversational summary,
+    and a 'structured_data' field containing categorized elements.
+""")
+
+# User prompt template for AdvancedPageAnalyzer.analyze_with_llm
+PAGE_ANALYSIS_USER = register_prompt("page_analysis.user", 1, """
+    Website: {url}
+    Title: {title}
+
+    Here's what I've detected so far:
+
+    Products ({product_count}):
+    {products}
+
+    Videos ({video_count}):
+    {videos}
+
+    Articles/Cards ({card_count}):
+    {cards}
+
+    Music ({music_count}):
+    {music}
+
+    Images ({image_count}):
+    {images}
+
+    Links ({link_count}):
+    {links}
+
+    Based on this information, provide an enhanced analysis of what's on this page.
+    Add any insights about the type of website, what it's selling or offering, and the main content.
+    For e-commerce sites, describe the products in more detail.
+    For video platforms, identify the main themes of videos.
+    For music sites, describe the music collection.
+    For news/blog sites, summarize the article topics.
+""")
+
+# Content types VoiceBrowserControl.describe_content_type can describe
+CONTENT_TYPES = ["products", "videos", "images", "music", "articles", "links"]
+
+# System prompts for VoiceBrowserControl.describe_content_type, one per content type
+CONTENT_DESCRIPTION_SYSTEM = {
+    content_type: register_prompt(f"content_description.system.{content_type}", 1, f"""
+        You are a specialized web content analyzer. For the given {content_type} information from a webpage,
+        provide a detailed, conversational description of these {content_type}.
+        Focus only on the {content_type} and their characteristics.
+    """)
+    for content_type in CONTENT_TYPES
+}
+
+# User prompt template for VoiceBrowserControl.describe_content_type
+CONTENT_DESCRIPTION_USER = register_prompt("content_description.user", 1, """
+    I found {count} {content_type} on the page "{title}".
+    Here are the details:
+
+    {items}
+
+    Please provide a detailed, conversational description of these {content_type}.
+    For products: describe what's being sold, price ranges, brands, etc.
+    For videos: describe the content themes, creators, topics, etc.
+    For images: explain what they show based on alt text.
+    For music: describe the artists, genres, themes, etc.
+    For articles: summarize the topics and themes.
+""")
+
+# System prompt for AdvancedPageAnalyzer.stream_description: plain prose that is spoken as it arrives
+PAGE_DESCRIPTION_STREAM_SYSTEM = register_prompt("page_description.stream.system", 1, """
+    You are describing a web page to a user who is listening through text-to-speech.
+    Based on the detected content, say what kind of website this is and what its main content is.
+    Start with the single most important fact, then add detail.
+
+    Respond in plain spoken English: short, complete sentences, at most eight of them.
+    Do not use JSON, markdown, bullet points, lists, URLs or emojis.
+""")
@@ -0,0 +1,46 @@
+import re
+
+# End of a sentence: terminal punctuation, optional closing quotes/brackets, then whitespace
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+|\n{2,}")
+
+# Abbreviations that end in a period but do not end a sentence
+ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "approx.", "no.", "inc.", "ltd."}
+
+# Fragments shorter than this are joined to the next sentence so speech does not sound choppy
+MIN_SENTENCE_LENGTH = 20
+
+
+def _ends_with_abbreviation(text):
+    words = text.rstrip().rsplit(None, 1)
+    return bool(words) and words[-1].lower() in ABBREVIATIONS
+
+
+def iter_sentences(chunks, min_length=MIN_SENTENCE_LENGTH):
+    """
+    Split a stream of text chunks into complete sentences
+
+    Yields each sentence as soon as its terminating punctuation and the
+    following whitespace have arrived; whatever is left when the stream ends
+    is yielded as the final sentence.
+
+    Args:
+        chunks: Iterable of text fragments, e.g. streamed LLM deltas
+        min_length: Shorter sentences are merged with the following one
+    """
+    buffer = ""
+    for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        start = 0
+        for match in SENTENCE_END.finditer(buffer):
+            sentence = buffer[start:match.end()].strip()
+            if len(sentence) < min_length or _ends_with_abbreviation(sentence):
+                continue
+            yield sentence
+            start = match.end()
+        buffer = buffer[start:]
+
+    remainder = buffer.strip()
+    if remainder:
+        yield remainder
@@ -6,12 +6,13 @@ import os
 import sys
 import webbrowser
 import speech_recognition as sr
-import pyttsx3
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from voice_browser_control import VoiceBrowserControl
+from driver_provider import start_chrome
+from page_waits import enable_network_log
+from speech_service import READING
+from keyword_spotter import create_keyword_spotter
+from interrupt_monitor import InterruptMonitor, STOP_PHRASES
 
 class SimpleWindowBrowserAssistant:
     def __init__(self):
@@ -122,9 +123,6 @@ class SimpleWindowBrowserAssistant:
         # Initialize the recognizer
         self.recognizer = sr.Recognizer()
         
-        # For voice output
-        self.voice_engine = pyttsx3.init()
-        
         # Thread for voice recognition
         self.voice_thread = None
         self.listening = False
@@ -134,6 +132,14 @@ class SimpleWindowBrowserAssistant:
         self.browser_controller = None
         self.driver = None
         
+        # Local wake phrase and stop word detection on the controller's microphone stream
+        self.keyword_spotter = None
+        self.is_reading = False
+        self.stop_reading_event = threading.Event()
+        
+        # Watches for "stop" while a page is read; created once the microphone stream exists
+        self.interrupt_monitor = None
+        
         # Current URL tracking
         self.current_url = "about:blank"
         
@@ -164,10 +170,29 @@ class SimpleWindowBrowserAssistant:
             })
             
             # Start Chrome browser
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+            enable_network_log(chrome_options)
+            launch = start_chrome(chrome_options)
+            
+            # Initialize browser controller; it sets up speech and recognition while Chrome starts
+            self.browser_controller = VoiceBrowserControl(launch)
+            self.driver = self.browser_controller.driver
             
-            # Initialize browser controller
-            self.browser_controller = VoiceBrowserControl(self.driver)
+            # Only phrases addressed to the assistant are sent to full recognition, and
+            # "stop" is acted on while it is still being said; shares the Vosk model if one is loaded
+            self.keyword_spotter = create_keyword_spotter(
+                model=getattr(self.browser_controller.speech_to_text.backend, "model", None),
+                on_priority=self.on_priority_word
+            )
+            if self.keyword_spotter:
+                self.browser_controller.capture.add_listener(self.keyword_spotter)
+            
+            # Owns the microphone while a page is read, on a single thread
+            self.interrupt_monitor = InterruptMonitor(
+                get_utterance=self.browser_controller.capture.get_utterance,
+                recognize=self._recognize_quietly,
+                on_stop=lambda phrase: self.request_stop_reading(),
+                on_command=self._queue_voice_command
+            )
             
             # Get screen dimensions
             screen_width = self.root.winfo_screenwidth()
@@ -197,7 +222,7 @@ class SimpleWindowBrowserAssistant:
             self.update_url_display(google_search_url)
             
             # Verify we're on the search page and not a doodle page
-            time.sleep(1)  # Give the page a moment to load
+            self.browser_controller.page_waits.ready("Start page", replaces=1)
             current_url = self.driver.current_url
             if "google.com/doodles" in current_url or not "/search" in current_url:
                 # We got redirected to a doodle page, force navigation back to search
@@ -210,7 +235,7 @@ class SimpleWindowBrowserAssistant:
             
             # Set up the reading interrupt mechanism
             self.is_reading = False
-            self.should_stop_reading = False
+            self.stop_reading_event.clear()
             
             # Force focus on browser window immediately
             self.open_current_url_in_browser()
@@ -336,8 +361,8 @@ class SimpleWindowBrowserAssistant:
                 return
                 
             # Check if it's a stop reading command while reading is in progress
-            if self.is_reading and command.lower() in ["stop", "wait", "interrupt", "stop reading", "pause"]:
-                self.should_stop_reading = True
+            if self.is_reading and command.lower() in STOP_PHRASES:
+                self.request_stop_reading()
                 self.add_to_chat("System", "Stopping page reading...")
                 self.update_status("Ready")
                 return
@@ -346,7 +371,7 @@ class SimpleWindowBrowserAssistant:
             if command.lower() in ["read page", "read page aloud", "read aloud", "read this page", "describe page"]:
                 # Set reading flag to track state for interruption
                 self.is_reading = True
-                self.should_stop_reading = False
+                self.stop_reading_event.clear()
                 
                 # Start a special thread for reading with interruption support
                 threading.Thread(target=self.read_page_with_interruption, daemon=True).start()
@@ -375,75 +400,35 @@ class SimpleWindowBrowserAssistant:
             self.update_status("Reading page...")
             self.add_to_chat("System", "Reading page. Say 'stop' to interrupt.")
             
-            # Get the page content from the browser
-            page_text = ""
-            try:
-                # Try to get visible text only
-                body = self.driver.find_element("tag name", "body")
-                page_text = body.text
-            except:
-                self.add_to_chat("System", "Could not extract page text.")
-                self.is_reading = False
-                self.update_status("Ready")
-                return
+            # Paragraphs of the main content, extracted as they are read and resumed after a stop
+            paragraphs = self.browser_controller.page_reader.paragraphs()
             
-            # Split page text into chunks for better interruptibility
-            chunks = []
-            current_chunk = ""
-            
-            # Split by paragraphs first
-            paragraphs = page_text.split('\n\n')
-            for paragraph in paragraphs:
-                # If the paragraph is very long, split it into sentences
-                if len(paragraph) > 200:
-                    sentences = paragraph.replace('. ', '.\n').split('\n')
-                    for sentence in sentences:
-                        if len(current_chunk) + len(sentence) < 200:
-                            current_chunk += sentence + " "
-                        else:
-                            if current_chunk:
-                                chunks.append(current_chunk)
-                            current_chunk = sentence + " "
-                else:
-                    if len(current_chunk) + len(paragraph) < 200:
-                        current_chunk += paragraph + " "
-                    else:
-                        if current_chunk:
-                            chunks.append(current_chunk)
-                        current_chunk = paragraph + " "
-            
-            # Add the last chunk if it has content
-            if current_chunk:
-                chunks.append(current_chunk)
-            
-            # Initialize text-to-speech engine
-            engine = pyttsx3.init()
-            
-            # Read chunks with interruption checks
-            for i, chunk in enumerate(chunks):
-                if self.should_stop_reading:
-                    # Stop if interruption was requested
-                    break
-                
-                # Set up a listener for the voice command while reading
-                self.background_listen_for_stop()
-                
-                # Read the chunk
-                engine.say(chunk)
-                engine.runAndWait()
+            # Speak through the controller's long-lived speech service
+            speech = self.browser_controller.speech
+            
+            # One monitor listens for "stop" for the whole reading and sets the stop event
+            if self.voice_enabled and self.interrupt_monitor:
+                self.interrupt_monitor.start()
+            
+            # Read paragraphs with interruption checks
+            for i, paragraph in enumerate(paragraphs):
+                # Split very long paragraphs into sentence chunks for better interruptibility
+                for chunk in self._split_into_chunks(paragraph):
+                    if self.stop_reading_event.is_set():
+                        # Stop if interruption was requested
+                        break
+                    
+                    # Read the chunk
+                    speech.speak(chunk, READING).wait()
                 
-                # Brief pause between chunks to check for interruptions
-                time.sleep(0.1)
+                if self.stop_reading_event.is_set():
+                    break
                 
                 # Update progress periodically
                 if i % 5 == 0:
-                    progress = int((i + 1) / len(chunks) * 100)
-                    self.update_status(f"Reading page... {progress}%")
-            
-            # Clean up after reading
-            engine.stop()
+                    self.update_status(f"Reading page... paragraph {i + 1}")
             
-            if self.should_stop_reading:
+            if self.stop_reading_event.is_set():
                 self.add_to_chat("System", "Reading stopped by user.")
             else:
                 self.add_to_chat("System", "Finished reading the page.")
@@ -452,38 +437,35 @@ class SimpleWindowBrowserAssistant:
             self.add_to_chat("System", f"Error reading page: {str(e)}")
             
         finally:
+            if self.interrupt_monitor:
+                self.interrupt_monitor.stop()
             self.is_reading = False
-            self.should_stop_reading = False
+            self.stop_reading_event.clear()
             self.update_status("Ready")
     
-    def background_listen_for_stop(self):
-        """Listen in background for stop commands while reading"""
-        # Start a short-lived thread to listen for stop commands
-        threading.Thread(target=self._quick_listen_for_stop, daemon=True).start()
+    def request_stop_reading(self):
+        """Stop reading the page, cutting off the chunk that is being spoken"""
+        self.stop_reading_event.set()
+        if self.browser_controller:
+            self.browser_controller.speech.interrupt(READING)
     
-    def _quick_listen_for_stop(self):
-        """Quickly listen for a stop command without blocking the main thread"""
-        try:
-            # Only attempt to listen if voice is enabled
-            if not self.voice_enabled:
-                return
-                
-            r = sr.Recognizer()
-            with sr.Microphone() as source:
-                r.adjust_for_ambient_noise(source, duration=0.2)
-                try:
-                    audio = r.listen(source, timeout=0.5, phrase_time_limit=1.5)
-                    text = r.recognize_google(audio)
-                    
-                    # Check for stop commands
-                    if text and text.lower() in ["stop", "wait", "interrupt", "pause", "stop reading"]:
-                        self.should_stop_reading = True
-                except:
-                    # Silently ignore any errors
-                    pass
-        except:
-            # Silently ignore any setup errors
-            pass
+    def _split_into_chunks(self, paragraph, max_length=200):
+        """Split a long paragraph into chunks of whole sentences"""
+        if len(paragraph) <= max_length:
+            return [paragraph]
+        
+        chunks = []
+        current_chunk = ""
+        for sentence in paragraph.replace('. ', '.\n').split('\n'):
+            if len(current_chunk) + len(sentence) < max_length:
+                current_chunk += sentence + " "
+            else:
+                if current_chunk:
+                    chunks.append(current_chunk)
+                current_chunk = sentence + " "
+        if current_chunk:
+            chunks.append(current_chunk)
+        return chunks
     
     def toggle_voice_command(self):
         """Toggle voice recognition on/off"""
@@ -513,43 +495,46 @@ class SimpleWindowBrowserAssistant:
         self.voice_thread.start()
     
     def continuous_listen_thread(self):
-        """Thread to continuously handle voice input"""
+        """Thread to continuously handle voice input from the controller's always-open microphone"""
         try:
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+            # The microphone is shared with the browser controller, which may still be starting
+            while self.voice_enabled and not self.browser_controller:
+                time.sleep(0.2)
+            if not self.voice_enabled:
+                return
+            
+            capture = self.browser_controller.capture
+            self.browser_controller.start_listening()
+            if capture.error:
+                raise capture.error
+            
+            while self.voice_enabled:
+                # The interrupt monitor has the microphone while a page is read
+                if self.interrupt_monitor and not self.interrupt_monitor.wait_until_inactive(0.5):
+                    continue
                 
-                while self.voice_enabled:
-                    try:
-                        audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
-                        
-                        self.update_status("Processing speech...")
-                        try:
-                            command = self.recognizer.recognize_google(audio)
-                            if command.strip():
-                                # Check if it's a stop command while reading
-                                if self.is_reading and command.lower() in ["stop", "wait", "interrupt", "stop reading", "pause"]:
-                                    self.should_stop_reading = True
-                                    self.add_to_chat("System", f"Command recognized: '{command}'. Stopping reading...")
-                                else:
-                                    # Add command to input field and process it
-                                    self.root.after(0, lambda cmd=command: self.command_input.insert(0, cmd))
-                                    self.root.after(0, self.send_command)
-                                
-                                # Pause briefly before listening again
-                                time.sleep(1)
-                            
-                        except sr.UnknownValueError:
-                            # Silently ignore when nothing is understood
-                            pass
-                            
-                        except sr.RequestError as e:
-                            self.add_to_chat("System", f"Speech recognition service error: {e}")
-                            
-                        self.update_status("Listening..." if not self.is_reading else "Reading page...")
-                        
-                    except Exception as inner_e:
-                        # Handle timeout or other errors silently
-                        pass
+                audio = capture.get_utterance(timeout=0.5)
+                if audio is None:
+                    continue
+                
+                try:
+                    command = self._recognize_command(audio)
+                    if command:
+                        # Check if it's a stop command while reading
+                        if self.is_reading and command.lower() in STOP_PHRASES:
+                            self.request_stop_reading()
+                            self.add_to_chat("System", f"Command recognized: '{command}'. Stopping reading...")
+                        else:
+                            self._queue_voice_command(command)
+                    
+                except sr.UnknownValueError:
+                    # Silently ignore when nothing is understood
+                    pass
+                    
+                except sr.RequestError as e:
+                    self.add_to_chat("System", f"Speech recognition service error: {e}")
+                    
+                self.update_status("Listening..." if not self.is_reading else "Reading page...")
                         
         except Exception as e:
             self.add_to_chat("System", f"Error in voice recognition: {str(e)}")
@@ -562,6 +547,45 @@ class SimpleWindowBrowserAssistant:
             if self.voice_enabled:
                 self.root.after(1000, self.start_automatic_voice_listening)
     
+    def _recognize_command(self, audio):
+        """Recognize an utterance addressed to the assistant; returns None for background speech"""
+        # Background speech, or a stop word that was already handled while it was spoken
+        if self.keyword_spotter and not self.keyword_spotter.accepts(audio):
+            return None
+        
+        # Heard over our own speech: unless the spotter heard a priority word, it is our voice
+        if self.keyword_spotter and getattr(audio, "during_speech", False) is True \
+                and not getattr(audio, "keywords", set()) & set(self.keyword_spotter.priority_words):
+            return None
+        
+        self.update_status("Processing speech...")
+        command = self.browser_controller.speech_to_text.recognize(audio)
+        if self.keyword_spotter:
+            command = self.keyword_spotter.strip_wake_phrase(command)
+        if not self.browser_controller.accepts_utterance(audio, command, STOP_PHRASES):
+            return None
+        return command.strip() or None
+    
+    def _recognize_quietly(self, audio):
+        """Like _recognize_command, but returns None instead of raising recognition errors"""
+        try:
+            return self._recognize_command(audio)
+        except (sr.UnknownValueError, sr.RequestError):
+            return None
+    
+    def _queue_voice_command(self, command):
+        """Add a spoken command to the input field and process it on the UI thread"""
+        self.root.after(0, lambda cmd=command: self.command_input.insert(0, cmd))
+        self.root.after(0, self.send_command)
+    
+    def on_priority_word(self, word):
+        """Called by the keyword spotter on the capture thread as soon as "stop" or "quiet" is heard"""
+        if self.is_reading:
+            self.request_stop_reading()
+            self.add_to_chat("System", f"Heard '{word}'. Stopping reading...")
+        elif self.browser_controller:
+            self.browser_controller.speech.interrupt()
+    
     def execute_quick_command(self, command):
         """Execute one of the quick commands"""
         self.command_input.delete(0, tk.END)
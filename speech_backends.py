@@ -0,0 +1,195 @@
+import os
+import re
+import json
+import time
+import difflib
+import logging
+import speech_recognition as sr
+
+try:
+    import vosk
+except ImportError:  # Optional offline recognizer
+    vosk = None
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# "google" (online), "vosk" (offline, model loaded once) or "sphinx" (offline, pocketsphinx)
+SPEECH_BACKEND = os.getenv("SPEECH_BACKEND", "google")
+
+# Directory of an unpacked Vosk model, e.g. vosk-model-small-en-us-0.15
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "model")
+
+WORD_PATTERN = re.compile(r"[a-z][a-z']+")
+
+# Recognized words this similar to a command keyword are replaced by it
+CORRECTION_CUTOFF = 0.8
+
+# Words after which the rest of a command is a parameter ("search for ...", "click on ...")
+PARAMETER_MARKERS = {"for", "to", "on"}
+
+
+class Vocabulary:
+    """
+    Words the user is likely to say: command keywords, favorite categories and
+    the link texts of the current page.
+
+    Offline recognizers misspell command words ("scrol down"), so near misses
+    of a command keyword at the start of a transcript are snapped onto it.
+    Only that leading keyword part is corrected: it ends at the first word
+    that is not a keyword, or after a parameter marker like "for", so search
+    queries, website names and link texts are never rewritten. Words of the
+    favorite categories and page links are known words and left as they are.
+    """
+
+    def __init__(self, commands=()):
+        self.keywords = {word for command in commands for word in WORD_PATTERN.findall(command.lower())}
+        self.categories = []
+        self.link_texts = []
+        self._words = None
+
+    def set_categories(self, categories):
+        categories = sorted(category.lower() for category in categories)
+        if categories != self.categories:
+            self.categories = categories
+            self._words = None
+
+    def set_link_texts(self, link_texts):
+        link_texts = [text.lower() for text in link_texts if text]
+        if link_texts != self.link_texts:
+            self.link_texts = link_texts
+            self._words = None
+
+    @property
+    def words(self):
+        if self._words is None:
+            phrases = self.categories + self.link_texts
+            self._words = self.keywords | {word for phrase in phrases for word in WORD_PATTERN.findall(phrase)}
+        return self._words
+
+    def correct(self, text):
+        """Replace close misspellings of command keywords in the leading command part of a transcript"""
+        tokens = text.split()
+        for i, token in enumerate(tokens):
+            if token not in self.words and len(token) > 3:
+                match = difflib.get_close_matches(token, self.keywords, n=1, cutoff=CORRECTION_CUTOFF)
+                if match:
+                    token = tokens[i] = match[0]
+            if token not in self.keywords or token in PARAMETER_MARKERS:
+                break
+        return " ".join(tokens)
+
+
+class GoogleBackend:
+    """Google Web Speech API through speech_recognition; needs a network connection"""
+
+    name = "google"
+    offline = False
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+
+class SphinxBackend:
+    """CMU Sphinx through speech_recognition; offline, but it loads its models on every call"""
+
+    name = "sphinx"
+    offline = True
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_sphinx(audio)
+
+
+class VoskBackend:
+    """
+    Offline recognition with a Vosk model that is loaded once.
+
+    speech_recognition's own Vosk integration reloads from a fixed "model"
+    directory and returns raw JSON, so the vosk package is used directly.
+    """
+
+    name = "vosk"
+    offline = True
+    SAMPLE_RATE = 16000
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        if vosk is None:
+            raise ImportError("the vosk package is not installed")
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Vosk model directory {model_path!r} does not exist")
+        vosk.SetLogLevel(-1)
+        start = time.perf_counter()
+        self.model = vosk.Model(model_path)
+        logger.info(f"Loaded Vosk model {model_path} in {time.perf_counter() - start:.1f}s")
+
+    def recognize(self, audio):
+        recognizer = vosk.KaldiRecognizer(self.model, self.SAMPLE_RATE)
+        recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=self.SAMPLE_RATE, convert_width=2))
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class SpeechToText:
+    """
+    The configured recognition backend plus vocabulary correction for offline backends
+
+    Raises the speech_recognition exceptions of the backend, so callers keep
+    handling sr.UnknownValueError and sr.RequestError as before.
+    """
+
+    def __init__(self, backend, vocabulary=None):
+        self.backend = backend
+        self.vocabulary = vocabulary or Vocabulary()
+        self.last_latency = None
+
+    def recognize(self, audio):
+        """
+        Transcribe an utterance
+
+        Args:
+            audio: speech_recognition AudioData
+
+        Returns:
+            Lowercase transcript, with command keywords corrected for offline backends
+        """
+        start = time.perf_counter()
+        try:
+            text = self.backend.recognize(audio)
+        finally:
+            self.last_latency = time.perf_counter() - start
+        logger.debug(f"{self.backend.name} recognized in {self.last_latency * 1000:.0f} ms: {text}")
+        text = text.lower()
+        # Google's language model already gets command words right; correcting its free text only hurts
+        if getattr(self.backend, "offline", False):
+            text = self.vocabulary.correct(text)
+        return text
+
+
+def create_backend(name=SPEECH_BACKEND, recognizer=None, model_path=VOSK_MODEL_PATH):
+    """
+    Create a recognition backend by name, falling back to Google if an offline one cannot be loaded
+
+    Args:
+        name: "google", "vosk" or "sphinx"
+        recognizer: speech_recognition Recognizer used by the Google and Sphinx backends
+        model_path: Vosk model directory
+    """
+    recognizer = recognizer or sr.Recognizer()
+    try:
+        if name == "vosk":
+            return VoskBackend(model_path)
+        if name == "sphinx":
+            return SphinxBackend(recognizer)
+        if name != "google":
+            logger.warning(f"Unknown speech backend {name!r}, using Google")
+    except (ImportError, OSError) as e:
+        logger.warning(f"Could not load the {name} speech backend ({e}), using Google")
+    return GoogleBackend(recognizer)
@@ -0,0 +1,239 @@
+import queue
+import logging
+import itertools
+import threading
+import pyttsx3
+from audio_cache import default_player
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Utterance priorities, lower is more urgent
+FEEDBACK = 0
+READING = 10
+PRERENDER = 100
+
+
+class SpeechHandle:
+    """
+    A queued utterance.
+
+    Returned by SpeechService.speak so callers can wait for the utterance to
+    finish or cancel it without blocking on audio playback.
+    """
+
+    def __init__(self, text, priority, render=False):
+        self.text = text
+        self.priority = priority
+        # Render jobs write the text to the audio cache instead of speaking it
+        self.render = render
+        self.started = False
+        self.cancelled = False
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        """True once the utterance finished playing or was cancelled"""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the utterance finished or was cancelled; returns True unless it timed out"""
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """Cancel the utterance; stops it mid-word if it is playing"""
+        self.cancelled = True
+        if not self.started:
+            self._done.set()
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled else "done" if self.done else "playing" if self.started else "queued"
+        return f"SpeechHandle({self.text[:30]!r}, priority={self.priority}, {state})"
+
+
+class SpeechService:
+    """
+    Text-to-speech on one long-lived engine owned by a dedicated thread.
+
+    Utterances are queued by priority, so feedback is spoken before queued
+    page reading, and feedback arriving while a paragraph is read preempts it:
+    the paragraph is stopped and read again afterwards. Interruption uses the
+    engine's started-word callback, so it takes effect at the next word.
+
+    With an AudioCache, phrases rendered by prerender() are played from their
+    WAV file instead of being synthesized again; stopping such a phrase stops
+    the player.
+    """
+
+    def __init__(self, engine_factory=None, audio_cache=None, player=None):
+        self.engine_factory = engine_factory or pyttsx3.init
+        self.engine = None
+        self.player = player or default_player()
+        # Cached audio is only useful if this platform can play it
+        self.audio_cache = audio_cache if self.player is not None else None
+        self.playing_clip = False
+        self.queue = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.current = None
+        self.preempted = False
+        self.lock = threading.Lock()
+        self.idle = threading.Event()
+        self.idle.set()
+        self.ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="SpeechService", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+
+    def speak(self, text, priority=FEEDBACK):
+        """
+        Queue text to be spoken and return immediately
+
+        Args:
+            text: Text to speak
+            priority: FEEDBACK for assistant responses, READING for page content
+
+        Returns:
+            SpeechHandle to wait for or cancel the utterance
+        """
+        handle = SpeechHandle(text, priority)
+        with self.lock:
+            self.idle.clear()
+            self._enqueue(handle)
+            # Urgent speech preempts a less urgent utterance that is playing
+            if self.current is not None and self.current.priority > priority:
+                self.preempted = True
+                self._stop_clip()
+        return handle
+
+    def prerender(self, texts):
+        """
+        Render phrases to the audio cache while the engine has nothing to say
+
+        Args:
+            texts: Exact phrases that will be passed to speak() later
+        """
+        if self.audio_cache is None:
+            return
+        with self.lock:
+            for text in dict.fromkeys(texts):
+                self._enqueue(SpeechHandle(text, PRERENDER, render=True))
+
+    def interrupt(self, priority=None):
+        """
+        Stop the current utterance and drop queued ones
+
+        Args:
+            priority: Only interrupt utterances of this priority; all of them if None
+        """
+        with self.lock:
+            kept = []
+            while True:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                handle = item[2]
+                if handle is None or (priority is not None and handle.priority != priority):
+                    kept.append(item)
+                else:
+                    handle.cancel()
+            for item in kept:
+                self.queue.put(item)
+            if self.current is not None and (priority is None or self.current.priority == priority):
+                self.current.cancel()
+                self._stop_clip()
+            if self.current is None and not self._speech_queued():
+                self.idle.set()
+
+    def barge_in(self):
+        """A new command arrived: stale feedback is dropped and reading pauses for the response"""
+        self.interrupt(FEEDBACK)
+        with self.lock:
+            if self.current is not None and self.current.priority > FEEDBACK:
+                self.preempted = True
+                self._stop_clip()
+
+    def wait_until_idle(self, timeout=None):
+        """Block until everything queued has been spoken; returns False on timeout"""
+        return self.idle.wait(timeout)
+
+    @property
+    def busy(self):
+        return not self.idle.is_set()
+
+    def shutdown(self, timeout=None):
+        """Stop speaking and end the speech thread"""
+        self.interrupt()
+        self.queue.put((float("inf"), next(self.sequence), None))
+        self.thread.join(timeout)
+
+    def _enqueue(self, handle):
+        self.queue.put((handle.priority, next(self.sequence), handle))
+
+    def _speech_queued(self):
+        # Pending render jobs do not keep the service busy
+        return any(item[2] is not None and not item[2].render for item in list(self.queue.queue))
+
+    def _stop_clip(self):
+        if self.playing_clip:
+            self.player.stop()
+
+    def _on_word(self, name, location, length):
+        """Engine callback before every word: stop if the utterance was cancelled or preempted"""
+        current = self.current
+        if current is not None and (current.cancelled or self.preempted):
+            self.engine.stop()
+
+    def _run(self):
+        try:
+            self.engine = self.engine_factory()
+            self.engine.connect('started-word', self._on_word)
+            if self.audio_cache is not None:
+                self.audio_cache.configure(self.engine.getProperty('voice'), self.engine.getProperty('rate'))
+        except Exception as e:
+            logger.error(f"Could not initialize the speech engine: {e}")
+        finally:
+            self.ready.set()
+
+        while True:
+            _, _, handle = self.queue.get()
+            if handle is None:
+                break
+
+            if handle.render:
+                self.audio_cache.render(self.engine, handle.text)
+                continue
+
+            clip = self.audio_cache.get(handle.text) if self.audio_cache is not None else None
+            with self.lock:
+                if handle.cancelled:
+                    if not self._speech_queued():
+                        self.idle.set()
+                    continue
+                self.current = handle
+                self.preempted = False
+                self.playing_clip = clip is not None
+                handle.started = True
+            try:
+                if clip is not None:
+                    logger.debug(f"Playing cached audio: {handle.text}")
+                    self.player.play(clip)
+                else:
+                    logger.debug(f"Speaking: {handle.text}")
+                    self.engine.say(handle.text)
+                    self.engine.runAndWait()
+            except Exception as e:
+                logger.error(f"Error speaking '{handle.text[:50]}': {e}")
+
+            with self.lock:
+                self.current = None
+                self.playing_clip = False
+                if self.preempted and not handle.cancelled:
+                    # Read the preempted utterance again once the urgent speech is done
+                    handle.started = False
+                    self._enqueue(handle)
+                else:
+                    handle._done.set()
+                self.preempted = False
+                if not self._speech_queued():
+                    self.idle.set()
@@ -0,0 +1,131 @@
+import time
+import logging
+import threading
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class StartupTimeline:
+    """
+    Start and end times of the startup steps, relative to the start of startup.
+
+    Steps are recorded from whichever thread runs them; milestones such as
+    "ready" or "listening" are recorded as steps without duration.
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.entries = []
+        self.lock = threading.Lock()
+
+    def record(self, name, start, end=None):
+        """Record a step that ran from `start` to `end` (perf_counter values)"""
+        end = start if end is None else end
+        with self.lock:
+            self.entries.append((name, start - self.origin, end - self.origin, threading.current_thread().name))
+
+    def mark(self, name):
+        """Record a milestone at the current time"""
+        self.record(name, time.perf_counter())
+
+    def elapsed(self, name):
+        """Seconds from the start of startup to the end of the named step, or None if it did not happen"""
+        with self.lock:
+            for entry_name, start, end, thread in self.entries:
+                if entry_name == name:
+                    return end
+        return None
+
+    def report(self):
+        """The timeline as text, one step per line in order of start"""
+        with self.lock:
+            entries = sorted(self.entries, key=lambda entry: entry[1])
+        lines = []
+        for name, start, end, thread in entries:
+            if end == start:
+                lines.append(f"{start:7.3f}s  {name}")
+            else:
+                lines.append(f"{start:7.3f}s  {name} took {end - start:.3f}s on {thread}")
+        return "\n".join(lines)
+
+
+class StartupTask:
+    """A startup step running on its own thread"""
+
+    def __init__(self, name, build, timeline):
+        self.name = name
+        self.build = build
+        self.timeline = timeline
+        self.value = None
+        self.error = None
+        self.done = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f"Startup-{name}", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.value = self.build()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.timeline.record(self.name, start, time.perf_counter())
+            self.done.set()
+
+    def result(self):
+        """Wait for the step to finish and return its value; re-raises its error"""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class LazyValue:
+    """A startup step deferred until its value is first needed"""
+
+    def __init__(self, name, build, timeline):
+        self.name = name
+        self.build = build
+        self.timeline = timeline
+        self.value = None
+        self.built = False
+        self.lock = threading.Lock()
+
+    def get(self):
+        if not self.built:
+            with self.lock:
+                if not self.built:
+                    start = time.perf_counter()
+                    self.value = self.build()
+                    self.built = True
+                    self.timeline.record(f"{self.name} (on first use)", start, time.perf_counter())
+        return self.value
+
+
+class StartupOrchestrator:
+    """
+    Runs independent startup steps concurrently and defers rarely used ones.
+
+    `start` launches a step on its own thread right away and returns a task
+    whose result is collected where it is first needed; `lazy` builds a value
+    only when it is first used. Both are recorded on the shared timeline, so
+    the time to the first "listening" can be read from the log.
+    """
+
+    def __init__(self, timeline=None):
+        self.timeline = timeline or StartupTimeline()
+
+    def start(self, name, build):
+        return StartupTask(name, build, self.timeline)
+
+    def lazy(self, name, build):
+        return LazyValue(name, build, self.timeline)
+
+    def step(self, name, build):
+        """Run a step on the calling thread and record it"""
+        start = time.perf_counter()
+        try:
+            return build()
+        finally:
+            self.timeline.record(name, start, time.perf_counter())
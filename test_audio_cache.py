@@ -0,0 +1,166 @@
+# Import our mocks first
+import test_mocks
+
+import io
+import ast
+import os
+import time
+import wave
+import threading
+from audio_cache import AudioCache
+from speech_service import SpeechService, READING
+
+
+def make_wav(text):
+    """A short silent WAV whose length depends on the text"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(b"\0\0" * 10 * len(text))
+    return buffer.getvalue()
+
+
+class RenderingEngine:
+    """pyttsx3 stand-in that can also render to a file"""
+
+    def __init__(self, voice="voice-a", rate=200):
+        self.properties = {"voice": voice, "rate": rate}
+        self.pending = []
+        self.files = []
+        self.spoken = []
+        self.rendered = []
+
+    def connect(self, topic, callback):
+        pass
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def say(self, text):
+        self.pending.append(text)
+
+    def save_to_file(self, text, path):
+        self.files.append((text, path))
+
+    def stop(self):
+        pass
+
+    def runAndWait(self):
+        self.spoken.extend(self.pending)
+        self.pending = []
+        for text, path in self.files:
+            with open(path, "wb") as f:
+                f.write(make_wav(text))
+            self.rendered.append(text)
+        self.files = []
+
+
+class FakePlayer:
+    def __init__(self, play_time=0.0):
+        self.play_time = play_time
+        self.played = []
+        self.stopped = threading.Event()
+
+    def play(self, data):
+        self.stopped.clear()
+        self.played.append(data)
+        self.stopped.wait(self.play_time)
+
+    def stop(self):
+        self.stopped.set()
+
+
+def test_rendered_phrase_is_served_from_memory_then_disk(tmp_path):
+    engine = RenderingEngine()
+    cache = AudioCache(directory=str(tmp_path), max_memory_bytes=600)
+    cache.configure("voice-a", 200)
+    assert cache.get("Stopped reading") is None
+
+    assert cache.render(engine, "Stopped reading")
+    assert cache.render(engine, "Stopped reading")
+    assert engine.rendered == ["Stopped reading"]
+    assert cache.get("Stopped reading") == make_wav("Stopped reading")
+    assert cache.stats()["memory_entries"] == 1
+
+    # A second phrase pushes the first out of memory; it is read back from disk
+    cache.render(engine, "Video playback cancelled.")
+    cache.get("Video playback cancelled.")
+    assert cache.stats()["memory_entries"] == 1
+    assert cache.get("Stopped reading") == make_wav("Stopped reading")
+
+
+def test_key_depends_on_voice_and_rate(tmp_path):
+    cache = AudioCache(directory=str(tmp_path))
+    cache.configure("voice-a", 200)
+    cache.render(RenderingEngine(), "Stopped reading")
+    cache.configure("voice-a", 150)
+    assert cache.get("Stopped reading") is None
+    cache.configure("voice-a", 200)
+    assert cache.get("Stopped reading") is not None
+
+
+def test_disk_keeps_the_most_recently_played_phrases(tmp_path):
+    engine = RenderingEngine()
+    cache = AudioCache(directory=str(tmp_path), max_files=2)
+    cache.render(engine, "first phrase")
+    cache.render(engine, "second phrase")
+    old = time.time() - 60
+    os.utime(cache.path("second phrase"), (old, old))
+    cache.render(engine, "third phrase")
+    assert os.path.exists(cache.path("first phrase"))
+    assert not os.path.exists(cache.path("second phrase"))
+    assert os.path.exists(cache.path("third phrase"))
+
+
+def test_service_plays_prerendered_phrases_without_synthesis(tmp_path):
+    engine = RenderingEngine()
+    player = FakePlayer()
+    service = SpeechService(engine_factory=lambda: engine, audio_cache=AudioCache(directory=str(tmp_path)),
+                            player=player)
+    service.prerender(["Stopped reading", "Stopped reading"])
+    assert service.wait_until_idle(1)
+    # Render jobs are not speech: the service is idle while they are queued
+    deadline = time.time() + 2
+    while engine.rendered != ["Stopped reading"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert engine.rendered == ["Stopped reading"]
+
+    assert service.speak("Stopped reading").wait(1)
+    assert service.speak("Opening music").wait(1)
+    assert player.played == [make_wav("Stopped reading")]
+    assert engine.spoken == ["Opening music"]
+    service.shutdown(1)
+
+
+def test_interrupt_stops_a_playing_clip(tmp_path):
+    engine = RenderingEngine()
+    player = FakePlayer(play_time=5)
+    cache = AudioCache(directory=str(tmp_path))
+    cache.configure("voice-a", 200)
+    cache.render(engine, "a long cached paragraph")
+    service = SpeechService(engine_factory=lambda: engine, audio_cache=cache, player=player)
+
+    handle = service.speak("a long cached paragraph", READING)
+    deadline = time.time() + 1
+    while not player.played and time.time() < deadline:
+        time.sleep(0.01)
+    service.interrupt(READING)
+    assert handle.wait(0.5)
+    assert handle.cancelled
+    service.shutdown(1)
+
+
+def test_youtube_feedback_is_spoken_from_the_cached_phrases():
+    """Fixed feedback is passed to speak() as a module constant, never as a literal that can drift from the list"""
+    youtube_controller = test_mocks.load_real_module("youtube_controller")
+    with open(youtube_controller.__file__) as f:
+        tree = ast.parse(f.read())
+    literals = [node.lineno for node in ast.walk(tree)
+                if isinstance(node, ast.Call) and getattr(node.func, "attr", None) == "speak"
+                and node.args and isinstance(node.args[0], ast.Constant)]
+    assert literals == []
+    phrases = youtube_controller.cached_phrases()
+    assert youtube_controller.SUMMARY_FAILED in phrases
+    assert youtube_controller.FOUND_VIDEOS.format(count=3) in phrases
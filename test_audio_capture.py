@@ -0,0 +1,120 @@
+# Import our mocks first
+import test_mocks
+
+import math
+import time
+from array import array
+from audio_capture import UtteranceSegmenter, AudioCapture
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+
+
+def chunk(amplitude):
+    """One chunk of a 440 Hz tone, or silence for amplitude 0"""
+    samples = array("h", (int(amplitude * math.sin(2 * math.pi * 440 * i / SAMPLE_RATE)) for i in range(CHUNK)))
+    return samples.tobytes()
+
+
+def seconds(duration, amplitude):
+    return [chunk(amplitude)] * math.ceil(duration * SAMPLE_RATE / CHUNK)
+
+
+def feed_all(segmenter, chunks):
+    return [frames for frames in map(segmenter.feed, chunks) if frames is not None]
+
+
+def test_segments_an_utterance_between_pauses_with_preroll():
+    segmenter = UtteranceSegmenter(SAMPLE_RATE, 2, CHUNK)
+    speech = seconds(1.0, 8000)
+    utterances = feed_all(segmenter, seconds(1.0, 20) + speech + seconds(1.0, 20))
+    assert len(utterances) == 1
+    # The whole phrase plus the ring buffer of audio before it and the closing pause
+    assert len(utterances[0]) >= (len(speech) + segmenter.pause_chunks) * CHUNK * 2
+    assert not segmenter.in_utterance
+
+
+def test_threshold_adapts_to_background_noise():
+    segmenter = UtteranceSegmenter(SAMPLE_RATE, 2, CHUNK, energy_threshold=300)
+    # Quiet background noise pulls the threshold down towards 1.5 times its energy
+    assert feed_all(segmenter, seconds(3.0, 100)) == []
+    assert 100 < segmenter.energy_threshold < 150
+    # So soft speech that the initial threshold would have missed is detected
+    assert len(feed_all(segmenter, seconds(0.5, 400) + seconds(1.0, 100))) == 1
+
+
+def test_short_clicks_and_long_phrases():
+    segmenter = UtteranceSegmenter(SAMPLE_RATE, 2, CHUNK, phrase_time_limit=2)
+    assert feed_all(segmenter, [chunk(8000)] + seconds(1.0, 0)) == []
+    # A phrase longer than the limit is cut into pieces
+    assert len(feed_all(segmenter, seconds(3.0, 8000) + seconds(1.0, 0))) == 2
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def read(self, size):
+        time.sleep(0.001)
+        return self.chunks.pop(0) if self.chunks else b""
+
+
+class FakeMicrophone:
+    SAMPLE_RATE = SAMPLE_RATE
+    SAMPLE_WIDTH = 2
+    CHUNK = CHUNK
+    opened = 0
+
+    def __init__(self, chunks):
+        self.stream = FakeStream(chunks)
+
+    def __enter__(self):
+        FakeMicrophone.opened += 1
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_capture_queues_utterances_from_one_open_stream():
+    FakeMicrophone.opened = 0
+    utterance = seconds(0.5, 20) + seconds(0.8, 8000) + seconds(0.8, 20)
+    capture = AudioCapture(source_factory=lambda: FakeMicrophone(seconds(0.5, 20) + utterance * 3))
+    capture.start()
+    captured = [capture.get_utterance(timeout=2) for _ in range(3)]
+    assert all(audio is not None for audio in captured)
+    assert capture.get_utterance(timeout=0.1) is None
+    assert FakeMicrophone.opened == 1
+    capture.stop(1)
+
+
+class AudioData:
+    def __init__(self, frames, sample_rate, sample_width):
+        self.frames = frames
+
+
+def test_utterances_overlapping_our_own_speech_are_marked(monkeypatch):
+    import audio_capture
+    monkeypatch.setattr(audio_capture, "ECHO_TAIL_SECONDS", 0)
+    monkeypatch.setattr(audio_capture.sr, "AudioData", AudioData)
+    utterance = seconds(0.8, 8000) + seconds(0.8, 20)
+    microphone = FakeMicrophone(seconds(0.5, 20) + utterance * 2)
+    # The assistant talks over the first utterance only
+    capture = AudioCapture(source_factory=lambda: microphone,
+                           is_speaking=lambda: len(microphone.stream.chunks) > len(utterance))
+    capture.start()
+    first, second = capture.get_utterance(timeout=2), capture.get_utterance(timeout=2)
+    capture.stop(1)
+    assert first.during_speech is True
+    assert second.during_speech is False
+
+
+def test_own_speech_is_ignored_except_stop_phrases():
+    from voice_browser_control import VoiceBrowserControl
+    controller = VoiceBrowserControl.__new__(VoiceBrowserControl)
+    echo, command = AudioData(b"", SAMPLE_RATE, 2), AudioData(b"", SAMPLE_RATE, 2)
+    echo.during_speech, command.during_speech = True, False
+    assert not controller.accepts_utterance(echo, "analyzing the page content")
+    assert not controller.accepts_utterance(echo, "the bus stop is closed")
+    assert controller.accepts_utterance(echo, "stop")
+    assert controller.accepts_utterance(command, "scroll down")
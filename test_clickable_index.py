@@ -0,0 +1,209 @@
+import json
+import shutil
+import subprocess
+import pytest
+import test_mocks  # Mock selenium before importing the index
+from clickable_index import ClickableIndex, CLICKABLE_INDEX_SCRIPT, TEXT_MATCH_SCRIPT, match_score, normalize
+
+
+def element(handle, text, label="", tag="a"):
+    return {"handle": handle, "tag": tag, "text": text, "label": label, "box": [0, 0, 10, 10]}
+
+
+class Clickable:
+    def __init__(self, clicks, handle, displayed=True):
+        self.clicks = clicks
+        self.handle = handle
+        self.displayed = displayed
+
+    def is_displayed(self):
+        return self.displayed
+
+    def click(self):
+        self.clicks.append(self.handle)
+
+
+class IndexedPageDriver:
+    """Driver answering the index script like the page would"""
+
+    def __init__(self, elements, text_elements=()):
+        self.elements = elements
+        # Visible elements with text that the index does not list as clickable
+        self.text_elements = list(text_elements)
+        self.mutations = 0
+        self.scripts = 0
+        self.clicks = []
+        self.hidden = set()
+        self.lookups = 0
+
+    def execute_script(self, script, *args):
+        self.scripts += 1
+        if script == TEXT_MATCH_SCRIPT:
+            return [dict(e) for e in self.text_elements
+                    if all(word in e["text"].lower() for word in args[0])]
+        fingerprint = f"page:{self.mutations}:complete"
+        if args and args[0] == fingerprint:
+            return {"fingerprint": fingerprint, "elements": None}
+        return {"fingerprint": fingerprint,
+                "elements": [dict(e) for e in self.elements if e["handle"] not in self.hidden]}
+
+    def find_element(self, by, selector):
+        self.lookups += 1
+        for e in self.elements + self.text_elements:
+            if f'"{e["handle"]}"' in selector:
+                return Clickable(self.clicks, e["handle"], e["handle"] not in self.hidden)
+        raise Exception(f"no such element: {selector}")
+
+
+def make_page():
+    return IndexedPageDriver([
+        element("1", "Images"),
+        element("2", "Sign in to your account", tag="button"),
+        element("3", "", label="Search by voice", tag="div"),
+        element("4", "Settings"),
+    ])
+
+
+def test_scores_prefer_whole_words():
+    assert match_score("images", "images") == 1.0
+    assert match_score("sign in", normalize("Sign in to your account")) >= 0.8
+    assert match_score("sign in", "sign in") > match_score("sign in", "sign in to your account")
+    assert match_score("log in", "login") > match_score("log in", "settings")
+    assert match_score("sign in", "settings") < 0.6
+
+
+def test_every_query_word_must_be_found():
+    # Near misses that used to score above the threshold
+    assert match_score("sign up", "sign out") == 0.0
+    assert match_score("next", "text") == 0.0
+    assert match_score("play", "pay") == 0.0
+
+
+def test_names_not_on_the_page_click_nothing():
+    driver = IndexedPageDriver([element("1", "Sign out"), element("2", "Text"), element("3", "Pay")])
+    index = ClickableIndex(driver)
+    for name in ["sign up", "next", "play"]:
+        assert index.click(name) is None
+    assert driver.clicks == []
+
+
+def test_ambiguous_names_click_nothing():
+    driver = IndexedPageDriver([element("1", "Sign in with Google"), element("2", "Sign in with Apple"),
+                                element("3", "Help"), element("4", "Help")])
+    index = ClickableIndex(driver)
+    assert index.click("sign in") is None
+    assert index.click("sign in with apple")["handle"] == "2"
+    # The same name twice is one target; the first one is clicked
+    assert index.click("help")["handle"] == "3"
+    assert driver.clicks == ["2", "3"]
+
+
+def test_text_fallback_finds_elements_with_script_listeners():
+    driver = IndexedPageDriver([element("1", "Images")], text_elements=[
+        element("7", "Show more comments", tag="span"),
+        element("8", "Accept all cookies", tag="div"),
+    ])
+    index = ClickableIndex(driver)
+    assert index.click("accept all cookies")["handle"] == "8"
+    assert index.click("show more")["handle"] == "7"
+    assert driver.clicks == ["8", "7"]
+
+
+def test_clicks_the_best_match_by_handle():
+    driver = make_page()
+    index = ClickableIndex(driver)
+    assert index.click("sign in")["handle"] == "2"
+    assert index.click("search by voice")["handle"] == "3"
+    assert driver.clicks == ["2", "3"]
+
+
+def test_miss_resolves_without_waiting():
+    driver = make_page()
+    index = ClickableIndex(driver)
+    assert index.click("checkout") is None
+    # The index and the text fallback, no element lookups that would wait for a timeout
+    assert driver.scripts == 2
+    assert driver.lookups == 0
+    assert driver.clicks == []
+
+
+def test_index_is_rebuilt_only_when_the_dom_changes():
+    driver = make_page()
+    index = ClickableIndex(driver)
+    index.find("images")
+    index.find("settings")
+    assert index.builds == 1
+    driver.mutations += 1
+    driver.elements.append(element("5", "Next"))
+    assert index.find("next")["handle"] == "5"
+    assert index.builds == 2
+
+
+def test_stale_handle_is_looked_up_again():
+    driver = make_page()
+    index = ClickableIndex(driver)
+    index.refresh()
+    # The page replaced the element without the index noticing yet
+    driver.elements[0] = element("9", "Images")
+    assert index.click("images")["handle"] == "9"
+    assert driver.clicks == ["9"]
+
+
+def test_element_hidden_since_indexing_is_not_clicked():
+    driver = make_page()
+    index = ClickableIndex(driver)
+    index.refresh()
+    # Hidden without the index noticing: the element stays in the DOM but has no size
+    driver.hidden.add("4")
+    assert index.click("settings") is None
+    assert driver.clicks == []
+    assert index.builds == 2
+
+
+def test_hidden_element_is_matched_again_on_the_current_page():
+    driver = make_page()
+    index = ClickableIndex(driver)
+    index.refresh()
+    # The page swapped in a visible copy of the element
+    driver.hidden.add("1")
+    driver.elements[0] = element("9", "Images")
+    assert index.click("images")["handle"] == "9"
+    assert driver.clicks == ["9"]
+
+
+# Runs the index script against a page with no clickable elements and a
+# MutationObserver the test triggers, printing the fingerprint after each change
+FINGERPRINT_RUNNER = """
+var observers = [];
+global.MutationObserver = function(callback) { this.callback = callback; observers.push(this); };
+MutationObserver.prototype.observe = function(target, options) { this.options = options; };
+global.window = {scrollX: 0, scrollY: 0};
+global.document = {documentElement: {}, readyState: 'complete', querySelectorAll: function() { return []; }};
+var index = new Function(%(script)s);
+function notify(record) {
+    observers.forEach(function(observer) {
+        var filter = observer.options.attributeFilter;
+        if (record.type !== 'attributes' || filter.indexOf(record.attributeName) !== -1) observer.callback([record]);
+    });
+}
+var fingerprints = [index.call(null, null).fingerprint];
+notify({type: 'attributes', attributeName: 'class', addedNodes: [], removedNodes: []});
+fingerprints.push(index.call(null, fingerprints[0]).fingerprint);
+notify({type: 'attributes', attributeName: 'data-tracking', addedNodes: [], removedNodes: []});
+fingerprints.push(index.call(null, fingerprints[1]).fingerprint);
+notify({type: 'attributes', attributeName: 'aria-hidden', addedNodes: [], removedNodes: []});
+fingerprints.push(index.call(null, fingerprints[2]).fingerprint);
+console.log(JSON.stringify(fingerprints));
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_visibility_changes_change_the_index_fingerprint():
+    completed = subprocess.run([shutil.which("node"), "-e", FINGERPRINT_RUNNER % {
+        "script": json.dumps(CLICKABLE_INDEX_SCRIPT)}], capture_output=True, text=True, timeout=30)
+    assert completed.returncode == 0, completed.stderr
+    first, after_class, after_other, after_aria = json.loads(completed.stdout)
+    assert after_class != first
+    # Attributes that do not affect visibility leave the index alone
+    assert after_other == after_class
+    assert after_aria != after_other
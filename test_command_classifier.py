@@ -0,0 +1,71 @@
+from unittest.mock import MagicMock
+
+# Import our mocks first
+import test_mocks
+
+from command_classifier import LocalCommandClassifier
+from command_router import CommandRouter
+from benchmark_command_router import INTENT_KEYWORDS, MOOD_KEYWORDS, InMemoryFavoritesManager
+import voice_browser_control
+
+
+def classify(command):
+    router = CommandRouter(InMemoryFavoritesManager(), INTENT_KEYWORDS, MOOD_KEYWORDS)
+    classifier = LocalCommandClassifier(voice_browser_control.SUPPORTED_COMMANDS, voice_browser_control.COMMAND_EXAMPLES)
+    return classifier.classify(command, router.route(command))
+
+
+def test_unambiguous_commands_are_confident():
+    for command in ["scroll down", "go back", "refresh page", "describe this page", "play video number 2"]:
+        result = classify(command)
+        assert result.confident, command
+
+
+def test_ambiguous_commands_go_to_llm():
+    for command in ["i want to check my email and then search for the weather", "i feel like shopping today",
+                    "show me something interesting"]:
+        result = classify(command)
+        assert not result.confident, command
+
+
+def test_fast_path_skips_llm_and_counts_paths():
+    control = voice_browser_control.VoiceBrowserControl(existing_driver=test_mocks.MockDriver())
+    control.favorites_manager = InMemoryFavoritesManager()
+    control.router.favorites_manager = control.favorites_manager
+    control.analyze_with_llm = MagicMock(return_value=None)
+
+    control.process_command("scroll down")
+    control.analyze_with_llm.assert_not_called()
+
+    control.process_command("i feel like shopping today")
+    control.analyze_with_llm.assert_called_once_with("i feel like shopping today")
+
+    control.process_command("mumble mumble")
+    assert control.get_command_path_stats() == {"local": 1, "local_fallback": 1, "unrecognized": 1}
+
+
+def test_llm_command_that_ran_is_counted_once_and_not_rerouted():
+    control = voice_browser_control.VoiceBrowserControl(existing_driver=test_mocks.MockDriver())
+    control.favorites_manager = InMemoryFavoritesManager()
+    control.router.favorites_manager = control.favorites_manager
+    control.execute_route = MagicMock()
+
+    # Handlers like scroll() return None; the command still ran
+    control.scroll = MagicMock(return_value=None)
+    control.analyze_with_llm = MagicMock(return_value={"command": "Scroll down/up", "parameters": {"direction": "down"}})
+    control.process_command("move the page a little further")
+    control.scroll.assert_called_once_with("down")
+    control.execute_route.assert_not_called()
+    assert control.get_command_path_stats() == {"llm": 1}
+
+
+def test_unknown_llm_command_falls_back_to_the_router():
+    control = voice_browser_control.VoiceBrowserControl(existing_driver=test_mocks.MockDriver())
+    control.favorites_manager = InMemoryFavoritesManager()
+    control.router.favorites_manager = control.favorites_manager
+    control.analyze_with_llm = MagicMock(return_value={"command": "Dance", "parameters": {}})
+    control.execute_route = MagicMock()
+
+    control.process_command("i feel like shopping today")
+    control.execute_route.assert_called_once()
+    assert control.get_command_path_stats() == {"local_fallback": 1}
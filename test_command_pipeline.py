@@ -0,0 +1,94 @@
+import time
+import queue
+import threading
+from command_pipeline import CommandPipeline
+
+
+class Harness:
+    """Feeds text 'utterances' into a pipeline whose execute stage blocks until released"""
+
+    def __init__(self, execute_time=0.0):
+        self.utterances = queue.Queue()
+        self.recognized = []
+        self.executed = []
+        self.stops = []
+        self.release = threading.Event()
+        self.execute_time = execute_time
+        self.pipeline = CommandPipeline(
+            get_utterance=self.get_utterance,
+            recognize=self.recognize,
+            interpret=lambda text: {"command": text},
+            execute=self.execute,
+            is_stop=lambda text: text == "stop",
+            on_stop=self.stops.append
+        )
+
+    def get_utterance(self):
+        try:
+            return self.utterances.get(timeout=0.05)
+        except queue.Empty:
+            return None
+
+    def recognize(self, audio):
+        self.recognized.append(audio)
+        return audio
+
+    def execute(self, plan):
+        if plan["command"] == "slow":
+            self.release.wait(5)
+        time.sleep(self.execute_time)
+        self.executed.append(plan["command"])
+        return "EXIT" if plan["command"] == "close" else None
+
+    def say(self, *texts):
+        for text in texts:
+            self.utterances.put(text)
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_listening_continues_while_a_command_executes():
+    harness = Harness()
+    harness.pipeline.start()
+    harness.say("slow", "scroll down", "go back")
+    # Both later commands are recognized while the first one is still blocked in execution
+    assert wait_for(lambda: len(harness.recognized) == 3)
+    assert harness.executed == []
+    harness.release.set()
+    assert wait_for(lambda: harness.executed == ["slow", "scroll down", "go back"])
+    harness.pipeline.stop(1)
+
+
+def test_stop_preempts_queued_commands():
+    harness = Harness()
+    harness.pipeline.start()
+    harness.say("slow", "scroll down")
+    assert wait_for(lambda: len(harness.recognized) == 2)
+    harness.say("stop")
+    # The stop runs while the first command is still blocked, not after it
+    assert wait_for(lambda: harness.stops == ["stop"])
+    assert harness.executed == []
+    harness.release.set()
+    harness.say("go back")
+    assert wait_for(lambda: "go back" in harness.executed)
+    assert "scroll down" not in harness.executed
+    assert harness.pipeline.metrics.preempted == 1
+    harness.pipeline.stop(1)
+
+
+def test_exit_finishes_the_pipeline_and_metrics_cover_every_stage():
+    harness = Harness(execute_time=0.02)
+    harness.pipeline.start()
+    harness.say("scroll down", "close")
+    assert harness.pipeline.wait(2)
+    harness.pipeline.stop(1)
+    summary = harness.pipeline.metrics.summary()
+    assert set(summary) == {"recognize", "interpret_wait", "interpret", "execute_wait", "execute", "total"}
+    assert summary["execute"]["count"] == 2
+    assert summary["execute"]["mean_ms"] >= 20
+    assert all(not thread.is_alive() for thread in threading.enumerate() if thread.name.startswith("CommandPipeline"))
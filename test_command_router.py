@@ -0,0 +1,57 @@
+# Import our mocks first
+import test_mocks
+
+from command_router import CommandRouter, PhraseMatcher
+from benchmark_command_router import (
+    DEFAULT_CORPUS, INTENT_KEYWORDS, MOOD_KEYWORDS, InMemoryFavoritesManager, legacy_route, load_corpus
+)
+import voice_browser_control
+
+
+def make_router():
+    return CommandRouter(InMemoryFavoritesManager(), INTENT_KEYWORDS, MOOD_KEYWORDS)
+
+
+def test_phrase_matcher_matches_substring_semantics():
+    """The single-scan matcher finds exactly the phrases `phrase in text` would"""
+    phrases = ["read", "read this", "read this page", "this", "page", "stop", "stop reading", "go to", "to"]
+    matcher = PhraseMatcher(phrases)
+    for text in ["read this page now", "please stop reading", "go to google", "nothing here", "stopstop"]:
+        expected = {phrase for phrase in phrases if phrase in text}
+        assert matcher.find_all(text) == expected, text
+
+
+def test_keyword_tables_match_voice_browser_control():
+    """The benchmark copies must stay in sync with the real keyword tables"""
+    assert INTENT_KEYWORDS == voice_browser_control.INTENT_KEYWORDS
+    assert MOOD_KEYWORDS == voice_browser_control.MOOD_KEYWORDS
+
+
+def test_router_matches_legacy_cascade_on_corpus():
+    """Every recorded command is routed to the same handler as the old if/elif cascade"""
+    router = make_router()
+    for command in load_corpus(DEFAULT_CORPUS):
+        match = router.route(command)
+        actual = (match.name, match.params) if match else None
+        expected = legacy_route(router.favorites_manager, command)
+        assert actual == expected, command
+
+
+def test_router_priority_order():
+    router = make_router()
+    # Read aloud wins over every later route
+    assert router.route("read this page and scroll down").name == "read_aloud"
+    # Set favorite takes precedence over opening a category
+    assert router.route("set favorite videos to vimeo.com").name == "set_favorite"
+    # A category without a favorite falls through to later routes
+    assert router.route("open category nonexistent").name == "open_website"
+    # Products are checked before videos
+    assert router.route("tell me about the videos and products").params == {"content_type": "products"}
+    assert router.route("mumble mumble") is None
+
+
+def test_match_intent():
+    router = make_router()
+    assert router.match_intent("I want to watch a film")["category"] == "videos"
+    assert router.match_intent("take me to news") == {"intent": "open_category", "category": "news"}
+    assert router.match_intent("for music use spotify") is None
@@ -0,0 +1,85 @@
+import json
+import time
+import threading
+import test_mocks  # Mock selenium before importing the provider
+from driver_provider import resolve_driver_path, ChromeLaunch
+
+
+def make_driver_file(tmp_path, name="chromedriver"):
+    path = tmp_path / name
+    path.write_text("")
+    return str(path)
+
+
+def test_resolved_path_is_pinned_and_reused(tmp_path):
+    cache_file = str(tmp_path / "chromedriver_path.json")
+    driver = make_driver_file(tmp_path)
+    calls = []
+
+    def installer():
+        calls.append(1)
+        return driver
+
+    assert resolve_driver_path(cache_file, installer) == driver
+    assert resolve_driver_path(cache_file, installer) == driver
+    # Only the first launch resolved the driver
+    assert len(calls) == 1
+
+
+def test_stale_pin_is_used_when_offline(tmp_path):
+    cache_file = str(tmp_path / "chromedriver_path.json")
+    driver = make_driver_file(tmp_path)
+    with open(cache_file, "w") as f:
+        json.dump({"path": driver, "resolved": time.time() - 30 * 24 * 3600}, f)
+
+    def offline():
+        raise ConnectionError("no network")
+
+    assert resolve_driver_path(cache_file, offline) == driver
+
+
+def test_missing_pinned_driver_is_resolved_again(tmp_path):
+    cache_file = str(tmp_path / "chromedriver_path.json")
+    with open(cache_file, "w") as f:
+        json.dump({"path": str(tmp_path / "deleted"), "resolved": time.time()}, f)
+    driver = make_driver_file(tmp_path, "chromedriver-new")
+    assert resolve_driver_path(cache_file, lambda: driver) == driver
+    with open(cache_file) as f:
+        assert json.load(f)["path"] == driver
+
+
+def test_chrome_starts_while_the_caller_keeps_working():
+    chrome_starting = threading.Event()
+    caller_done = threading.Event()
+
+    def chrome(path, options):
+        chrome_starting.set()
+        # Chrome is still starting until the caller has finished its own initialization
+        assert caller_done.wait(5)
+        return f"driver for {path}"
+
+    launch = ChromeLaunch(None, resolve=lambda max_age=None: "/pinned/chromedriver", factory=chrome)
+    # The constructor returned while Chrome is starting on its own thread
+    assert chrome_starting.wait(5)
+    assert not launch.done.is_set()
+    # Other initialization happens here
+    caller_done.set()
+    assert launch.result() == "driver for /pinned/chromedriver"
+    assert launch.wait_seconds is not None
+
+
+def test_outdated_pinned_driver_is_resolved_again():
+    resolved = []
+
+    def resolve(max_age=None):
+        resolved.append(max_age)
+        return "/new/chromedriver" if max_age == 0 else "/old/chromedriver"
+
+    def chrome(path, options):
+        if path == "/old/chromedriver":
+            raise RuntimeError("This version of ChromeDriver only supports an older Chrome")
+        return "driver"
+
+    launch = ChromeLaunch(None, resolve=resolve, factory=chrome)
+    assert launch.result() == "driver"
+    assert resolved == [None, 0]
@@ -0,0 +1,71 @@
+import time
+import queue
+import threading
+from interrupt_monitor import InterruptMonitor
+
+
+class Microphone:
+    """Utterance queue standing in for AudioCapture; utterances are already text"""
+
+    def __init__(self):
+        self.utterances = queue.Queue()
+
+    def get_utterance(self, timeout=None):
+        try:
+            return self.utterances.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+def make_monitor():
+    microphone = Microphone()
+    stop_event = threading.Event()
+    commands = []
+    monitor = InterruptMonitor(
+        get_utterance=microphone.get_utterance,
+        recognize=lambda audio: audio,
+        on_stop=lambda phrase: stop_event.set(),
+        on_command=commands.append,
+        poll_seconds=0.02
+    )
+    return monitor, microphone, stop_event, commands
+
+
+def test_reading_many_chunks_uses_one_thread():
+    monitor, microphone, stop_event, commands = make_monitor()
+    baseline = threading.active_count()
+    threads = set()
+    # Three readings of 200 chunks each, as read_page_with_interruption would do
+    for reading in range(3):
+        monitor.start()
+        for chunk in range(200):
+            assert threading.active_count() <= baseline + 1
+        threads.add(monitor.thread)
+        monitor.stop()
+        assert monitor.wait_until_inactive(1)
+    # The same thread is reused for every reading
+    assert len(threads) == 1
+
+
+def test_stop_phrase_signals_the_reader():
+    monitor, microphone, stop_event, commands = make_monitor()
+    monitor.start()
+    microphone.utterances.put("scroll down")
+    microphone.utterances.put("Stop")
+    assert stop_event.wait(1)
+    # Other commands said during reading are passed on instead of dropped
+    assert commands == ["scroll down"]
+    monitor.stop()
+
+
+def test_microphone_is_released_when_reading_ends():
+    monitor, microphone, stop_event, commands = make_monitor()
+    monitor.start()
+    assert not monitor.wait_until_inactive(0.05)
+    monitor.stop()
+    assert monitor.wait_until_inactive(1)
+    # Utterances after monitoring ended are left for the regular listener
+    microphone.utterances.put("stop")
+    time.sleep(0.1)
+    assert not stop_event.is_set()
+    assert microphone.utterances.qsize() == 1
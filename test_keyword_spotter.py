@@ -0,0 +1,141 @@
+# Import our mocks first
+import test_mocks
+
+import json
+import math
+from array import array
+from keyword_spotter import KeywordSpotter
+from audio_capture import AudioCapture
+
+
+class WordRecognizer:
+    """Vosk stand-in: every chunk carries one word, and only grammar words are recognized"""
+
+    def __init__(self, sample_rate, grammar):
+        self.vocabulary = set(" ".join(json.loads(grammar)).split())
+        self.words = []
+
+    def AcceptWaveform(self, chunk):
+        word = chunk.decode()
+        self.words.append(word if word in self.vocabulary else "[unk]")
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": " ".join(self.words)})
+
+    def FinalResult(self):
+        return json.dumps({"text": " ".join(self.words)})
+
+    def Reset(self):
+        self.words = []
+
+
+class Audio:
+    pass
+
+
+def speak(spotter, sentence):
+    """Run one utterance through the spotter and return its audio"""
+    words = [word.encode() for word in sentence.split()]
+    spotter.start_utterance(words[:1])
+    for word in words[1:]:
+        spotter.feed(word)
+    audio = Audio()
+    spotter.end_utterance(audio)
+    return audio
+
+
+def make_spotter():
+    heard = []
+    spotter = KeywordSpotter(WordRecognizer, wake_phrase="hey browser", on_priority=heard.append)
+    spotter.open(16000)
+    return spotter, heard
+
+
+def test_only_addressed_utterances_go_to_recognition():
+    spotter, heard = make_spotter()
+    assert not spotter.accepts(speak(spotter, "did you see the game last night"))
+    assert spotter.accepts(speak(spotter, "hey browser open google"))
+    assert spotter.strip_wake_phrase("Hey browser, open google") == "open google"
+
+
+def test_wake_phrase_on_its_own_opens_the_gate_for_one_command():
+    spotter, heard = make_spotter()
+    assert not spotter.accepts(speak(spotter, "hey browser"))
+    assert spotter.accepts(speak(spotter, "scroll down"))
+    assert not spotter.accepts(speak(spotter, "and then we went home"))
+
+
+def test_priority_word_fires_while_the_utterance_is_spoken():
+    spotter, heard = make_spotter()
+    words = [word.encode() for word in "please stop stop reading this now".split()]
+    spotter.start_utterance(words[:1])
+    spotter.feed(words[1])
+    # Fired from the partial result of the chunk containing the word, once per utterance
+    assert heard == ["stop"]
+    for word in words[2:]:
+        spotter.feed(word)
+    audio = Audio()
+    spotter.end_utterance(audio)
+    assert heard == ["stop"]
+    assert audio.keywords == {"stop"}
+    assert not spotter.accepts(audio)
+
+
+class RecordingListener:
+    def __init__(self):
+        self.events = []
+
+    def open(self, sample_rate):
+        self.events.append(("open", sample_rate))
+
+    def start_utterance(self, chunks):
+        self.events.append(("start", len(chunks)))
+
+    def feed(self, chunk):
+        if self.events[-1][0] != "feed":
+            self.events.append(("feed", 0))
+        self.events[-1] = ("feed", self.events[-1][1] + 1)
+
+    def end_utterance(self, audio):
+        self.events.append(("end", audio is not None))
+
+
+def tone(amplitude, chunks, size=1024):
+    samples = array("h", (int(amplitude * math.sin(2 * math.pi * 440 * i / 16000)) for i in range(size)))
+    return [samples.tobytes()] * chunks
+
+
+class FakeMicrophone:
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+    CHUNK = 1024
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.stream = self
+
+    def read(self, size):
+        return self.chunks.pop(0) if self.chunks else b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+def test_capture_streams_each_utterance_to_listeners():
+    listener = RecordingListener()
+    chunks = tone(20, 20) + tone(8000, 10) + tone(20, 20)
+    capture = AudioCapture(source_factory=lambda: FakeMicrophone(chunks))
+    capture.add_listener(listener)
+    capture.start()
+    assert capture.get_utterance(timeout=2) is not None
+    capture.stop(1)
+    assert listener.events[0] == ("open", 16000)
+    kinds = [event[0] for event in listener.events]
+    assert kinds == ["open", "start", "feed", "end"]
+    # The utterance starts with the pre-roll ring buffer and ends with a kept utterance
+    assert listener.events[1][1] > 1
+    assert listener.events[3] == ("end", True)
@@ -0,0 +1,55 @@
+import os
+
+from llm_cache import LLMResponseCache, fingerprint
+
+STOP_WORDS = ["the", "a", "to", "for", "this", "me", "please", "up", "down", "no"]
+COMMAND = {"command": "Open website", "parameters": {"website": "youtube.com"}}
+
+
+def make_cache(path, definitions=("v1",), **kwargs):
+    return LLMResponseCache(cache_file=str(path), definitions_fingerprint=fingerprint(*definitions),
+                            stop_words=STOP_WORDS, protected_words={"up", "down"}, **kwargs)
+
+
+def test_normalized_hits_and_stats(tmp_path):
+    cache = make_cache(tmp_path / "cache.json")
+    assert cache.get("Open YouTube", "prompt") is None
+    cache.put("Open YouTube", "prompt", COMMAND)
+
+    # Stopwords and case do not matter, the prompt hash does
+    assert cache.get("please open the youtube", "prompt") == COMMAND
+    assert cache.get("open youtube", "other-prompt") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_protected_words_keep_commands_apart(tmp_path):
+    cache = make_cache(tmp_path / "cache.json")
+    assert cache.normalize("Scroll up") != cache.normalize("Scroll down")
+    assert cache.normalize("no, don't play it") == "no don't play it"
+
+
+def test_persistence_and_invalidation(tmp_path):
+    path = tmp_path / "cache.json"
+    make_cache(path).put("open youtube", "prompt", COMMAND)
+
+    assert make_cache(path).get("open youtube", "prompt") == COMMAND
+    # Changed command definitions discard everything on load
+    assert make_cache(path, definitions=("v2",)).get("open youtube", "prompt") is None
+
+
+def test_lru_and_ttl_eviction(tmp_path):
+    cache = make_cache(tmp_path / "cache.json", max_entries=2)
+    cache.put("open google", "p", 1)
+    cache.put("open youtube", "p", 2)
+    cache.get("open google", "p")
+    cache.put("open amazon", "p", 3)
+    assert cache.get("open youtube", "p") is None
+    assert cache.get("open google", "p") == 1
+    assert cache.stats()["evictions"] == 1
+
+    expired = make_cache(tmp_path / "expired.json", ttl=-1)
+    expired.put("open google", "p", 1)
+    assert expired.get("open google", "p") is None
+    assert expired.stats()["expirations"] == 1
+    assert os.path.exists(tmp_path / "expired.json")
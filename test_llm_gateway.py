@@ -0,0 +1,213 @@
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+import pytest
+import test_mocks  # Mock groq before importing the gateway
+from llm_gateway import LLMGateway
+
+
+class APIConnectionError(Exception):
+    """Same name as the Groq SDK error, which is retryable"""
+
+
+class BadRequestError(Exception):
+    status_code = 400
+
+
+def response(text, prompt_tokens=10, completion_tokens=5):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=f" {text} "))],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+    )
+
+
+class Stream:
+    def __init__(self, deltas):
+        self.chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+                       for delta in deltas]
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClient:
+    """Chat completions endpoint replaying a script of results; exceptions are raised"""
+
+    def __init__(self, results, delay=0.0, release=None):
+        self.results = list(results)
+        self.delay = delay
+        # When given, every request blocks until this event is set
+        self.release = release
+        self.requests = []
+        self.started = threading.Event()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **request):
+        self.requests.append(request)
+        self.started.set()
+        if self.release is not None:
+            self.release.wait(5)
+        time.sleep(self.delay)
+        result = self.results.pop(0) if len(self.results) > 1 else self.results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def make_gateway(client, **options):
+    return LLMGateway(api_key="test", client_factory=lambda api_key, timeout: client, backoff_seconds=0.01, **options)
+
+
+def test_transient_errors_are_retried_with_metrics():
+    client = FakeClient([APIConnectionError("reset"), response('{"command": "Scroll down/up"}')])
+    gateway = make_gateway(client)
+    assert gateway.complete([{"role": "user", "content": "scroll"}], purpose="command interpretation") \
+        == '{"command": "Scroll down/up"}'
+    assert len(client.requests) == 2
+    metrics = gateway.metrics
+    assert metrics.calls["command interpretation"] == 2
+    assert metrics.retries["command interpretation"] == 1
+    assert metrics.errors[("command interpretation", "APIConnectionError")] == 1
+    assert metrics.prompt_tokens["command interpretation"] == 10
+    assert sum(metrics.histogram("command interpretation").values()) == 2
+    # Every request carries the remaining deadline
+    assert all(0 < request["timeout"] <= gateway.timeout for request in client.requests)
+
+
+def test_only_idempotent_transient_failures_are_retried():
+    client = FakeClient([BadRequestError("invalid prompt")])
+    gateway = make_gateway(client)
+    with pytest.raises(BadRequestError):
+        gateway.complete([], purpose="page analysis")
+    assert len(client.requests) == 1
+
+    client = FakeClient([APIConnectionError("reset")])
+    gateway = make_gateway(client)
+    with pytest.raises(APIConnectionError):
+        gateway.complete([], purpose="page analysis", idempotent=False)
+    assert len(client.requests) == 1
+
+
+def test_deadline_bounds_waiting_for_a_slot():
+    release = threading.Event()
+    client = FakeClient([response("slow")], release=release)
+    gateway = make_gateway(client, max_concurrency=1)
+    worker = threading.Thread(target=gateway.complete, args=([], "page analysis"))
+    worker.start()
+    assert client.started.wait(5)
+    with pytest.raises(TimeoutError):
+        gateway.complete([], purpose="command interpretation", timeout=0.1)
+    # The deadline ran out while the only slot was still taken
+    assert worker.is_alive()
+    assert len(client.requests) == 1
+    release.set()
+    worker.join()
+
+
+def test_stream_yields_deltas_and_frees_its_slot():
+    stream = Stream(["The page ", "shows ", "news."])
+    gateway = make_gateway(FakeClient([stream]), max_concurrency=1)
+    assert "".join(gateway.stream([], purpose="page description")) == "The page shows news."
+    assert stream.closed
+
+    # A stream closed early gives its slot back too
+    stream = Stream(["One. ", "Two."])
+    gateway = make_gateway(FakeClient([stream, response("next")]), max_concurrency=1)
+    deltas = gateway.stream([], purpose="page description")
+    next(deltas)
+    deltas.close()
+    assert stream.closed
+    assert gateway.complete([], purpose="command interpretation", timeout=0.1) == "next"
+
+
+def test_unavailable_without_api_key(monkeypatch):
+    monkeypatch.delenv("GROQ_API_KEY", raising=False)
+    gateway = LLMGateway(api_key=None)
+    assert not gateway.available
+    with pytest.raises(RuntimeError):
+        gateway.complete([], purpose="command interpretation")
+
+
+class FakeAsyncClient:
+    """Async chat completions endpoint answering each prompt after the delay given in the prompt"""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+        self.cancelled = []
+        # ("start" or "end", prompt) in the order requests started and finished
+        self.events = []
+
+    async def create(self, messages, **request):
+        text = messages[-1]["content"]
+        delay = float(text.split(":")[1])
+        self.events.append(("start", text))
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled.append(text)
+            raise
+        self.events.append(("end", text))
+        if text.startswith("fail"):
+            raise BadRequestError("invalid prompt")
+        return response(text)
+
+
+def make_async_gateway(**options):
+    async_client = FakeAsyncClient()
+    gateway = make_gateway(FakeClient([response("unused")]),
+                           async_client_factory=lambda api_key, timeout: async_client, **options)
+    return gateway, async_client
+
+
+def calls(**prompts):
+    return {key: {"messages": [{"role": "user", "content": prompt}], "purpose": "content description"}
+            for key, prompt in prompts.items()}
+
+
+def test_concurrent_calls_are_all_in_flight_at_once():
+    gateway, async_client = make_async_gateway()
+    results = list(gateway.complete_concurrently(calls(videos="videos:0.2", products="products:0.1",
+                                                       images="images:0.3")))
+    # Every request was in flight before the first one finished
+    assert [event for event, text in async_client.events[:3]] == ["start"] * 3
+    # Results arrive in order of completion
+    assert [key for key, text, error in results] == ["products", "videos", "images"]
+    assert gateway.metrics.calls["content description"] == 3
+
+
+def test_concurrent_failures_are_reported_per_call():
+    gateway, async_client = make_async_gateway()
+    results = dict((key, (text, error)) for key, text, error in
+                   gateway.complete_concurrently(calls(videos="videos:0", articles="fail:0")))
+    assert results["videos"] == ("videos:0", None)
+    assert results["articles"][0] is None
+    assert isinstance(results["articles"][1], BadRequestError)
+
+
+def test_closing_early_cancels_the_remaining_calls():
+    gateway, async_client = make_async_gateway(max_concurrency=2)
+    results = gateway.complete_concurrently(calls(products="products:0", videos="videos:5"))
+    assert next(results)[0] == "products"
+    results.close()
+    time.sleep(0.1)
+    assert async_client.cancelled == ["videos:5"]
+    # The cancelled call gave its slot back
+    assert gateway.complete([], purpose="command interpretation", timeout=0.2) == "unused"
+
+
+def test_stopping_while_waiting_cancels_the_calls_at_once():
+    gateway, async_client = make_async_gateway()
+    stop = threading.Event()
+    threading.Timer(0.1, stop.set).start()
+    start = time.monotonic()
+    results = list(gateway.complete_concurrently(calls(products="products:5", videos="videos:5"),
+                                                 should_stop=stop.is_set, poll_seconds=0.02))
+    assert results == []
+    assert time.monotonic() - start < 1
+    time.sleep(0.1)
+    assert sorted(async_client.cancelled) == ["products:5", "videos:5"]
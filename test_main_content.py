@@ -0,0 +1,78 @@
+import os
+from bs4 import BeautifulSoup
+from main_content import find_main_content
+from page_reader import iter_paragraphs, main_content_text
+from prompt_registry import estimate_tokens
+from benchmark_main_content import legacy_spoken_text
+from benchmark_page_structure import DEFAULT_FIXTURES, load_fixtures
+
+CLUTTERED_ARTICLE = """
+<html><head><title>Story</title></head><body>
+<div class="cookie-banner"><p>We use cookies to improve your experience on this website, please accept them.</p></div>
+<nav><a href="/">Home</a> <a href="/news">News</a> <a href="/sport">Sport</a></nav>
+<div class="content-wrapper">
+  <h1>The Headline Of The Story</h1>
+  <div class="story-body">
+    <p>The first paragraph explains, in some detail, what happened and why it matters to the reader.</p>
+    <p>A second paragraph adds background, quotes, and context that a listener would want to hear.</p>
+    <h2>Reactions</h2>
+    <p>The third paragraph covers reactions from people involved, along with what comes next.</p>
+  </div>
+  <div class="related-links"><a href="/a">Another story you might like to read today</a><a href="/b">And one more story</a></div>
+</div>
+<div id="comments"><p>First comment from a reader who has an opinion about all of this, at length.</p></div>
+<footer><p>Copyright 2024, Example News, all rights reserved, terms and privacy apply.</p></footer>
+</body></html>
+"""
+
+
+def load_fixture(name):
+    with open(os.path.join(DEFAULT_FIXTURES, name), "r", encoding="utf-8") as f:
+        return BeautifulSoup(f.read(), "lxml")
+
+
+def test_main_content_keeps_headings_and_drops_boilerplate():
+    """The story and its headings are kept, banners, navigation, related links and comments are not"""
+    soup = BeautifulSoup(CLUTTERED_ARTICLE, "html.parser")
+    paragraphs = main_content_text(soup).split("\n")
+    assert paragraphs[0] == "The Headline Of The Story"
+    assert "Reactions" in paragraphs
+    assert len([p for p in paragraphs if p.startswith("The ") or p.startswith("A second")]) == 4
+    for boilerplate in ("cookies", "Sport", "Another story", "First comment", "Copyright"):
+        assert boilerplate not in main_content_text(soup)
+
+
+def test_main_content_falls_back_when_nothing_scores():
+    """Pages without prose paragraphs are read from the main region instead"""
+    soup = BeautifulSoup("<html><body><main><div>Track one by the first artist</div></main></body></html>", "html.parser")
+    assert find_main_content(soup) == []
+    assert main_content_text(soup) == "Track one by the first artist"
+
+
+def test_short_blocks_are_joined_and_lone_labels_skipped():
+    """Rows of short cells are read together without numbers and durations, a single short label is not read"""
+    soup = BeautifulSoup("<div><div>Share</div><p>This paragraph is long enough to read.</p>"
+                         "<div>1</div><div>Song Title</div><div>Artist Name</div><div>3:42</div></div>", "html.parser")
+    assert list(iter_paragraphs(soup.div)) == ["This paragraph is long enough to read.", "Song Title, Artist Name"]
+
+
+def test_article_fixture_keeps_only_the_article():
+    """Everything outside the article is dropped; on this fixture that is about 15% of the tokens"""
+    soup = load_fixture("article.html")
+    main_text = main_content_text(soup)
+    legacy_text = legacy_spoken_text(soup)
+    assert main_text.startswith("How Wireless Audio Works")
+    assert main_text == "\n".join(iter_paragraphs(soup.find("article")))
+    assert estimate_tokens(main_text) <= 0.87 * estimate_tokens(legacy_text)
+    # Every article paragraph is still there
+    article_paragraphs = [p.get_text(" ", strip=True) for p in soup.select("article.story > p")]
+    assert len(article_paragraphs) == 40
+    for paragraph in article_paragraphs:
+        assert " ".join(paragraph.split()) in main_text
+
+
+def test_no_fixture_page_grows():
+    """Main content never speaks or sends more than the text read_page_aloud used before"""
+    for name, html in load_fixtures(DEFAULT_FIXTURES):
+        soup = BeautifulSoup(html, "lxml")
+        assert estimate_tokens(main_content_text(soup)) <= estimate_tokens(legacy_spoken_text(soup)), name
@@ -62,6 +62,12 @@ class MockTTS:
     def runAndWait(self):
         pass
     
+    def connect(self, topic, callback):
+        pass
+    
+    def stop(self):
+        pass
+    
     def init(self):
         return self
 
@@ -98,7 +104,11 @@ sys.modules['webdriver_manager.chrome'] = MagicMock()
 sys.modules['webdriver_manager.chrome'].ChromeDriverManager = lambda: MagicMock()
 
 sys.modules['groq'] = MagicMock()
-sys.modules['bs4'] = MagicMock()
+# BeautifulSoup is pure Python and the page parsing tests use the real thing
+try:
+    import bs4
+except ImportError:
+    sys.modules['bs4'] = MagicMock()
 sys.modules['nltk'] = MagicMock()
 sys.modules['nltk.tokenize'] = MagicMock()
 sys.modules['nltk.corpus'] = MagicMock()
@@ -107,4 +117,14 @@ sys.modules['nltk.corpus'] = MagicMock()
 sys.modules['advanced_page_analyzer'] = MagicMock()
 sys.modules['advanced_page_analyzer'].AdvancedPageAnalyzer = lambda x: MagicMock()
 sys.modules['youtube_controller'] = MagicMock()
-sys.modules['youtube_controller'].YouTubeController = lambda x, y: MagicMock() 
\ No newline at end of file
+sys.modules['youtube_controller'].YouTubeController = lambda *args, **kwargs: MagicMock() 
+
+def load_real_module(name):
+    """Load one of our modules that is mocked above, e.g. to test it with the third-party mocks in place"""
+    import os
+    import importlib.util
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{name}.py")
+    spec = importlib.util.spec_from_file_location(f"real_{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
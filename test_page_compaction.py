@@ -0,0 +1,71 @@
+import json
+
+from bs4 import BeautifulSoup
+from page_structure import extract_page_structure
+from page_compaction import compact_page_info, compact_entry, CATEGORY_ORDER
+from benchmark_page_structure import DEFAULT_FIXTURES, load_fixtures
+
+LONG_URL = "https://images.example.com/products/" + "a1b2c3d4" * 20 + ".jpg?width=640&quality=80"
+
+
+def make_page_info():
+    return {
+        "title": "Shop",
+        "url": "https://shop.example.com",
+        "products": [
+            {"name": "Trail Running Shoe", "price": "$89", "seller": None, "rating": "", "description": "Light " * 100},
+            {"name": "Rain Jacket", "price": "$120", "seller": "Outdoor Co", "rating": "4.5", "description": None},
+        ],
+        # The same .item elements matched as cards
+        "cards": [
+            {"title": "Trail Running Shoe", "author": None, "date": None, "summary": "$89"},
+            {"title": "Spring sale starts today", "author": "Editor", "date": "May 1", "summary": None},
+        ],
+        "videos": [{"title": "Shoe review", "creator": None, "duration": "3:12", "src": LONG_URL}],
+        "music": [],
+        "images": [{"alt": "Rain Jacket", "src": LONG_URL}, {"alt": "Store front", "src": LONG_URL}],
+        "links": [{"text": "Trail Running Shoe", "href": LONG_URL}, {"text": "Returns policy", "href": "/returns"}],
+    }
+
+
+def test_entries_lose_urls_empty_fields_and_long_text():
+    product = compact_entry(make_page_info()["products"][0])
+    assert set(product) == {"name", "price", "description"}
+    assert len(product["description"]) <= 160
+    assert compact_entry({"src": LONG_URL, "title": None}) is None
+
+
+def test_entries_are_deduplicated_across_categories():
+    compacted = compact_page_info(make_page_info())
+    items = compacted["items"]
+    assert [card["title"] for card in items["cards"]] == ["Spring sale starts today"]
+    assert [image["alt"] for image in items["images"]] == ["Store front"]
+    assert [link["text"] for link in items["links"]] == ["Returns policy"]
+    assert compacted["counts"]["products"] == 2
+    assert compacted["counts"]["cards"] == 1
+    assert LONG_URL not in json.dumps(items)
+
+
+def test_single_category_keeps_its_own_entries():
+    # Describing articles must not lose the cards that are also products
+    compacted = compact_page_info(make_page_info(), ["cards"], per_category=10)
+    assert compacted["counts"]["cards"] == 2
+
+
+def test_token_budget_is_respected():
+    page_info = make_page_info()
+    page_info["links"] = [{"text": f"Category page number {i} with a long name", "href": LONG_URL} for i in range(50)]
+    compacted = compact_page_info(page_info, per_category=50, token_budget=250)
+    assert compacted["tokens_after"] <= 250
+    assert len(compacted["items"]["links"]) < 50
+    assert compacted["tokens_after"] < compacted["tokens_before"]
+    # Every category is still represented
+    assert all(compacted["items"][category] for category in ("products", "cards", "videos", "images", "links"))
+
+
+def test_fixture_pages_shrink():
+    for name, html in load_fixtures(DEFAULT_FIXTURES):
+        page_info = extract_page_structure(BeautifulSoup(html, "html.parser"), f"https://example.com/{name}")
+        compacted = compact_page_info(page_info, CATEGORY_ORDER, per_category=5, token_budget=1500)
+        assert compacted["tokens_after"] <= 1500, name
+        assert compacted["tokens_after"] < compacted["tokens_before"], name
@@ -0,0 +1,88 @@
+import page_reader
+from page_snapshot import PageSnapshot
+from page_reader import PageReader
+
+ARTICLE = """
+<html><body><nav>Home News Sports Weather</nav><article>
+<h1>Rivers rise after a week of rain</h1>
+<p>Heavy rain fell across the valley for seven days in a row.</p>
+<p>Several roads near the river were closed on Tuesday morning.</p>
+<p>Officials expect the water to go down again by the weekend.</p>
+</article><footer>Contact us about this story</footer></body></html>
+"""
+
+OTHER = "<html><body><main><p>This is a different page with its own text.</p></main></body></html>"
+
+
+class Snapshots:
+    """The part of PageSnapshotCache the reader uses, showing whichever page the test opened"""
+
+    def __init__(self, url, html):
+        self.open(url, html)
+
+    def open(self, url, html):
+        self.snapshot = PageSnapshot(url, "fingerprint", html)
+
+    def current(self):
+        return self.snapshot
+
+
+def read(paragraphs, count):
+    """Read `count` paragraphs, then stop like "stop reading" does"""
+    read = [next(paragraphs) for _ in range(count)]
+    paragraphs.close()
+    return read
+
+
+def test_reads_the_main_content_from_the_top():
+    reader = PageReader(Snapshots("https://news.example.com/rain", ARTICLE))
+    assert list(reader.paragraphs()) == [
+        "Rivers rise after a week of rain",
+        "Heavy rain fell across the valley for seven days in a row.",
+        "Several roads near the river were closed on Tuesday morning.",
+        "Officials expect the water to go down again by the weekend.",
+    ]
+    # Finishing the page starts over next time
+    assert not reader.can_resume("https://news.example.com/rain")
+
+
+def test_stop_and_resume_at_the_interrupted_paragraph():
+    reader = PageReader(Snapshots("https://news.example.com/rain", ARTICLE))
+    assert read(reader.paragraphs(), 2)[-1] == "Heavy rain fell across the valley for seven days in a row."
+    assert reader.can_resume("https://news.example.com/rain")
+    # The paragraph that was being spoken when reading stopped is read again
+    assert list(reader.paragraphs()) == [
+        "Heavy rain fell across the valley for seven days in a row.",
+        "Several roads near the river were closed on Tuesday morning.",
+        "Officials expect the water to go down again by the weekend.",
+    ]
+
+
+def test_another_page_starts_from_the_top():
+    snapshots = Snapshots("https://news.example.com/rain", ARTICLE)
+    reader = PageReader(snapshots)
+    read(reader.paragraphs(), 3)
+    snapshots.open("https://news.example.com/other", OTHER)
+    assert not reader.can_resume("https://news.example.com/other")
+    assert list(reader.paragraphs()) == ["This is a different page with its own text."]
+    # Coming back to the first page does not resume either
+    snapshots.open("https://news.example.com/rain", ARTICLE)
+    assert next(reader.paragraphs()) == "Rivers rise after a week of rain"
+
+
+def test_reset_forgets_the_position():
+    reader = PageReader(Snapshots("https://news.example.com/rain", ARTICLE))
+    read(reader.paragraphs(), 2)
+    reader.reset()
+    assert not reader.can_resume("https://news.example.com/rain")
+    assert next(reader.paragraphs()) == "Rivers rise after a week of rain"
+
+
+def test_resuming_does_not_score_the_page_again(monkeypatch):
+    scored = []
+    find_main_content = page_reader.find_main_content
+    monkeypatch.setattr(page_reader, "find_main_content", lambda soup: scored.append(1) or find_main_content(soup))
+    reader = PageReader(Snapshots("https://news.example.com/rain", ARTICLE))
+    read(reader.paragraphs(), 2)
+    assert len(list(reader.paragraphs())) == 3
+    assert scored == [1]
@@ -0,0 +1,91 @@
+from page_snapshot import PageSnapshotCache
+
+
+class SnapshotDriver:
+    """Driver whose page the test changes by navigating or mutating the DOM"""
+
+    def __init__(self):
+        self.current_url = "https://example.com/"
+        self.document = "doc1"
+        self.mutations = 0
+        self.sources = 0
+        self.observer = True
+        # Mutations the page makes while its source is fetched
+        self.mutate_during_fetch = 0
+
+    @property
+    def page_source(self):
+        self.sources += 1
+        self.mutations += self.mutate_during_fetch
+        return f"<html><head><title>{self.current_url} {self.mutations}</title></head><body></body></html>"
+
+    def execute_script(self, script, *args):
+        if not self.observer:
+            raise Exception("javascript error")
+        return f"{self.document}:{self.mutations}:complete"
+
+    def navigate(self, url):
+        self.current_url = url
+        self.document = f"doc{self.sources + 2}"
+
+
+def test_unchanged_page_reuses_the_snapshot_and_its_views():
+    driver = SnapshotDriver()
+    cache = PageSnapshotCache(driver)
+    builds = []
+    first = cache.current()
+    first.view("text", lambda snapshot: builds.append(1) or snapshot.title)
+    second = cache.current()
+    assert second is first
+    assert second.view("text", lambda snapshot: builds.append(1)) == "https://example.com/ 0"
+    assert builds == [1]
+    assert (driver.sources, cache.hits, cache.misses) == (1, 1, 1)
+
+
+def test_url_change_replaces_the_snapshot():
+    driver = SnapshotDriver()
+    cache = PageSnapshotCache(driver)
+    first = cache.current()
+    driver.current_url = "https://example.com/#reviews"
+    assert cache.current() is not first
+    driver.navigate("https://example.org/")
+    assert cache.current().title.startswith("https://example.org/")
+    assert driver.sources == 3
+
+
+def test_dom_change_replaces_the_snapshot():
+    driver = SnapshotDriver()
+    cache = PageSnapshotCache(driver)
+    first = cache.current()
+    driver.mutations += 1
+    second = cache.current()
+    assert second is not first
+    assert cache.current() is second
+    # A reload keeps the URL but starts a new document
+    driver.document = "reloaded"
+    assert cache.current() is not second
+
+
+def test_page_changing_while_fetched_is_not_reused():
+    driver = SnapshotDriver()
+    driver.mutate_during_fetch = 1
+    cache = PageSnapshotCache(driver)
+    cache.current()
+    cache.current()
+    assert driver.sources == 2
+
+
+def test_without_a_fingerprint_the_snapshot_is_never_reused():
+    driver = SnapshotDriver()
+    driver.observer = False
+    cache = PageSnapshotCache(driver)
+    assert cache.current() is not cache.current()
+    assert cache.hits == 0
+
+
+def test_invalidate_forces_a_new_snapshot():
+    driver = SnapshotDriver()
+    cache = PageSnapshotCache(driver)
+    first = cache.current()
+    cache.invalidate()
+    assert cache.current() is not first
@@ -0,0 +1,210 @@
+import os
+import json
+import shutil
+import subprocess
+
+import pytest
+from bs4 import BeautifulSoup, Tag, NavigableString, Comment, Declaration, Doctype, ProcessingInstruction
+import page_structure
+from page_structure import extract_page_structure
+from page_structure_js import EXTRACTOR_SCRIPT, CALL_EXTRACTOR_SCRIPT, LIMITS, extract_page_structure_in_browser
+from benchmark_page_structure import DEFAULT_FIXTURES, legacy_extract_page_structure, load_fixtures
+
+EDGE_CASES = """
+<html><head><title>Edge cases</title></head><body>
+<h2>First heading</h2>
+<div class="product item card"><h3 class="name">Nested</h3><div class="item"><span class="price">$1</span></div><span class="stars">5</span><p>Summary</p></div>
+<h2 class="video-heading">Video heading</h2><video><source src="a.mp4"></video><iframe src="https://youtube.com/embed/x"></iframe>
+<a href="#top"><h1>Anchor link</h1></a><a href=""><h2>Empty link</h2></a><a href="/page"><div><h3>Real link</h3></div></a>
+<a class="main-link">Main</a><a class="primary-link" href="#"></a>
+<img alt=" "><img alt="icon" width="16"><img alt="Photo" height="20"><img src="no-alt.png">
+<div class="music-track" aria-label="Labelled"><span class="track-time">3:00</span></div><audio title="Audio"></audio>
+<div id="product-1"><time>Today</time></div><div data-component="product-card">Data component</div>
+</body></html>
+"""
+
+
+def test_walker_matches_select_extraction_on_edge_cases():
+    """Nested containers, find_previous headings and link rules behave like the CSS selectors"""
+    for parser in ("html.parser", "lxml"):
+        soup = BeautifulSoup(EDGE_CASES, parser)
+        assert extract_page_structure(soup, "about:blank") == legacy_extract_page_structure(soup, "about:blank"), parser
+
+
+def test_walker_matches_select_extraction_on_fixture_pages():
+    """Every saved fixture page yields the same page_info as the original extraction"""
+    fixtures = load_fixtures(DEFAULT_FIXTURES)
+    assert fixtures
+    for name, html in fixtures:
+        soup = BeautifulSoup(html, "lxml")
+        assert extract_page_structure(soup, name) == legacy_extract_page_structure(soup, name), name
+
+
+def test_walker_stops_early_when_all_categories_are_full(monkeypatch):
+    """Once every category reaches its limit the rest of the document is not visited"""
+    for name in ("PRODUCT_LIMIT", "VIDEO_LIMIT", "CARD_LIMIT", "MUSIC_LIMIT", "IMAGE_LIMIT", "LINK_LIMIT"):
+        monkeypatch.setattr(page_structure, name, 1)
+    html = ('<div class="product"><span class="price">1</span><span class="name seller rating description">x</span></div>'
+            '<video src="v.mp4"><source src="v.mp4"><span class="duration">1:00</span></video>'
+            '<article><h2>t</h2><span class="byline">b</span><time>d</time><p>s</p></article>'
+            '<audio><span class="title">a</span><span class="artist">b</span><span class="album">c</span><span class="time">d</span></audio>'
+            '<img alt="first"><a class="main-link" href="/a">link</a>'
+            '<img alt="never reached">')
+    visited = []
+
+    class CountingNodeInfo(page_structure.NodeInfo):
+        def __init__(self, tag):
+            super().__init__(tag)
+            visited.append(tag.get("alt"))
+
+    monkeypatch.setattr(page_structure, "NodeInfo", CountingNodeInfo)
+    page_info = extract_page_structure(BeautifulSoup(html, "html.parser"), "about:blank")
+    assert len(page_info["products"]) == len(page_info["videos"]) == len(page_info["cards"]) == len(page_info["music"]) == 1
+    assert "first" in visited
+    assert "never reached" not in visited
+
+
+class ExtractorDriver:
+    """Fake driver that mimics a document with or without the extractor installed"""
+
+    current_url = "https://example.com/"
+
+    def __init__(self, page_info):
+        self.page_info = page_info
+        self.installed = False
+        self.scripts = []
+
+    def execute_script(self, script, *args):
+        self.scripts.append(script)
+        if EXTRACTOR_SCRIPT in script:
+            self.installed = True
+        if not self.installed:
+            return None
+        assert args == (LIMITS,)
+        return json.dumps(self.page_info)
+
+
+def test_browser_backend_installs_extractor_once():
+    """The extractor is sent with the first call only and the result has the page_info shape"""
+    soup = BeautifulSoup(EDGE_CASES, "lxml")
+    expected = extract_page_structure(soup, ExtractorDriver.current_url)
+    driver = ExtractorDriver({key: value for key, value in expected.items() if key != "url"})
+
+    assert extract_page_structure_in_browser(driver) == expected
+    assert extract_page_structure_in_browser(driver) == expected
+    assert [EXTRACTOR_SCRIPT in script for script in driver.scripts] == [False, True, False]
+
+
+# Loads a page in jsdom, which parses HTML like a browser, and prints the
+# extractor's result together with the serialized DOM a driver's page_source would return
+JSDOM_RUNNER = """
+const fs = require('fs');
+const { JSDOM } = require('jsdom');
+const [html, script, limits] = JSON.parse(fs.readFileSync(0, 'utf8'));
+const dom = new JSDOM(html, { runScripts: 'outside-only' });
+const run = dom.window.eval('(function() {' + script + '})');
+process.stdout.write(JSON.stringify({ result: run(limits), source: dom.serialize() }));
+"""
+
+
+def run_node(script, stdin=""):
+    """Run a node script from the repository directory, where a local node_modules is found"""
+    return subprocess.run([shutil.which("node"), "-e", script], input=stdin, capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+
+
+def jsdom_available():
+    return shutil.which("node") is not None and run_node("require('jsdom')").returncode == 0
+
+
+@pytest.mark.skipif(not jsdom_available(), reason="needs node with the jsdom package (npm install jsdom)")
+def test_extractor_script_matches_python_on_fixture_pages():
+    """The JavaScript extractor returns the same page_info as parsing the page source in Python"""
+    pages = load_fixtures(DEFAULT_FIXTURES) + [("edge_cases.html", EDGE_CASES)]
+    for name, html in pages:
+        request = json.dumps([html, EXTRACTOR_SCRIPT + CALL_EXTRACTOR_SCRIPT, LIMITS])
+        completed = run_node(JSDOM_RUNNER, request)
+        assert completed.returncode == 0, completed.stderr
+        output = json.loads(completed.stdout)
+        browser = json.loads(output["result"])
+        python = extract_page_structure(BeautifulSoup(output["source"], "lxml"), name)
+        assert {"url": name, **browser} == python, name
+
+
+# A minimal DOM, just the part the extractor uses, built from a parsed page
+# sent as JSON. Needs nothing but node, so the extractor is checked against the
+# Python walker on the same tree wherever node is installed. Like a browser, it
+# keeps template contents out of the walked tree.
+DOM_HARNESS_RUNNER = """
+const fs = require('fs');
+const [tree, script, limits] = JSON.parse(fs.readFileSync(0, 'utf8'));
+global.Node = { ELEMENT_NODE: 1, TEXT_NODE: 3, COMMENT_NODE: 8 };
+global.NodeFilter = { SHOW_TEXT: 4, SHOW_CDATA_SECTION: 8 };
+global.window = {};
+
+function link(node) {
+    const elements = node.childNodes.filter(child => child.nodeType === 1);
+    node.firstElementChild = elements[0] || null;
+    elements.forEach((element, i) => { element.nextElementSibling = elements[i + 1] || null; });
+}
+function build(spec, parent) {
+    if (typeof spec === 'string') return { nodeType: 3, data: spec, parentNode: parent, childNodes: [] };
+    if (spec.other !== undefined) return { nodeType: 8, data: spec.other, parentNode: parent, childNodes: [] };
+    const element = {
+        nodeType: 1, localName: spec.tag, parentNode: parent, attributes: spec.attrs,
+        hasAttribute(name) { return Object.prototype.hasOwnProperty.call(this.attributes, name); },
+        getAttribute(name) { return this.hasAttribute(name) ? this.attributes[name] : null; }
+    };
+    const children = spec.children.map(child => build(child, element));
+    if (spec.tag === 'template') {
+        element.content = { childNodes: children };
+        element.childNodes = [];
+    } else {
+        element.childNodes = children;
+    }
+    link(element);
+    return element;
+}
+function* descendants(node) {
+    for (const child of node.childNodes) {
+        yield child;
+        yield* descendants(child);
+    }
+}
+
+const document = global.document = { nodeType: 9, parentNode: null };
+document.childNodes = tree.map(child => build(child, document));
+link(document);
+document.getElementsByTagName = name => [...descendants(document)].filter(
+    node => node.nodeType === 1 && node.localName === name);
+document.createTreeWalker = (root, whatToShow) => {
+    const nodes = [...descendants(root)].filter(node => node.nodeType === 3 && whatToShow & NodeFilter.SHOW_TEXT);
+    let index = 0;
+    return { nextNode: () => index < nodes.length ? nodes[index++] : null };
+};
+process.stdout.write(new Function(script).call(null, limits));
+"""
+
+
+def dom_tree(node):
+    """A parsed node as the JSON the DOM harness builds its document from"""
+    if isinstance(node, Tag):
+        attrs = {name: " ".join(value) if isinstance(value, list) else value for name, value in node.attrs.items()}
+        return {"tag": node.name, "attrs": attrs, "children": [dom_tree(child) for child in node.contents
+                                                                if not isinstance(child, Doctype)]}
+    if isinstance(node, (Comment, Declaration, ProcessingInstruction)):
+        return {"other": str(node)}
+    return str(node)
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_extractor_script_matches_python_on_the_same_tree():
+    """The JavaScript extractor returns the same page_info as the Python walker on the same parsed page"""
+    pages = load_fixtures(DEFAULT_FIXTURES) + [("edge_cases.html", EDGE_CASES)]
+    for name, html in pages:
+        soup = BeautifulSoup(html, "lxml")
+        tree = [dom_tree(child) for child in soup.contents if not isinstance(child, Doctype)]
+        request = json.dumps([tree, EXTRACTOR_SCRIPT + CALL_EXTRACTOR_SCRIPT, LIMITS])
+        completed = run_node(DOM_HARNESS_RUNNER, request)
+        assert completed.returncode == 0, completed.stderr
+        assert {"url": name, **json.loads(completed.stdout)} == extract_page_structure(soup, name), name
@@ -0,0 +1,121 @@
+import json
+import time
+import pytest
+from page_waits import PageWaiter
+
+
+def network_event(method, request_id):
+    return {"message": json.dumps({"message": {"method": method, "params": {"requestId": request_id}}})}
+
+
+class LoadingDriver:
+    """Driver whose page becomes interactive after a delay and whose requests finish on schedule"""
+
+    def __init__(self, interactive_after=0.1, log_events=None, performance_log=True):
+        self.start = time.monotonic()
+        self.interactive_after = interactive_after
+        # (seconds after start, event) pairs handed out by get_log once they are due
+        self.log_events = list(log_events or [])
+        self.performance_log = performance_log
+        self.resources = 0
+
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    def execute_script(self, script):
+        if "readyState" in script:
+            return "interactive" if self.elapsed() >= self.interactive_after else "loading"
+        return self.resources
+
+    def get_log(self, log_type):
+        if not self.performance_log:
+            raise Exception("log type 'performance' not found")
+        due = [event for at, event in self.log_events if at <= self.elapsed()]
+        self.log_events = [(at, event) for at, event in self.log_events if at > self.elapsed()]
+        return due
+
+
+class CheckCountingDriver:
+    """Driver whose page becomes interactive on a given readyState check"""
+
+    def __init__(self, interactive_on):
+        self.interactive_on = interactive_on
+        self.checks = 0
+
+    def execute_script(self, script):
+        self.checks += 1
+        return "interactive" if self.checks >= self.interactive_on else "loading"
+
+
+def test_returns_as_soon_as_the_document_is_usable():
+    driver = CheckCountingDriver(interactive_on=3)
+    waits = PageWaiter(driver, poll_seconds=0.01)
+    assert waits.ready("Start page", replaces=2)
+    # Returned on the first check that found the page usable
+    assert driver.checks == 3
+    label, measured, saved = waits.timings[0]
+    assert label == "Start page"
+    assert saved == pytest.approx(2 - measured)
+
+
+def test_waits_for_the_element_condition():
+    driver = LoadingDriver(interactive_after=0)
+    waits = PageWaiter(driver, poll_seconds=0.01)
+    assert waits.ready("Results", condition=lambda d: d.elapsed() > 0.1)
+    assert waits.timings[0][1] >= 0.1
+
+
+def test_times_out_instead_of_blocking():
+    waits = PageWaiter(LoadingDriver(interactive_after=10), poll_seconds=0.01)
+    assert not waits.ready("Slow page", timeout=0.1)
+
+
+def test_network_idle_follows_the_devtools_log():
+    driver = LoadingDriver(interactive_after=0, log_events=[
+        (0.0, network_event("Network.requestWillBeSent", "1")),
+        (0.0, network_event("Network.requestWillBeSent", "2")),
+        (0.0, network_event("Network.requestWillBeSent", "3")),
+        (0.2, network_event("Network.loadingFinished", "1")),
+    ])
+    waits = PageWaiter(driver, poll_seconds=0.01, idle_seconds=0.1, max_inflight=2)
+    assert waits.ready("Results", network_idle=True)
+    # Busy until the third request finished, then quiet for the idle window
+    assert waits.timings[0][1] >= 0.3
+    assert waits.inflight == {"2", "3"}
+
+
+def test_network_idle_without_the_devtools_log():
+    driver = LoadingDriver(interactive_after=0, performance_log=False)
+    waits = PageWaiter(driver, poll_seconds=0.01, idle_seconds=0.1)
+    assert waits.ready("Results", network_idle=True)
+    assert not waits.network_log
+
+
+class ResultsPageDriver:
+    """YouTube results page that switches to the new query's URL, then to its results, on schedule"""
+
+    def __init__(self, url_after, results_after):
+        self.start = time.monotonic()
+        self.url_after = url_after
+        self.results_after = results_after
+
+    @property
+    def current_url(self):
+        if time.monotonic() - self.start >= self.url_after:
+            return "https://www.youtube.com/results?search_query=cat+videos"
+        return "https://www.youtube.com/results?search_query=dog+videos"
+
+    def execute_script(self, script):
+        if "readyState" in script:
+            return "complete"
+        return "/watch?v=cat" if time.monotonic() - self.start >= self.results_after else "/watch?v=dog"
+
+
+def test_new_search_waits_for_its_own_results():
+    import test_mocks  # Mock selenium before loading the controller
+    search_results_loaded = test_mocks.load_real_module("youtube_controller").search_results_loaded
+    waits = PageWaiter(ResultsPageDriver(url_after=0.05, results_after=0.15), poll_seconds=0.01)
+    start = time.monotonic()
+    # The previous search's results satisfy "any result is shown" right away
+    assert waits.ready("YouTube results", condition=search_results_loaded("Cat videos", "/watch?v=dog"))
+    assert time.monotonic() - start >= 0.15
@@ -0,0 +1,69 @@
+import json
+import queue
+import urllib.error
+import urllib.request
+from panel_bridge import PanelEventBridge
+
+
+def post(bridge, event, path="/event"):
+    request = urllib.request.Request(bridge.url.replace("/event", path), data=json.dumps(event).encode(),
+                                     headers={"Content-Type": "text/plain"}, method="POST")
+    try:
+        with urllib.request.urlopen(request, timeout=2) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def make_bridge():
+    commands = queue.Queue()
+    bridge = PanelEventBridge({"execute-command": lambda event: commands.put(event["command"])})
+    bridge.start()
+    return bridge, commands
+
+
+def test_event_is_delivered_to_its_handler():
+    bridge, commands = make_bridge()
+    try:
+        status = post(bridge, {"type": "execute-command", "command": "scroll down", "token": bridge.token})
+        assert status == 204
+        assert commands.get(timeout=1) == "scroll down"
+        assert bridge.received == 1
+    finally:
+        bridge.stop()
+
+
+def test_events_without_the_token_are_rejected():
+    bridge, commands = make_bridge()
+    try:
+        assert post(bridge, {"type": "execute-command", "command": "close tab"}) == 403
+        assert post(bridge, {"type": "execute-command", "command": "close tab", "token": "guess"}) == 403
+        assert post(bridge, {"type": "unknown", "token": bridge.token}) == 404
+        assert post(bridge, {"type": "execute-command", "token": bridge.token}, path="/other") == 404
+        assert commands.empty()
+        assert bridge.rejected == 2
+    finally:
+        bridge.stop()
+
+
+def test_preflight_allows_requests_from_the_page():
+    bridge, commands = make_bridge()
+    try:
+        request = urllib.request.Request(bridge.url, method="OPTIONS")
+        with urllib.request.urlopen(request, timeout=2) as response:
+            assert response.status == 204
+            assert response.headers["Access-Control-Allow-Origin"] == "*"
+            assert response.headers["Access-Control-Allow-Private-Network"] == "true"
+    finally:
+        bridge.stop()
+
+
+def test_post_script_carries_token_and_url():
+    bridge, commands = make_bridge()
+    try:
+        script = bridge.post_script()
+        assert "window.postPanelEvent" in script
+        assert json.dumps(bridge.token) in script
+        assert json.dumps(bridge.url) in script
+    finally:
+        bridge.stop()
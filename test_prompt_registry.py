@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import logging
+import subprocess
+import pytest
+import prompt_registry
+from prompt_registry import Prompt, PROMPTS, register_prompt, get_prompt, estimate_tokens
+
+
+def test_prompts_are_immutable():
+    prompt = Prompt("test.immutable", 1, "Describe the page.")
+    with pytest.raises(AttributeError):
+        prompt.text = "Something else"
+    with pytest.raises(AttributeError):
+        prompt.extra = "value"
+    assert prompt.text == "Describe the page."
+
+
+def test_key_changes_with_text_and_version_only():
+    prompt = Prompt("test.key", 1, "\n        Describe the page.\n        ")
+    # Indentation and surrounding whitespace are not part of the prompt
+    assert prompt.key == Prompt("test.key", 1, "Describe the page.").key
+    assert prompt.key.startswith("test.key@v1:")
+    assert prompt.key != Prompt("test.key", 2, "Describe the page.").key
+    assert prompt.key != Prompt("test.key", 1, "Describe the page briefly.").key
+    assert prompt.token_estimate == estimate_tokens("Describe the page.")
+
+
+def test_keys_are_stable_across_runs():
+    """Cache keys must not depend on the process, e.g. on string hash randomization"""
+    script = "import json, prompt_registry; print(json.dumps({n: p.key for n, p in prompt_registry.PROMPTS.items()}))"
+    keys = []
+    for seed in ("1", "2"):
+        completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                                   cwd=os.path.dirname(os.path.abspath(__file__)),
+                                   env=dict(os.environ, PYTHONHASHSEED=seed))
+        keys.append(json.loads(completed.stdout))
+    assert keys[0] == keys[1]
+    assert keys[0] == {name: prompt.key for name, prompt in PROMPTS.items() if name in keys[0]}
+
+
+def test_render_fills_placeholders():
+    prompt = Prompt("test.render", 1, "Describe these {content_type}: {items}")
+    assert prompt.render(content_type="videos", items="[]") == "Describe these videos: []"
+    with pytest.raises(KeyError):
+        prompt.render(content_type="videos")
+
+
+def test_changed_prompt_without_version_bump_is_reported(monkeypatch, caplog):
+    monkeypatch.setattr(prompt_registry, "PROMPTS", {})
+    with caplog.at_level(logging.WARNING, logger="prompt_registry"):
+        register_prompt("test.versioned", 1, "First text.")
+        register_prompt("test.versioned", 1, "First text.")
+        assert not caplog.records
+        register_prompt("test.versioned", 2, "Second text.")
+        assert not caplog.records
+        prompt = register_prompt("test.versioned", 2, "Third text.")
+    assert [record.getMessage() for record in caplog.records] == [
+        "Prompt 'test.versioned' changed without a version bump"]
+    assert get_prompt("test.versioned") is prompt
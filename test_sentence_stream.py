@@ -0,0 +1,78 @@
+import test_mocks  # Mock groq before loading the analyzer
+from sentence_stream import iter_sentences
+
+AdvancedPageAnalyzer = test_mocks.load_real_module("advanced_page_analyzer").AdvancedPageAnalyzer
+
+
+def split(text, size=3):
+    """The text as a stream of small deltas, like an LLM produces"""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def test_sentences_are_yielded_once_complete():
+    text = "This page is a news site. It lists today's top stories! Want to hear them? "
+    assert list(iter_sentences(split(text))) == [
+        "This page is a news site.", "It lists today's top stories!", "Want to hear them?"]
+
+
+def test_abbreviations_do_not_end_a_sentence():
+    text = "The article by Dr. Smith covers vitamins, e.g. vitamin D. It is from St. Mary's hospital. "
+    assert list(iter_sentences(split(text))) == [
+        "The article by Dr. Smith covers vitamins, e.g. vitamin D.", "It is from St. Mary's hospital."]
+
+
+def test_short_fragments_are_merged_with_the_next_sentence():
+    text = "Hello. Yes. This page shows three products for sale. "
+    assert list(iter_sentences(split(text))) == ["Hello. Yes. This page shows three products for sale."]
+
+
+def test_unterminated_tail_is_yielded_at_the_end():
+    assert list(iter_sentences(split("The page shows a search box. And a list of results"))) == [
+        "The page shows a search box.", "And a list of results"]
+    assert list(iter_sentences(["", "  "])) == []
+
+
+class Stream:
+    def __init__(self, deltas):
+        self.deltas = deltas
+        self.sent = 0
+        self.closed = False
+
+    def __iter__(self):
+        for delta in self.deltas:
+            self.sent += 1
+            yield delta
+
+    def close(self):
+        self.closed = True
+
+
+class StreamingLLM:
+    available = True
+
+    def __init__(self, stream):
+        self.stream_ = stream
+
+    def stream(self, messages, purpose, **options):
+        return self.stream_
+
+
+def test_should_stop_closes_the_llm_stream():
+    stream = Stream(split("The page is an online shop. It sells shoes and jackets. It also has a blog about hiking. "))
+    analyzer = AdvancedPageAnalyzer(llm=StreamingLLM(stream))
+    spoken = []
+    for sentence in analyzer.stream_description({"title": "Shop", "url": "https://shop.example.com"},
+                                                should_stop=lambda: len(spoken) == 1):
+        spoken.append(sentence)
+    assert spoken == ["The page is an online shop."]
+    assert stream.closed
+    assert stream.sent < len(stream.deltas)
+
+
+def test_stream_is_closed_when_the_reader_stops_early():
+    stream = Stream(split("First sentence of the page. Second sentence of the page. "))
+    analyzer = AdvancedPageAnalyzer(llm=StreamingLLM(stream))
+    sentences = analyzer.stream_description({"title": "Shop", "url": "https://shop.example.com"})
+    assert next(sentences) == "First sentence of the page."
+    sentences.close()
+    assert stream.closed
@@ -0,0 +1,187 @@
+# Import our mocks first
+import test_mocks
+
+import os
+import json
+import math
+import glob
+import wave
+import struct
+import pytest
+import speech_backends
+from speech_backends import Vocabulary, SpeechToText, GoogleBackend, VoskBackend, create_backend, VOSK_MODEL_PATH
+
+# Optional recordings of real commands for a local check against a Vosk model: 16 kHz, 16-bit mono WAV
+# files with the expected transcript in a .txt file next to each. Not in the repository
+AUDIO_FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "audio")
+
+from types import SimpleNamespace
+from voice_browser_control import SUPPORTED_COMMANDS, VoiceBrowserControl
+
+LINK_TEXTS = ["Sign in", "Today's deals", "Movies", "Sell", "Cat"]
+
+
+def make_vocabulary():
+    vocabulary = Vocabulary(SUPPORTED_COMMANDS)
+    vocabulary.set_categories(["shopping", "music"])
+    vocabulary.set_link_texts(LINK_TEXTS)
+    return vocabulary
+
+
+def test_vocabulary_corrects_command_keywords():
+    vocabulary = make_vocabulary()
+    assert vocabulary.correct("scrol down") == "scroll down"
+    assert vocabulary.correct("describe prodacts") == "describe products"
+    assert vocabulary.correct("serch for chocolate cake recipes") == "search for chocolate cake recipes"
+
+
+def test_vocabulary_leaves_queries_and_parameters_alone():
+    vocabulary = make_vocabulary()
+    # Transcripts that used to be snapped onto link texts and keywords
+    for text in ["search for meals near me", "movie reviews", "seller fees", "videos of cats",
+                 "search for vidoes of cats", "open shoping", "click on deels", "click deels"]:
+        assert vocabulary.correct(text) == text
+
+
+def test_vocabulary_words_follow_the_page():
+    vocabulary = Vocabulary(SUPPORTED_COMMANDS)
+    vocabulary.set_link_texts(["Checkout"])
+    assert "checkout" in vocabulary.words
+    vocabulary.set_link_texts(["Login"])
+    assert "checkout" not in vocabulary.words and "login" in vocabulary.words
+
+
+class LinkPageDriver:
+    def __init__(self):
+        self.current_url = "https://example.com/"
+        self.scripts = 0
+
+    def execute_script(self, script, *args):
+        self.scripts += 1
+        return ["Today's deals", "Checkout"] if "example" in self.current_url else ["Login"]
+
+
+def test_link_texts_are_read_only_when_the_url_changes():
+    controller = VoiceBrowserControl.__new__(VoiceBrowserControl)
+    controller.driver = LinkPageDriver()
+    controller.speech_to_text = SpeechToText(FakeBackend(""), Vocabulary(SUPPORTED_COMMANDS))
+    controller.favorites_manager = SimpleNamespace(favorites={"shopping": "https://amazon.com"})
+    controller.vocabulary_url = None
+    for _ in range(3):
+        controller.update_vocabulary()
+    assert controller.driver.scripts == 1
+    assert {"checkout", "shopping"} <= controller.speech_to_text.vocabulary.words
+    controller.driver.current_url = "https://other.org/"
+    controller.update_vocabulary()
+    assert controller.driver.scripts == 2
+    assert "checkout" not in controller.speech_to_text.vocabulary.words
+
+
+class FakeBackend:
+    name = "fake"
+
+    def __init__(self, text, offline=True):
+        self.text = text
+        self.offline = offline
+
+    def recognize(self, audio):
+        return self.text
+
+
+def test_speech_to_text_lowercases_corrects_and_times():
+    stt = SpeechToText(FakeBackend("Read Page Alowd"), make_vocabulary())
+    assert stt.recognize(object()) == "read page aloud"
+    assert stt.last_latency is not None
+
+
+def test_online_transcripts_are_not_corrected():
+    for text in ["Search for meals near me", "movie reviews", "seller fees", "videos of cats", "scrol down"]:
+        stt = SpeechToText(FakeBackend(text, offline=False), make_vocabulary())
+        assert stt.recognize(object()) == text.lower()
+
+
+def test_unavailable_offline_backend_falls_back_to_google(monkeypatch, tmp_path):
+    monkeypatch.setattr(speech_backends, "vosk", None)
+    assert isinstance(create_backend("vosk", model_path=str(tmp_path)), GoogleBackend)
+    assert isinstance(create_backend("unknown"), GoogleBackend)
+
+
+class WavAudio:
+    """The part of speech_recognition.AudioData the Vosk backend uses"""
+
+    def __init__(self, path):
+        with wave.open(path, "rb") as wav:
+            assert (wav.getframerate(), wav.getsampwidth(), wav.getnchannels()) == (16000, 2, 1), path
+            self.frames = wav.readframes(wav.getnframes())
+
+    def get_raw_data(self, convert_rate=None, convert_width=None):
+        assert (convert_rate, convert_width) == (16000, 2)
+        return self.frames
+
+
+def write_tone(path, seconds=0.5, frequency=440):
+    """A 16 kHz, 16-bit mono WAV file, the format the Vosk backend feeds its recognizer"""
+    frames = b"".join(struct.pack("<h", int(8000 * math.sin(2 * math.pi * frequency * i / 16000)))
+                      for i in range(int(16000 * seconds)))
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(frames)
+    return frames
+
+
+class FakeVosk:
+    """The vosk API the backend uses, answering each waveform with a scripted transcript"""
+
+    def __init__(self, transcripts):
+        self.transcripts = dict(transcripts)
+        self.models = []
+
+    def SetLogLevel(self, level):
+        pass
+
+    def Model(self, path):
+        self.models.append(path)
+        return path
+
+    def KaldiRecognizer(self, model, sample_rate):
+        vosk = self
+
+        class Recognizer:
+            def AcceptWaveform(self, data):
+                assert sample_rate == 16000
+                self.text = vosk.transcripts[data]
+
+            def FinalResult(self):
+                return json.dumps({"text": self.text})
+
+        return Recognizer()
+
+
+def test_vosk_backend_on_synthetic_wav_files(monkeypatch, tmp_path):
+    scroll = write_tone(tmp_path / "scroll.wav", frequency=440)
+    search = write_tone(tmp_path / "search.wav", frequency=660)
+    silence = write_tone(tmp_path / "silence.wav", frequency=0)
+    vosk = FakeVosk({scroll: "scrol down", search: "search for meals near me", silence: ""})
+    monkeypatch.setattr(speech_backends, "vosk", vosk)
+
+    stt = SpeechToText(create_backend("vosk", model_path=str(tmp_path)), Vocabulary(SUPPORTED_COMMANDS))
+    assert stt.recognize(WavAudio(str(tmp_path / "scroll.wav"))) == "scroll down"
+    assert stt.recognize(WavAudio(str(tmp_path / "search.wav"))) == "search for meals near me"
+    with pytest.raises(speech_backends.sr.UnknownValueError):
+        stt.recognize(WavAudio(str(tmp_path / "silence.wav")))
+    # The model is loaded once, not per utterance
+    assert vosk.models == [str(tmp_path)]
+
+
+def test_vosk_recognizes_recorded_commands():
+    fixtures = sorted(glob.glob(os.path.join(AUDIO_FIXTURES, "*.wav")))
+    if speech_backends.vosk is None or not os.path.isdir(VOSK_MODEL_PATH) or not fixtures:
+        pytest.skip("needs the vosk package, a model in VOSK_MODEL_PATH and WAV fixtures in fixtures/audio")
+
+    stt = SpeechToText(VoskBackend(), Vocabulary(SUPPORTED_COMMANDS))
+    for path in fixtures:
+        with open(path[:-len(".wav")] + ".txt") as f:
+            expected = f.read().strip().lower()
+        assert stt.recognize(WavAudio(path)) == expected, path
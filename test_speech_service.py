@@ -0,0 +1,104 @@
+# Import our mocks first
+import test_mocks
+
+import time
+import threading
+from speech_service import SpeechService, FEEDBACK, READING
+
+
+class FakeEngine:
+    """pyttsx3 stand-in that 'speaks' one word every few milliseconds and honours stop()"""
+
+    def __init__(self, word_time=0.005, release=None):
+        self.word_time = word_time
+        # When given, nothing is spoken until this event is set
+        self.release = release
+        self.callbacks = []
+        self.pending = []
+        self.spoken = []
+        self.stopped = False
+        self.thread_ids = set()
+
+    def connect(self, topic, callback):
+        assert topic == 'started-word'
+        self.callbacks.append(callback)
+
+    def say(self, text):
+        self.pending.append(text)
+
+    def stop(self):
+        self.stopped = True
+
+    def runAndWait(self):
+        self.thread_ids.add(threading.get_ident())
+        if self.release is not None:
+            self.release.wait(5)
+        self.stopped = False
+        for text in self.pending:
+            words = []
+            for index, word in enumerate(text.split()):
+                for callback in self.callbacks:
+                    callback(None, index, len(word))
+                if self.stopped:
+                    break
+                words.append(word)
+                time.sleep(self.word_time)
+            self.spoken.append(" ".join(words))
+        self.pending = []
+
+
+def make_service(word_time=0.005, release=None):
+    engine = FakeEngine(word_time, release)
+    return SpeechService(engine_factory=lambda: engine), engine
+
+
+def test_speak_returns_immediately_and_runs_on_one_thread():
+    """speak() does not block, and every utterance plays on the same long-lived engine thread"""
+    release = threading.Event()
+    service, engine = make_service(release=release)
+    handles = [service.speak(f"utterance number {i} here") for i in range(3)]
+    # Every call returned while the engine could not speak yet
+    assert engine.spoken == []
+    release.set()
+    assert all(handle.wait(2) for handle in handles)
+    assert engine.spoken == [f"utterance number {i} here" for i in range(3)]
+    assert engine.thread_ids == {service.thread.ident}
+    service.shutdown(1)
+
+
+def test_feedback_is_spoken_before_queued_reading():
+    service, engine = make_service()
+    blocker = service.speak("one two three four five six seven eight", READING)
+    reading = service.speak("queued paragraph", READING)
+    feedback = service.speak("feedback first")
+    assert service.wait_until_idle(2)
+    assert engine.spoken.index("feedback first") < engine.spoken.index("queued paragraph")
+    assert blocker.done and reading.done and feedback.done
+    service.shutdown(1)
+
+
+def test_interrupt_stops_mid_utterance():
+    """Cancelling the reading priority cuts the paragraph off at the next word"""
+    service, engine = make_service(word_time=0.01)
+    handle = service.speak(" ".join(["word"] * 200), READING)
+    time.sleep(0.05)
+    service.interrupt(READING)
+    assert handle.wait(0.5)
+    assert handle.cancelled
+    assert len(engine.spoken[0].split()) < 200
+    service.shutdown(1)
+
+
+def test_feedback_preempts_reading_which_is_read_again():
+    """Barge-in: a response interrupts the paragraph being read, which restarts afterwards"""
+    service, engine = make_service(word_time=0.01)
+    paragraph = " ".join(["para"] * 30)
+    reading = service.speak(paragraph, READING)
+    time.sleep(0.05)
+    service.barge_in()
+    service.speak("opening google")
+    assert reading.wait(2)
+    assert not reading.cancelled
+    assert engine.spoken[1] == "opening google"
+    assert engine.spoken[-1] == paragraph
+    service.shutdown(1)
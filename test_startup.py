@@ -0,0 +1,66 @@
+import time
+import threading
+import pytest
+from startup import StartupOrchestrator
+
+
+def slow(value, seconds=0.1):
+    def build():
+        time.sleep(seconds)
+        return value
+    return build
+
+
+def test_independent_steps_run_concurrently():
+    # Every step waits until all three are running, so steps that ran one after another would time out
+    all_running = threading.Barrier(3, timeout=5)
+
+    def step(value):
+        def build():
+            all_running.wait()
+            return value
+        return build
+
+    startup = StartupOrchestrator()
+    favorites = startup.start("favorites", step("favorites"))
+    cache = startup.start("llm cache", step("cache"))
+    speech = startup.step("speech service", step("speech"))
+    assert (favorites.result(), cache.result(), speech) == ("favorites", "cache", "speech")
+    # Every step started before any of them ended
+    entries = startup.timeline.entries
+    assert max(start for _, start, _, _ in entries) <= min(end for _, _, end, _ in entries)
+
+
+def test_lazy_step_is_built_once_on_first_use():
+    startup = StartupOrchestrator()
+    builds = []
+    analyzer = startup.lazy("page analyzer", lambda: builds.append(1) or "analyzer")
+    assert builds == []
+    threads = [threading.Thread(target=analyzer.get) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert analyzer.get() == "analyzer"
+    assert builds == [1]
+    assert startup.timeline.elapsed("page analyzer (on first use)") is not None
+
+
+def test_failed_step_raises_where_its_result_is_needed():
+    def broken():
+        raise ValueError("favorites file is corrupt")
+
+    startup = StartupOrchestrator()
+    task = startup.start("favorites", broken)
+    with pytest.raises(ValueError):
+        task.result()
+
+
+def test_timeline_reports_steps_and_milestones_in_order():
+    startup = StartupOrchestrator()
+    startup.step("speech service", slow(None, 0.02))
+    startup.timeline.mark("listening")
+    report = startup.timeline.report().splitlines()
+    assert "speech service took" in report[0]
+    assert report[1].endswith("listening")
+    assert startup.timeline.elapsed("listening") >= 0.02
@@ -0,0 +1,63 @@
+# Import our mocks first
+import test_mocks
+
+import logging
+from types import SimpleNamespace
+import voice_browser_control
+
+# The analyzer is mocked by test_mocks; the section descriptions need the real one
+advanced_page_analyzer = test_mocks.load_real_module("advanced_page_analyzer")
+
+PAGE_INFO = {
+    "title": "Shop",
+    "url": "https://shop.example.com",
+    "products": [
+        {"name": "Trail Running Shoe", "price": "$89"},
+        {"name": "Rain Jacket", "price": "$120"},
+        # Matched twice by different selectors
+        {"name": "Rain Jacket", "price": "$120"},
+    ],
+    # A product card also matched as an article
+    "cards": [{"title": "Trail Running Shoe", "summary": "$89"}, {"title": "Spring sale starts today"}],
+    "videos": [{"title": "Shoe review", "duration": "3:12"}],
+    "music": [],
+    "images": [{"alt": "Rain Jacket"}, {"alt": "Store front"}],
+    "links": [],
+}
+
+
+class SectionLLM:
+    """LLM that answers every section request at once and keeps the messages it was sent"""
+    available = True
+
+    def __init__(self):
+        self.calls = {}
+
+    def complete_concurrently(self, calls, timeout=None, should_stop=None):
+        self.calls.update(calls)
+        for content_type in calls:
+            yield content_type, f"The {content_type} are described.", None
+
+
+def test_section_intro_counts_match_the_section_requests(monkeypatch, caplog):
+    monkeypatch.setattr(voice_browser_control, "CONTENT_KEYS", advanced_page_analyzer.CONTENT_KEYS)
+    llm = SectionLLM()
+    spoken = []
+    controller = voice_browser_control.VoiceBrowserControl.__new__(voice_browser_control.VoiceBrowserControl)
+    controller.llm = llm
+    controller.analyze_page_structure = lambda: PAGE_INFO
+    controller.speech = SimpleNamespace(speak=lambda text, priority=None: spoken.append(text) or SimpleNamespace(
+        wait=lambda: None))
+    controller._page_analyzer = SimpleNamespace(get=lambda: advanced_page_analyzer.AdvancedPageAnalyzer(llm=llm))
+
+    with caplog.at_level(logging.INFO, logger="page_compaction"):
+        assert controller.describe_page() == "DESCRIBING"
+        controller.reading_thread.join(1)
+    # Repeats within a section are counted once
+    assert spoken[0] == "You're on Shop. I found 2 products, 1 videos, 2 articles, 2 images."
+    for content_type, count in [("products", 2), ("videos", 1), ("articles", 2), ("images", 2)]:
+        assert f"I found {count} {content_type} on the page" in llm.calls[content_type]["messages"][1]["content"]
+    assert spoken[1:] == [f"The {content_type} are described." for content_type in ("products", "videos", "articles", "images")]
+    # Only the prompts that are sent are compacted and logged
+    assert sorted(record.getMessage().split(":")[0] for record in caplog.records) == [
+        f"Page info for {content_type} description" for content_type in ("articles", "images", "products", "videos")]
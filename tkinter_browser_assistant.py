@@ -1,17 +1,15 @@
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 import threading
-import time
 import os
 import subprocess
 import sys
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 import pyttsx3
 import speech_recognition as sr
 from voice_browser_control import VoiceBrowserControl
+from driver_provider import start_chrome
+from page_waits import enable_network_log
 
 class TkinterBrowserAssistant:
     def __init__(self):
@@ -155,10 +153,12 @@ class TkinterBrowserAssistant:
             })
             
             # Start Chrome browser in a new window without positioning constraints
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+            enable_network_log(chrome_options)
+            launch = start_chrome(chrome_options)
             
-            # Initialize browser controller
-            self.browser_controller = VoiceBrowserControl(self.driver)
+            # Initialize browser controller; it sets up speech and recognition while Chrome starts
+            self.browser_controller = VoiceBrowserControl(launch)
+            self.driver = self.browser_controller.driver
             
             # Update status
             self.update_status("Ready")
@@ -169,7 +169,7 @@ class TkinterBrowserAssistant:
             self.driver.get(google_search_url)
             
             # Verify we're on the search page and not a doodle page
-            time.sleep(1)  # Give the page a moment to load
+            self.browser_controller.page_waits.ready("Start page", replaces=1)
             current_url = self.driver.current_url
             if "google.com/doodles" in current_url or not "/search" in current_url:
                 # We got redirected to a doodle page, force navigation back to search
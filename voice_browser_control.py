@@ -1,41 +1,56 @@
 import speech_recognition as sr
 import re
-import time
 import json
 import os
 import nltk
-from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 import logging
-import pyttsx3  # For voice feedback
 import threading  # For managing background reading
-from bs4 import BeautifulSoup  # For parsing HTML
-import groq  # For LLM-based intent analysis
-from advanced_page_analyzer import AdvancedPageAnalyzer  # Import our advanced page analyzer
-from youtube_controller import YouTubeController  # Import our YouTube controller
+from collections import Counter
+from advanced_page_analyzer import AdvancedPageAnalyzer, CONTENT_KEYS  # Import our advanced page analyzer
+from youtube_controller import YouTubeController, cached_phrases as youtube_phrases  # Import our YouTube controller
 from favorites_manager import FavoritesManager  # Import our favorites manager
+from command_router import CommandRouter  # Import our precompiled command router
+from command_classifier import LocalCommandClassifier  # Import our local fast-path classifier
+from llm_cache import LLMResponseCache, fingerprint  # Import our persistent LLM interpretation cache
+from speech_service import SpeechService, READING  # Import our background text-to-speech service
+from audio_cache import AudioCache  # Import our pre-rendered phrase cache
+from audio_capture import AudioCapture  # Import our continuous microphone capture
+from speech_backends import SpeechToText, Vocabulary, create_backend  # Import our configurable speech recognition
+from command_pipeline import CommandPipeline  # Import our staged listen/recognize/execute pipeline
+from page_snapshot import PageSnapshotCache  # Import our shared single-parse page snapshots
+from page_waits import PageWaiter, enable_network_log  # Import our page readiness waits
+from driver_provider import ChromeLaunch, start_chrome  # Import our pinned-driver background Chrome launch
+from startup import StartupOrchestrator  # Import our concurrent startup steps and timeline
+from llm_gateway import get_gateway  # Import our shared LLM client with deadlines, retries and metrics
+from clickable_index import ClickableIndex  # Import our fuzzy-matched clickable element index
+from page_reader import PageReader, main_content_text  # Import our incremental paragraph reader
+from page_structure import extract_page_structure  # Import our single-pass page structure extractor
+from page_structure_js import extract_page_structure_in_browser  # Import our in-browser page structure extractor
+from page_compaction import count_distinct  # Import our page info entry counting
+from prompt_registry import (  # Import our prebuilt LLM prompts
+    build_command_interpreter_prompt, register_prompt
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Download NLTK data (first time only)
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
+def load_stop_words():
+    """Return the English NLTK stop words, downloading them the first time; empty if unavailable"""
+    try:
+        nltk.data.find('corpora/stopwords')
+    except LookupError:
+        nltk.download('stopwords')
+    try:
+        return stopwords.words('english')
+    except LookupError:
+        return []
 
 # Default categories and their websites
 DEFAULT_CATEGORIES = {
@@ -62,6 +77,15 @@ INTENT_KEYWORDS = {
     "music": ["music", "song", "listen", "spotify", "playlist", "album", "artist"]
 }
 
+# Mood phrases for category intents
+MOOD_KEYWORDS = {
+    "videos": ["in the mood for watching", "want to watch", "feel like watching"],
+    "shopping": ["in the mood for shopping", "want to shop", "feel like shopping"],
+    "social": ["check social media", "see what friends are doing"],
+    "movies": ["in the mood for a movie", "want to watch a film", "feel like a movie"],
+    "music": ["in the mood for music", "want to listen", "feel like listening"]
+}
+
 # Define commands for LLM understanding
 SUPPORTED_COMMANDS = [
     "Open website",
@@ -111,57 +135,194 @@ COMMAND_EXAMPLES = {
     "List videos": ["List the videos", "What videos did you find", "Summarize search results"]
 }
 
+# System prompt for command interpretation, built once at import time
+COMMAND_INTERPRETER_PROMPT = register_prompt(
+    "command_interpreter.system", 1, build_command_interpreter_prompt(SUPPORTED_COMMANDS, COMMAND_EXAMPLES)
+)
+
+# Commands that interrupt whatever is being read or said
+STOP_PHRASES = ["stop reading", "stop", "quiet", "silence", "be quiet", "shut up"]
+
+# Answers to "Would you like to play this video?"
+CONFIRMATION_PHRASES = ["yes", "yeah", "sure", "okay", "play it", "confirm"]
+REJECTION_PHRASES = ["no", "nope", "don't", "cancel", "stop", "don't play"]
+
+
+def is_stop_command(command):
+    """True for commands that must interrupt reading and speech right away"""
+    return any(phrase in command for phrase in STOP_PHRASES)
+
+# Returned by execute_llm_command when the LLM's answer did not map to a handler
+LLM_COMMAND_NOT_HANDLED = object()
+
+# Content types described by concurrent requests when a page has more than one of them
+SECTION_CONTENT_TYPES = ["products", "videos", "articles", "images"]
+
+# Number of page links whose text is added to the recognition vocabulary
+LINK_VOCABULARY_LIMIT = 200
+
+# Texts of the first links of the page, read in one round trip instead of fetching and parsing the page source
+LINK_TEXTS_SCRIPT = """
+var links = document.getElementsByTagName('a');
+var texts = [];
+for (var i = 0; i < links.length && i < arguments[0]; i++) {
+    var text = (links[i].textContent || '').replace(/\\s+/g, ' ').trim();
+    if (text && text.length <= 60) texts.push(text);
+}
+return texts;
+"""
+
+HELP_TEXT = "You can use the following commands: Open a website like Google, Search for information, Scroll up or down, Click on links or buttons, Go back or forward between pages, Refresh the page, Set favorites for categories, Open websites by category, Show all your favorites, Read the current page aloud, Ask what's on the page, and Stop reading. Say Close browser when you're done."
+
+# Feedback that never changes, pre-rendered so it plays without synthesis delay
+FIXED_PHRASES = [
+    "Voice Browser Control ready",
+    "I'm ready for your commands. Say help for instructions.",
+    "Beginning to read the page",
+    "Continuing where I stopped",
+    "Stopped reading",
+    "Analyzing the page content...",
+    "Video playback cancelled.",
+    "Closing browser. Goodbye!",
+    HELP_TEXT,
+]
+
+# Words from the command names that must survive stopword removal ("scroll up" vs "scroll down")
+COMMAND_WORDS = {word for command in SUPPORTED_COMMANDS for word in re.split(r"[\s/]+", command.lower())}
+
 class VoiceBrowserControl:
     def __init__(self, existing_driver=None):
-        self.recognizer = sr.Recognizer()
-        # Initialize voice engine for feedback
-        self.voice_engine = pyttsx3.init()
-        
-        # Use existing driver if provided, otherwise initialize a new browser
-        if existing_driver:
-            self.driver = existing_driver
-            self.current_url = self.driver.current_url
-        else:
-            # Initialize browser
+        """
+        Args:
+            existing_driver: WebDriver or ChromeLaunch to use; a new browser is started if None
+        """
+        # Independent subsystems start concurrently; rarely used ones are built on first use
+        self.startup = StartupOrchestrator()
+        
+        # Chrome starts in the background while speech, NLTK and the LLM client are set up
+        own_browser = existing_driver is None
+        if own_browser:
             chrome_options = Options()
             chrome_options.add_argument("--start-maximized")  # Start maximized
-            self.driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-            self.driver.implicitly_wait(10)  # Wait up to 10 seconds for elements to appear
-            self.current_url = None
+            enable_network_log(chrome_options)
+            existing_driver = start_chrome(chrome_options)
         
-        # Initialize favorites manager
-        self.favorites_manager = FavoritesManager()
+        # Favorites file and LLM cache (with the NLTK stop words it normalizes with) load in parallel
+        favorites_task = self.startup.start("favorites", FavoritesManager)
+        llm_cache_task = self.startup.start("llm cache", lambda: LLMResponseCache(
+            definitions_fingerprint=fingerprint(SUPPORTED_COMMANDS, COMMAND_EXAMPLES),
+            stop_words=load_stop_words(),
+            protected_words=COMMAND_WORDS
+        ))
+        
+        self.recognizer = sr.Recognizer()
+        # The microphone stays open for the whole session once listening starts; it also hears our own
+        # speech, so utterances overlapping it are marked
+        self.capture = AudioCapture(is_speaking=lambda: self.speech.busy)
+        # Speech runs on its own thread, so command handling never waits for audio playback
+        self.speech = self.startup.step("speech service", lambda: SpeechService(audio_cache=AudioCache()))
+        
+        # Local classifier that lets unambiguous commands skip the LLM round-trip
+        self.command_classifier = self.startup.step(
+            "command classifier", lambda: LocalCommandClassifier(SUPPORTED_COMMANDS, COMMAND_EXAMPLES))
+        self.command_path_counts = Counter()
         
         # For read aloud functionality
         self.reading_thread = None
         self.stop_reading = False
         
-        # Initialize Groq client for LLM-based intent analysis
-        groq_api_key = os.getenv("GROQ_API_KEY")
-        if not groq_api_key:
-            logger.warning("GROQ_API_KEY not found in environment variables. LLM functionality will be limited.")
-            self.groq_client = None
+        # Speak LLM page descriptions sentence by sentence while they are generated
+        self.stream_descriptions = os.getenv("STREAM_DESCRIPTIONS", "1") != "0"
+        self.last_description = None
+        
+        # One LLM gateway for intent analysis and page descriptions, shared with the page analyzer
+        self.llm = self.startup.step("llm gateway", lambda: get_gateway(os.getenv("GROQ_API_KEY")))
+        
+        # Recognition backend chosen by SPEECH_BACKEND; offline backends get command keywords corrected
+        self.speech_to_text = self.startup.step("speech recognition", lambda: SpeechToText(
+            create_backend(recognizer=self.recognizer), Vocabulary(SUPPORTED_COMMANDS)))
+        
+        # Only needed to describe pages; built by the first description
+        self._page_analyzer = self.startup.lazy("page analyzer", lambda: AdvancedPageAnalyzer(llm=self.llm))
+        
+        # Initialize favorites manager
+        self.favorites_manager = favorites_task.result()
+        
+        # Compile the fallback command handlers into a single router
+        self.router = CommandRouter(self.favorites_manager, INTENT_KEYWORDS, MOOD_KEYWORDS)
+        
+        # Cache of LLM command interpretations, invalidated when the command definitions change
+        self.llm_cache = llm_cache_task.result()
+        
+        # Everything below needs the browser; wait here if it is still starting
+        if isinstance(existing_driver, ChromeLaunch):
+            self.driver = existing_driver.result()
+            self.startup.timeline.record("chrome", existing_driver.started,
+                                         existing_driver.started + existing_driver.launch_seconds)
         else:
-            self.groq_client = groq.Client(api_key=groq_api_key)
+            self.driver = existing_driver
+        if own_browser:
+            self.driver.implicitly_wait(10)  # Wait up to 10 seconds for elements to appear
+            self.current_url = None
+        else:
+            self.current_url = self.driver.current_url
+        
+        # Page source parsed once per page state, shared by all page analysis features
+        self.snapshots = PageSnapshotCache(self.driver)
         
-        # Initialize advanced page analyzer
-        self.page_analyzer = AdvancedPageAnalyzer(groq_api_key)
+        # Clickable elements of the page, indexed once per DOM state for "click on" commands
+        self.clickables = ClickableIndex(self.driver)
         
-        # Initialize YouTube controller
-        self.youtube_controller = YouTubeController(self.driver, self.speak)
+        # Waits for pages to become usable instead of sleeping a fixed time
+        self.page_waits = PageWaiter(self.driver)
+        
+        # URL whose link texts are in the recognition vocabulary
+        self.vocabulary_url = None
+        
+        # Paragraph-by-paragraph reader for "read page aloud" that remembers where it stopped
+        self.page_reader = PageReader(self.snapshots)
+        
+        # "python" parses the page source, "browser" extracts the page structure with injected JavaScript.
+        # The JavaScript extractor is checked against the Python one on the same parsed pages, not in a real browser
+        self.page_structure_backend = os.getenv("PAGE_STRUCTURE_BACKEND", "python")
+        
+        # Only needed for YouTube commands; built by the first one
+        self._youtube_controller = self.startup.lazy("youtube controller", lambda: YouTubeController(
+            self.driver, self.speak, snapshots=self.snapshots, waits=self.page_waits))
+        
+        # Created by run(); process_command can still be called directly by the GUIs
+        self.pipeline = None
         
         # State for YouTube interaction
         self.awaiting_video_confirmation = False
         self.video_to_confirm = None
         
+        self.startup.timeline.mark("initialized")
         logger.info("Voice Browser Control initialized")
         self.speak("Voice Browser Control ready")
+        
+        # Rendered in the background after the greeting; phrases rendered on an earlier run are reused
+        self.speech.prerender(self.cached_phrases())
+    
+    @property
+    def page_analyzer(self):
+        return self._page_analyzer.get()
+    
+    @property
+    def youtube_controller(self):
+        return self._youtube_controller.get()
     
     def speak(self, text):
-        """Provide voice feedback to the user"""
+        """Provide voice feedback to the user without waiting for it to be spoken"""
         logger.info(f"Speaking: {text}")
-        self.voice_engine.say(text)
-        self.voice_engine.runAndWait()
+        return self.speech.speak(text)
+    
+    def cached_phrases(self):
+        """Return the fixed and templated feedback phrases worth pre-rendering"""
+        phrases = list(FIXED_PHRASES)
+        phrases += [f"Opening {category}" for category in self.favorites_manager.favorites]
+        phrases += youtube_phrases()
+        return phrases
     
     # Remove the old favorites methods and replace with these delegate methods
     def set_favorite(self, category, website):
@@ -182,126 +343,94 @@ class VoiceBrowserControl:
     
     def analyze_intent(self, text):
         """Analyze text to determine user intent using NLP"""
-        # First check if this is a set favorite command - if so, don't process as open category
-        if self.favorites_manager.is_setting_favorite_command(text):
-            return None
+        return self.router.match_intent(text)
 
-        # Simple tokenization
-        words = text.lower().split()
-        
-        # Check for direct category mentions
-        for category in self.favorites_manager.favorites.keys():
-            if category in words:
-                return {"intent": "open_category", "category": category}
-        
-        # Check for intent keywords
-        for intent, keywords in INTENT_KEYWORDS.items():
-            for keyword in keywords:
-                if keyword in text.lower():
-                    if intent == "watch_video":
-                        return {"intent": "open_category", "category": "videos"}
-                    elif intent == "shopping":
-                        return {"intent": "open_category", "category": "shopping"}
-                    elif intent == "social_media":
-                        return {"intent": "open_category", "category": "social"}
-                    elif intent == "search":
-                        return {"intent": "open_category", "category": "search"}
-                    elif intent == "news":
-                        return {"intent": "open_category", "category": "news"}
-                    elif intent == "mail":
-                        return {"intent": "open_category", "category": "mail"}
-                    elif intent == "movies":
-                        return {"intent": "open_category", "category": "movies"}
-                    elif intent == "music":
-                        return {"intent": "open_category", "category": "music"}
-        
-        # Check for mood-based intents
-        mood_keywords = {
-            "videos": ["in the mood for watching", "want to watch", "feel like watching"],
-            "shopping": ["in the mood for shopping", "want to shop", "feel like shopping"],
-            "social": ["check social media", "see what friends are doing"],
-            "movies": ["in the mood for a movie", "want to watch a film", "feel like a movie"],
-            "music": ["in the mood for music", "want to listen", "feel like listening"]
-        }
-        
-        for category, phrases in mood_keywords.items():
-            for phrase in phrases:
-                if phrase in text.lower():
-                    return {"intent": "open_category", "category": category}
-        
-        return None
+    def start_listening(self):
+        """Open the microphone; the first time, this completes and logs the startup timeline"""
+        self.capture.start()
+        if self.startup.timeline.elapsed("listening") is None:
+            self.startup.timeline.mark("listening")
+            logger.info(f"Startup timeline:\n{self.startup.timeline.report()}")
 
     def listen_to_command(self):
-        """Listen for voice commands using the microphone"""
-        with sr.Microphone() as source:
-            logger.info("Listening for command...")
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            try:
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
-                logger.info("Processing speech...")
-                text = self.recognizer.recognize_google(audio)
-                logger.info(f"Recognized: {text}")
-                return text.lower()
-            except sr.WaitTimeoutError:
-                logger.warning("No speech detected within timeout period")
-                return None
-            except sr.UnknownValueError:
-                logger.warning("Could not understand audio")
-                return None
-            except sr.RequestError as e:
-                logger.error(f"Could not request results; {e}")
-                return None
+        """Wait for the next voice command captured from the continuously open microphone"""
+        self.start_listening()
+        logger.info("Listening for command...")
+        audio = self.capture.get_utterance(timeout=5)
+        if audio is None:
+            logger.warning("No speech detected within timeout period")
+            return None
+        return self.recognize_utterance(audio)
+
+    def recognize_utterance(self, audio):
+        """Turn a captured utterance into lowercase command text, or None if it was not understood"""
+        try:
+            logger.info("Processing speech...")
+            text = self.speech_to_text.recognize(audio)
+            logger.info(f"Recognized: {text}")
+            return text if self.accepts_utterance(audio, text) else None
+        except sr.UnknownValueError:
+            logger.warning("Could not understand audio")
+            return None
+        except sr.RequestError as e:
+            logger.error(f"Could not request results; {e}")
+            return None
+
+    def accepts_utterance(self, audio, text, stop_phrases=STOP_PHRASES):
+        """
+        False for an utterance heard while the assistant was speaking, which is most likely its own voice
+
+        Only a stop phrase said on its own still gets through then, so the user can interrupt.
+        """
+        if getattr(audio, "during_speech", False) is True and text.strip().lower() not in stop_phrases:
+            logger.info(f"Ignoring '{text}', heard while the assistant was speaking")
+            return False
+        return True
+
+    def update_vocabulary(self):
+        """
+        Keep the known words of recognition in line with the favorite categories and the current page
+
+        Link texts are only read again when the URL has changed, so after most
+        commands this costs a single current_url round trip.
+        """
+        vocabulary = self.speech_to_text.vocabulary
+        vocabulary.set_categories(self.favorites_manager.favorites)
+        try:
+            url = self.driver.current_url
+            if url != self.vocabulary_url:
+                vocabulary.set_link_texts(self.driver.execute_script(LINK_TEXTS_SCRIPT, LINK_VOCABULARY_LIMIT) or [])
+                self.vocabulary_url = url
+        except Exception as e:
+            logger.debug(f"Could not read link texts for the vocabulary: {e}")
 
     def extract_page_text(self):
-        """Extract readable text from the current web page"""
+        """Extract the readable main content of the current web page, without navigation, sidebars and footers"""
         try:
-            # Get page source
-            page_source = self.driver.page_source
-            
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.extract()
-                
-            # Get text
-            text = soup.get_text()
-            
-            # Break into lines and remove leading and trailing space on each
-            lines = (line.strip() for line in text.splitlines())
-            
-            # Break multi-headlines into a line each
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            
-            # Drop blank lines
-            text = '\n'.join(chunk for chunk in chunks if chunk)
-            
-            return text
+            return self.snapshots.current().view("main_text", lambda snapshot: main_content_text(snapshot.soup))
         except Exception as e:
             logger.error(f"Error extracting text from page: {e}")
             return "Error extracting text from this page."
 
     def read_page_aloud(self):
-        """Reads the current page aloud"""
-        page_text = self.extract_page_text()
-        
-        # Split text into manageable paragraphs
-        paragraphs = page_text.split('\n')
-        
+        """Reads the main content of the current page aloud, resuming where the last reading stopped"""
         # Announce the start of reading
-        self.speak("Beginning to read the page")
+        if self.page_reader.can_resume(self.driver.current_url):
+            self.speak("Continuing where I stopped")
+        else:
+            self.speak("Beginning to read the page")
         
-        # Function to read in a separate thread
+        # Function to read in a separate thread; paragraphs are extracted as they are spoken
         def read_text():
-            for paragraph in paragraphs:
-                if paragraph and len(paragraph.split()) > 3:  # Skip very short lines
+            try:
+                for paragraph in self.page_reader.paragraphs():
                     if self.stop_reading:
                         break
-                    self.voice_engine.say(paragraph)
-                    self.voice_engine.runAndWait()
+                    self.speech.speak(paragraph, READING).wait()
                     if self.stop_reading:
                         break
+            except Exception as e:
+                logger.error(f"Error reading page: {e}")
             
             logger.info("Finished reading page or reading was stopped")
         
@@ -319,72 +448,38 @@ class VoiceBrowserControl:
         """Stops reading the page aloud"""
         if self.reading_thread and self.reading_thread.is_alive():
             self.stop_reading = True
+            self.speech.interrupt(READING)
             logger.info("Stopping read aloud")
             self.speak("Stopped reading")
     
     def analyze_with_llm(self, user_query):
         """Analyze user query with LLM to determine command intent"""
-        if not self.groq_client:
-            logger.warning("Groq client not available. Falling back to basic intent recognition.")
-            return None
-            
         try:
-            # Create the system prompt with command definitions
-            system_prompt = f"""
-            You are an assistant that interprets natural language commands for a voice-controlled browser.
-            Your task is to analyze the user's query and determine which command they want to execute.
-            
-            Here are the supported commands:
-            {", ".join(SUPPORTED_COMMANDS)}
-            
-            Some example phrasings for each command:
-            """
+            # Interpretations are deterministic (temperature 0), so reuse earlier answers
+            cached = self.llm_cache.get(user_query, COMMAND_INTERPRETER_PROMPT.key)
+            if cached is not None:
+                return cached
             
-            for command, examples in COMMAND_EXAMPLES.items():
-                system_prompt += f"\n{command}: {', '.join(examples)}"
-            
-            system_prompt += """
-            
-            Respond with a JSON object in the following format:
-            {
-              "command": "The matched command name from the list above",
-              "parameters": {
-                "param1": "value1",
-                "param2": "value2"
-              }
-            }
-            
-            Examples:
-            User: "Open Google"
-            Response: {"command": "Open website", "parameters": {"website": "google.com"}}
-            
-            User: "I want to watch some videos"
-            Response: {"command": "Open category website", "parameters": {"category": "videos"}}
-            
-            User: "Set my shopping favorite to Amazon"
-            Response: {"command": "Set favorite category", "parameters": {"category": "shopping", "website": "amazon.com"}}
-            
-            User: "Tell me what's on this page" 
-            Response: {"command": "Describe page", "parameters": {}}
-            
-            DO NOT include any explanation, just the JSON object.
-            """
+            if not self.llm.available:
+                logger.warning("Groq client not available. Falling back to basic intent recognition.")
+                return None
             
-            # Send query to Groq LLM
-            response = self.groq_client.chat.completions.create(
-                model="llama3-70b-8192",  # Using a fast, economical model
-                messages=[
-                    {"role": "system", "content": system_prompt},
+            # Send query to the LLM; a command that takes longer than this is better handled by the fallback
+            result = self.llm.complete(
+                [
+                    {"role": "system", "content": COMMAND_INTERPRETER_PROMPT.text},
                     {"role": "user", "content": user_query}
                 ],
-                temperature=0.0  # Low temperature for consistent results
+                purpose="command interpretation",
+                temperature=0.0,  # Low temperature for consistent results
+                timeout=5
             )
             
-            result = response.choices[0].message.content.strip()
-            
             # Try to parse the response as JSON
             try:
-                return json.loads(result)
+                command_info = json.loads(result)
+                self.llm_cache.put(user_query, COMMAND_INTERPRETER_PROMPT.key, command_info)
+                return command_info
             except json.JSONDecodeError:
                 logger.error(f"Failed to parse LLM response as JSON: {result}")
                 return None
@@ -395,107 +490,25 @@ class VoiceBrowserControl:
     
     def analyze_page_structure(self):
         """Analyze the current page structure and extract important elements and their information"""
+        if self.page_structure_backend == "browser":
+            try:
+                # Only the extracted fields cross the WebDriver wire, not the whole page source
+                return extract_page_structure_in_browser(self.driver)
+            except Exception as e:
+                logger.warning(f"In-browser page extraction failed, parsing the page source instead: {e}")
+        
         try:
-            # Get page source
-            page_source = self.driver.page_source
-            
-            # Parse with BeautifulSoup
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Container for all the extracted information
-            page_info = {
-                "title": soup.title.string if soup.title else "No title found",
-                "url": self.driver.current_url,
-                "products": [],
-                "videos": [],
-                "articles": [],
-                "cards": [],
-                "music": [],
-                "images": [],
-                "links": []
-            }
-            
-            # Extract product information (common in e-commerce sites)
-            product_elements = soup.select('.product, [class*=product], [id*=product], .item, [data-component*=product]')
-            for product in product_elements[:10]:  # Limit to 10 products for manageability
-                product_info = {
-                    "name": self._extract_text(product.select_one('.product-title, .name, h2, h3, [class*=title]')),
-                    "price": self._extract_text(product.select_one('.price, [class*=price]')),
-                    "seller": self._extract_text(product.select_one('.seller, .vendor, [class*=seller], [class*=vendor]')),
-                    "rating": self._extract_text(product.select_one('.rating, [class*=rating], .stars')),
-                    "description": self._extract_text(product.select_one('.description, [class*=description]'))
-                }
-                if any(product_info.values()):
-                    page_info["products"].append(product_info)
-            
-            # Extract video information
-            video_elements = soup.select('video, [class*=video], [id*=video], iframe[src*=youtube], iframe[src*=vimeo]')
-            for video in video_elements[:10]:
-                video_info = {
-                    "title": video.get('title') or video.get('alt') or video.get('aria-label') or 
-                             self._extract_text(video.find_previous(['h1', 'h2', 'h3', 'h4', '.title', '[class*=title]'])),
-                    "creator": self._extract_text(video.find_previous('[class*=creator], [class*=author], [class*=channel]')),
-                    "duration": video.get('duration') or self._extract_text(video.select_one('[class*=duration], [class*=length], [class*=time]')),
-                    "src": video.get('src') or (video.select_one('source').get('src') if video.select_one('source') else None)
-                }
-                if any(video_info.values()):
-                    page_info["videos"].append(video_info)
-            
-            # Extract article/content card information
-            card_elements = soup.select('article, .card, [class*=card], .post, [class*=post], .item, [class*=item]')
-            for card in card_elements[:10]:
-                card_info = {
-                    "title": self._extract_text(card.select_one('h1, h2, h3, h4, .title, [class*=title], [class*=heading]')),
-                    "author": self._extract_text(card.select_one('.author, [class*=author], [class*=byline]')),
-                    "date": self._extract_text(card.select_one('.date, [class*=date], [class*=time], time')),
-                    "summary": self._extract_text(card.select_one('p, .summary, [class*=summary], [class*=excerpt]'))
-                }
-                if any(card_info.values()):
-                    page_info["cards"].append(card_info)
-            
-            # Extract music information
-            music_elements = soup.select('audio, [class*=track], [class*=song], [class*=music], [class*=playlist]')
-            for music in music_elements[:10]:
-                music_info = {
-                    "title": self._extract_text(music.select_one('[class*=title], .name, [class*=name]')) or music.get('title') or music.get('aria-label'),
-                    "artist": self._extract_text(music.select_one('[class*=artist], .artist, [class*=singer], .singer')),
-                    "album": self._extract_text(music.select_one('[class*=album]')),
-                    "duration": self._extract_text(music.select_one('[class*=duration], [class*=length], [class*=time]'))
-                }
-                if any(music_info.values()):
-                    page_info["music"].append(music_info)
-            
-            # Extract image information (focus on meaningful images, not icons)
-            img_elements = soup.select('img[alt]:not([width="16"]):not([width="24"]):not([width="32"]):not([height="16"]):not([height="24"]):not([height="32"])')
-            for img in img_elements[:15]:
-                if img.get('alt') and img.get('alt').strip():
-                    img_info = {
-                        "alt": img.get('alt'),
-                        "src": img.get('src')
-                    }
-                    page_info["images"].append(img_info)
-            
-            # Extract main links
-            links = soup.select('a[href]:not([href^="#"]):not([href=""]) h1, a[href]:not([href^="#"]):not([href=""]) h2, a[href]:not([href^="#"]):not([href=""]) h3, a.main-link, a.primary-link')
-            for link in links[:10]:
-                link_info = {
-                    "text": link.get_text(strip=True),
-                    "href": link.get('href')
-                }
-                if link_info["text"]:
-                    page_info["links"].append(link_info)
-            
-            return page_info
+            # Parsed once per page state and shared with the other page features
+            snapshot = self.snapshots.current()
+            return snapshot.view("structure", self._extract_page_structure)
             
         except Exception as e:
             logger.error(f"Error analyzing page structure: {e}")
             return {"error": f"Could not analyze page: {str(e)}"}
     
-    def _extract_text(self, element):
-        """Safely extract text from an element that might be None"""
-        if element:
-            return element.get_text(strip=True)
-        return None
+    def _extract_page_structure(self, snapshot):
+        """Extract products, videos, cards, music, images and links from a page snapshot in one walk"""
+        return extract_page_structure(snapshot.soup, snapshot.url)
     
     def describe_page(self):
         """Generate a description of what's on the current page using advanced LLM analysis"""
@@ -506,6 +519,17 @@ class VoiceBrowserControl:
             self.speak(f"I had trouble analyzing this page. {page_info['error']}")
             return
             
+        # Pages with several kinds of content get one request per kind, all in flight at once.
+        # Counted like each request counts its own items, so the intro matches the descriptions
+        counts = {content_type: count_distinct(page_info, CONTENT_KEYS[content_type])
+                  for content_type in SECTION_CONTENT_TYPES}
+        sections = [content_type for content_type in SECTION_CONTENT_TYPES if counts[content_type]]
+        if self.llm.available and len(sections) > 1:
+            return self.describe_page_sections(page_info, sections, counts)
+        
+        if self.stream_descriptions and self.llm.available:
+            return self.stream_page_description(page_info)
+        
         # Use the advanced analyzer to get LLM-enhanced description
         logger.info("Sending page info to advanced analyzer")
         self.speak("Analyzing the page content...")
@@ -528,6 +552,88 @@ class VoiceBrowserControl:
         self.speak(description)
         return description
     
+    def stream_page_description(self, page_info):
+        """Speak the LLM page description sentence by sentence as it streams in"""
+        
+        # Function to stream and speak in a separate thread, so stop phrases can cancel it
+        def stream_and_speak():
+            sentences = []
+            try:
+                for sentence in self.page_analyzer.stream_description(page_info, should_stop=lambda: self.stop_reading):
+                    sentences.append(sentence)
+                    self.speech.speak(sentence, READING).wait()
+                    if self.stop_reading:
+                        break
+            except Exception as e:
+                logger.error(f"Error streaming page description: {e}")
+            
+            if sentences:
+                self.last_description = " ".join(sentences)
+            elif not self.stop_reading:
+                # Nothing was streamed, fall back to the basic description
+                logger.warning("Streaming description failed. Using basic description.")
+                self.last_description = self._generate_basic_description(page_info)
+                self.speak(self.last_description)
+            logger.info(f"Page description: {self.last_description}")
+        
+        # Reset stop flag
+        self.stop_reading = False
+        
+        self.reading_thread = threading.Thread(target=stream_and_speak)
+        self.reading_thread.daemon = True
+        self.reading_thread.start()
+        
+        return "DESCRIBING"
+    
+    def describe_page_sections(self, page_info, sections, counts):
+        """
+        Speak a description of each kind of content on the page as soon as its LLM request returns
+        
+        Args:
+            page_info: Dictionary from analyze_page_structure
+            sections: Content types to describe
+            counts: Number of distinct items of each content type
+        """
+        
+        # Requests and speech run on the reading thread, so the voice loop stays responsive and stop phrases cancel it
+        def describe_and_speak():
+            found = ", ".join(f"{counts[content_type]} {content_type}" for content_type in sections)
+            intro = f"You're on {page_info['title']}. I found {found}."
+            self.speech.speak(intro, READING)
+            descriptions = [intro]
+            # Stopping cancels the requests still running instead of waiting for the next result
+            results = self.page_analyzer.describe_content_types(page_info, sections,
+                                                                should_stop=lambda: self.stop_reading)
+            try:
+                for content_type, description in results:
+                    if self.stop_reading:
+                        break
+                    if description:
+                        descriptions.append(description)
+                        self.speech.speak(description, READING).wait()
+            except Exception as e:
+                logger.error(f"Error describing page sections: {e}")
+            finally:
+                # Requests still running when reading stopped are cancelled
+                results.close()
+            
+            if len(descriptions) == 1 and not self.stop_reading:
+                # Every request failed, fall back to the basic description
+                logger.warning("Section descriptions failed. Using basic description.")
+                descriptions = [self._generate_basic_description(page_info)]
+                self.speak(descriptions[0])
+            self.last_description = " ".join(descriptions)
+            logger.info(f"Page description: {self.last_description}")
+        
+        # Reset stop flag
+        self.stop_reading = False
+        
+        self.reading_thread = threading.Thread(target=describe_and_speak)
+        self.reading_thread.daemon = True
+        self.reading_thread.start()
+        
+        return "DESCRIBING"
+    
     def _generate_basic_description(self, page_info):
         """Generate a basic description as fallback method"""
         # Build a human-friendly description
@@ -632,16 +738,8 @@ class VoiceBrowserControl:
             return
         
         # Map the content type to the corresponding key in page_info
-        content_map = {
-            "products": "products",
-            "videos": "videos",
-            "images": "images",
-            "music": "music",
-            "articles": "cards",  # cards in page_info contains articles
-            "links": "links"
-        }
-        
-        target_key = content_map.get(content_type.lower())
+        content_type = content_type.lower()
+        target_key = CONTENT_KEYS.get(content_type)
         if not target_key or target_key not in page_info:
             self.speak(f"I don't know how to describe {content_type}.")
             return
@@ -652,47 +750,13 @@ class VoiceBrowserControl:
             self.speak(f"I didn't find any {content_type} on this page.")
             return
             
-        # Try to get enhanced descriptions using LLM
-        if hasattr(self, 'page_analyzer') and self.page_analyzer.llm_client:
-            try:
-                # Create a focused prompt for just this content type
-                system_prompt = f"""
-                You are a specialized web content analyzer. For the given {content_type} information from a webpage,
-                provide a detailed, conversational description of these {content_type}.
-                Focus only on the {content_type} and their characteristics.
-                """
-                
-                user_prompt = f"""
-                I found {len(items)} {content_type} on the page "{page_info['title']}".
-                Here are the details:
-                
-                {json.dumps(items[:10], indent=2)}
-                
-                Please provide a detailed, conversational description of these {content_type}.
-                For products: describe what's being sold, price ranges, brands, etc.
-                For videos: describe the content themes, creators, topics, etc.
-                For images: explain what they show based on alt text.
-                For music: describe the artists, genres, themes, etc.
-                For articles: summarize the topics and themes.
-                """
-                
-                response = self.page_analyzer.llm_client.chat.completions.create(
-                    model="llama3-70b-8192",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": user_prompt}
-                    ],
-                    temperature=0.2,
-                    max_tokens=1024,
-                )
-                
-                description = response.choices[0].message.content.strip()
-                self.speak(description)
-                return description
-                
-            except Exception as e:
-                logger.error(f"Error getting enhanced {content_type} description: {e}")
-                # Fall back to basic description
+        # Try to get enhanced descriptions using LLM, with the prebuilt prompt focused on just this content type
+        if self.llm.available:
+            for _, description in self.page_analyzer.describe_content_types(page_info, [content_type]):
+                if description:
+                    self.speak(description)
+                    return description
+            # Fall back to basic description
         
         # Basic description fallback
         description = f"I found {len(items)} {content_type} on this page. "
@@ -765,9 +829,15 @@ class VoiceBrowserControl:
         return description
     
     def execute_llm_command(self, command_info):
-        """Execute a command based on LLM analysis"""
+        """
+        Execute a command based on LLM analysis
+        
+        Returns:
+            The handler's result (often None), or LLM_COMMAND_NOT_HANDLED if the
+            command is unknown or lacks the parameters its handler needs
+        """
         if not command_info:
-            return None
+            return LLM_COMMAND_NOT_HANDLED
             
         command = command_info.get("command")
         params = command_info.get("parameters", {})
@@ -861,231 +931,194 @@ class VoiceBrowserControl:
         elif command == "List videos":
             return self.youtube_controller.summarize_search_results()
             
-        return None
+        return LLM_COMMAND_NOT_HANDLED
     
     def process_command(self, command):
         """Process the voice command and determine the action to take"""
         if not command:
             return
+        return self._execute_and_refresh_vocabulary(self.interpret_command(command))
+    
+    def interpret_command(self, command):
+        """
+        Decide how to handle a command without acting on it
+        
+        Runs the local router and classifier and, for ambiguous commands, the
+        LLM, so the pipeline can interpret the next command while the previous
+        one is still executing.
+        
+        Returns:
+            Plan dictionary for execute_command
+        """
+        # Barge-in: drop feedback that is still queued for the previous command
+        self.speech.barge_in()
+        
+        plan = {"command": command, "route": None, "confident": False, "llm": None}
+        
+        # Confirmation replies and stop commands are handled from the text alone
+        if self.awaiting_video_confirmation and self._confirmation_reply(command) or is_stop_command(command):
+            return plan
+        
+        # Route locally first; unambiguous commands run without waiting on the LLM
+        route = self.router.route(command)
+        classification = self.command_classifier.classify(command, route)
+        logger.info(f"Local classification: {classification}")
+        plan["route"] = route
+        plan["confident"] = classification.confident
+        
+        # Ambiguous commands go to LLM-based intent analysis if available
+        if not classification.confident:
+            plan["llm"] = self.analyze_with_llm(command)
+        return plan
+    
+    def execute_command(self, plan):
+        """Act on a plan returned by interpret_command"""
+        command = plan["command"]
+        route = plan["route"]
         
         # Special handling for YouTube video confirmation
         if self.awaiting_video_confirmation:
-            if any(confirmation in command.lower() for confirmation in ["yes", "yeah", "sure", "okay", "play it", "confirm"]):
+            reply = self._confirmation_reply(command)
+            if reply == "yes":
                 self.awaiting_video_confirmation = False
                 position = self.video_to_confirm
                 self.video_to_confirm = None
                 return self.youtube_controller.play_video(position)
-            elif any(rejection in command.lower() for rejection in ["no", "nope", "don't", "cancel", "stop", "don't play"]):
+            elif reply == "no":
                 self.awaiting_video_confirmation = False
                 self.video_to_confirm = None
                 self.speak("Video playback cancelled.")
                 return
         
         # Stop reading command (check this first to ensure responsiveness)
-        if any(phrase in command for phrase in ["stop reading", "stop", "quiet", "silence", "be quiet", "shut up"]):
+        if is_stop_command(command):
             self.stop_reading_aloud()
             return
         
-        # First try LLM-based intent analysis if available
-        llm_analysis = self.analyze_with_llm(command)
-        if llm_analysis:
-            result = self.execute_llm_command(llm_analysis)
-            if result:
+        if plan["confident"]:
+            self.command_path_counts["local"] += 1
+            return self.execute_route(route)
+        
+        if plan["llm"]:
+            result = self.execute_llm_command(plan["llm"])
+            if result is not LLM_COMMAND_NOT_HANDLED:
+                self.command_path_counts["llm"] += 1
                 return result
         
-        # If LLM failed or isn't available, fall back to traditional methods
-        # Read aloud command
-        if any(phrase in command for phrase in [
-            "read page", "read this page", "read aloud", "read the page", 
-            "read to me", "read this to me", "read this", "read the article",
-            "read this article", "start reading"
-        ]):
+        # If the LLM failed, isn't available or answered with an unknown command, fall back to the precompiled command router
+        if route:
+            self.command_path_counts["local_fallback"] += 1
+            return self.execute_route(route)
+        
+        self.command_path_counts["unrecognized"] += 1
+        logger.info(f"Command not recognized: {command}")
+    
+    def _confirmation_reply(self, command):
+        """Return "yes" or "no" if the command answers the play-this-video question, otherwise None"""
+        command = command.lower()
+        if any(confirmation in command for confirmation in CONFIRMATION_PHRASES):
+            return "yes"
+        if any(rejection in command for rejection in REJECTION_PHRASES):
+            return "no"
+        return None
+    
+    def stop_command(self, command):
+        """Handle a stop command that preempted the command pipeline"""
+        # Set before the speech is interrupted, so a reading thread woken up by it does not read on
+        self.stop_reading = True
+        self.speech.interrupt()
+        # Not process_command: stopping never changes the page, so the vocabulary needs no refresh
+        self.execute_command(self.interpret_command(command))
+    
+    def _execute_and_refresh_vocabulary(self, plan):
+        """Execute a plan, then refresh the vocabulary while no utterance is waiting on it"""
+        result = self.execute_command(plan)
+        if result != "EXIT":
+            # The command may have changed the page; runs here so only this thread drives the browser
+            self.update_vocabulary()
+        return result
+
+    def get_command_path_stats(self):
+        """Return how often each command path was taken (local, llm, local_fallback, unrecognized)"""
+        return dict(self.command_path_counts)
+
+    def execute_route(self, route):
+        """Execute the handler chosen by the command router"""
+        params = route.params
+        logger.info(f"Executing routed command: {route.name} with params {params}")
+        
+        if route.name == "read_aloud":
             return self.read_page_aloud()
         
-        # YouTube search command patterns
-        youtube_search_patterns = [
-            r"(?:search|find|look for)(?:.+?)(?:on|in|at)(?:.+?)youtube(?:.+?)(?:for\s+)(.+)",
-            r"youtube(?:.+?)(?:search|find|look for)(?:.+?)(?:for\s+)(.+)",
-            r"(?:search|find|look for)(?:.+?)youtube(?:\s+for\s+)(.+)"
-        ]
-        
-        for pattern in youtube_search_patterns:
-            match = re.search(pattern, command, re.IGNORECASE)
-            if match:
-                search_query = match.group(1).strip()
-                if search_query:
-                    self.youtube_controller.search_youtube(search_query)
-                    return
-        
-        # YouTube video selection patterns
-        video_number_pattern = r"(?:tell me about|what's|describe|play|show|start)(?:.+?)(?:video|) (?:number |#)?(first|second|third|fourth|fifth|1st|2nd|3rd|4th|5th|[1-9])"
-        match = re.search(video_number_pattern, command, re.IGNORECASE)
-        if match:
-            position_text = match.group(1).lower()
-            position = 1  # Default to first
-            
-            # Convert position text to number
-            if position_text in ["first", "1st", "1"]:
-                position = 1
-            elif position_text in ["second", "2nd", "2"]:
-                position = 2
-            elif position_text in ["third", "3rd", "3"]:
-                position = 3
-            elif position_text in ["fourth", "4th", "4"]:
-                position = 4
-            elif position_text in ["fifth", "5th", "5"]:
-                position = 5
-            elif position_text.isdigit():
-                position = int(position_text)
+        elif route.name == "youtube_search":
+            self.youtube_controller.search_youtube(params["query"])
             
-            # Determine if it's a describe or play command
-            if any(action in command.lower() for action in ["tell me about", "what's", "describe"]):
+        elif route.name == "video_number":
+            position = params["position"]
+            if params["action"] == "describe":
                 self.awaiting_video_confirmation = True
                 self.video_to_confirm = position
                 self.youtube_controller.describe_video(position)
-            elif any(action in command.lower() for action in ["play", "show", "start"]):
+            elif params["action"] == "play":
                 self.youtube_controller.play_video(position)
-            return
-        
-        # YouTube list videos command
-        if any(phrase in command.lower() for phrase in ["list videos", "show videos", "what videos", "summarize videos", "summarize results"]):
+                
+        elif route.name == "list_videos":
             self.youtube_controller.summarize_search_results()
-            return
-        
-        # Check for setting favorites first - this needs to take precedence
-        if self.favorites_manager.is_setting_favorite_command(command):
-            category, website = self.favorites_manager.extract_favorite_settings(command)
-            if category and website:
-                result = self.set_favorite(category, website)
-                logger.info(result)
-                return
-               
-        # Check if this is a direct open category command
-        if self.favorites_manager.is_open_category_command(command):
-            category = self.favorites_manager.extract_category(command)
-            if category:
-                website = self.get_favorite(category)
-                if website:
-                    self.speak(f"Opening {category}")
-                    self.open_website(website)
-                    return
-        
-        # Check if user wants to list favorites
-        if self.favorites_manager.is_listing_favorites_command(command):
+            
+        elif route.name == "set_favorite":
+            result = self.set_favorite(params["category"], params["website"])
+            logger.info(result)
+            
+        elif route.name in ("open_category", "open_intent"):
+            logger.info(f"Opening favorite {params['category']}: {params['website']}")
+            self.speak(f"Opening {params['category']}")
+            self.open_website(params["website"])
+            
+        elif route.name == "list_favorites":
             favorites_text = "Your favorites are: "
             favorites_list = self.favorites_manager.get_all_favorites()
             full_text = favorites_text + favorites_list
             
             logger.info(f"Favorites: {favorites_list}")
             self.speak(full_text)
-            return
-        
-        # Open website commands
-        if "open" in command or "go to" in command:
-            website = None
             
-            # Extract website from command
-            if "open" in command:
-                match = re.search(r'open\s+(.*?)(?:\s+in browser|\s+website|\s+site|\s*$)', command)
-                if match:
-                    website = match.group(1)
-            elif "go to" in command:
-                match = re.search(r'go to\s+(.*?)(?:\s+website|\s+site|\s*$)', command)
-                if match:
-                    website = match.group(1)
+        elif route.name == "open_website":
+            self.open_website(params["website"])
             
-            if website:
-                self.open_website(website)
-                return
-        
-        # Scroll commands
-        if "scroll" in command:
-            if "down" in command:
-                self.scroll(direction="down")
-            elif "up" in command:
-                self.scroll(direction="up")
-            return
-        
-        # Click commands
-        if "click" in command:
-            # Look for elements to click based on the command
-            element_text = command.replace("click", "").strip()
-            if element_text:
-                self.click_element(element_text)
-            return
-        
-        # Back/forward navigation
-        if "back" in command or "previous page" in command:
+        elif route.name == "scroll":
+            if params["direction"]:
+                self.scroll(direction=params["direction"])
+                
+        elif route.name == "click":
+            if params["element"]:
+                self.click_element(params["element"])
+                
+        elif route.name == "back":
             self.navigate("back")
-            return
-        
-        if "forward" in command or "next page" in command:
+            
+        elif route.name == "forward":
             self.navigate("forward")
-            return
-        
-        # Search commands
-        if "search for" in command:
-            search_query = command.replace("search for", "").strip()
-            self.search(search_query)
-            return
-        
-        # Refresh page
-        if "refresh" in command or "reload" in command:
+            
+        elif route.name == "search_for":
+            self.search(params["query"])
+            
+        elif route.name == "refresh":
             self.refresh_page()
-            return
-        
-        # Close browser
-        if "close browser" in command or "exit" in command:
-            self.close_browser()
-            return
-        
-        # Page description command
-        if any(phrase in command for phrase in [
-            "what's on this page", "what is on this page", "describe this page", 
-            "tell me about this page", "what's on the page", "what can you see", 
-            "describe what you see", "analyze this page", "page content"
-        ]):
+            
+        elif route.name == "close_browser":
+            return self.close_browser()
+            
+        elif route.name == "describe_page":
             self.describe_page()
-            return
-        
-        # Specialized content description commands
-        content_patterns = [
-            (r"(?:tell|describe|what|list)(?:.+?)products", "products"),
-            (r"(?:tell|describe|what|list)(?:.+?)videos", "videos"),
-            (r"(?:tell|describe|what|list)(?:.+?)images", "images"),
-            (r"(?:tell|describe|what|list)(?:.+?)pictures", "images"),
-            (r"(?:tell|describe|what|list)(?:.+?)music", "music"),
-            (r"(?:tell|describe|what|list)(?:.+?)songs", "music"),
-            (r"(?:tell|describe|what|list)(?:.+?)tracks", "music"),
-            (r"(?:tell|describe|what|list)(?:.+?)articles", "articles"),
-            (r"(?:tell|describe|what|list)(?:.+?)posts", "articles")
-        ]
-        
-        for pattern, content_type in content_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                self.describe_content_type(content_type)
-                return
-        
-        # Help command
-        if any(phrase in command for phrase in ["help", "how to use", "instructions", "what can I say", "available commands"]):
-            help_text = "You can use the following commands: Open a website like Google, Search for information, Scroll up or down, Click on links or buttons, Go back or forward between pages, Refresh the page, Set favorites for categories, Open websites by category, Show all your favorites, Read the current page aloud, Ask what's on the page, and Stop reading. Say Close browser when you're done."
+            
+        elif route.name == "describe_content":
+            self.describe_content_type(params["content_type"])
+            
+        elif route.name == "help":
             logger.info("Help requested")
-            self.speak(help_text)
-            return
-        
-        # Continue with existing intent analysis as fallback
-        intent_info = self.analyze_intent(command)
-        if intent_info:
-            if intent_info["intent"] == "open_category":
-                category = intent_info["category"]
-                website = self.get_favorite(category)
-                if website:
-                    logger.info(f"Opening favorite {category}: {website}")
-                    self.speak(f"Opening {category}")
-                    self.open_website(website)
-                    return
-                   
-        logger.info(f"Command not recognized: {command}")
+            self.speak(HELP_TEXT)
+            
+        return None
 
     def open_website(self, website):
         """Open a website in the browser"""
@@ -1112,42 +1145,18 @@ class VoiceBrowserControl:
             self.driver.execute_script("window.scrollBy(0, -500);")
 
     def click_element(self, element_text):
-        """Click an element containing the specified text"""
+        """Click the link or button best matching the specified text"""
         logger.info(f"Looking for element containing: '{element_text}'")
         try:
-            # Try to find by link text
-            element = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.PARTIAL_LINK_TEXT, element_text))
-            )
-            element.click()
-            logger.info(f"Clicked link containing '{element_text}'")
-            return
-        except Exception:
-            pass
-        
-        try:
-            # Try by button text
-            button_xpath = f"//button[contains(text(), '{element_text}')]"
-            element = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, button_xpath))
-            )
-            element.click()
-            logger.info(f"Clicked button containing '{element_text}'")
+            element = self.clickables.click(element_text)
+        except Exception as e:
+            logger.error(f"Could not click element with text '{element_text}': {e}")
             return
-        except Exception:
-            pass
-        
-        try:
-            # Try by any element with text
-            xpath = f"//*[contains(text(), '{element_text}')]"
-            element = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, xpath))
-            )
-            element.click()
-            logger.info(f"Clicked element containing '{element_text}'")
+        if element is None:
+            logger.error(f"Could not find element with text '{element_text}'")
+            self.speak(f"I couldn't find {element_text} on this page.")
             return
-        except Exception as e:
-            logger.error(f"Could not find or click element with text '{element_text}': {e}")
+        logger.info(f"Clicked {element['tag']} '{element['text'] or element['label']}'")
 
     def navigate(self, direction):
         """Navigate back or forward in browser history"""
@@ -1193,14 +1202,28 @@ class VoiceBrowserControl:
         
         self.speak("I'm ready for your commands. Say help for instructions.")
         
-        while True:
-            command = self.listen_to_command()
-            if command:
-                result = self.process_command(command)
-                if result == "EXIT":
-                    self.speak("Closing browser. Goodbye!")
-                    break
-            time.sleep(0.5)
+        # Listening and recognition go on while the previous command executes
+        self.start_listening()
+        self.update_vocabulary()
+        self.pipeline = CommandPipeline(
+            get_utterance=lambda: self.capture.get_utterance(timeout=0.5),
+            recognize=self.recognize_utterance,
+            interpret=self.interpret_command,
+            execute=self._execute_and_refresh_vocabulary,
+            is_stop=is_stop_command,
+            on_stop=self.stop_command
+        )
+        self.pipeline.start()
+        try:
+            self.pipeline.wait()
+        finally:
+            self.pipeline.stop(timeout=1)
+            logger.info(f"Command latency by stage: {self.pipeline.metrics.summary()}")
+            logger.info(f"LLM calls: {self.llm.metrics.summary()}")
+        
+        self.speak("Closing browser. Goodbye!")
+        self.speech.wait_until_idle(timeout=5)
+        self.capture.stop(timeout=1)
 
 
 if __name__ == "__main__":
@@ -1,32 +1,113 @@
 import logging
-import time
+from urllib.parse import urlparse, parse_qs
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from bs4 import BeautifulSoup
+from page_snapshot import PageSnapshotCache
+from page_waits import PageWaiter
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Maximum number of search results kept for "video number X" commands
+MAX_RESULTS = 10
+
+# Spoken feedback; the fixed phrases and the templates filled with a result count are pre-rendered
+OPEN_FAILED = "I couldn't open YouTube."
+NO_VIDEOS_FOUND = "I couldn't find any videos for your search."
+SEARCH_FAILED = "I had trouble searching YouTube."
+RESULTS_UNREADABLE = "I had trouble reading the search results."
+NOTHING_TO_DESCRIBE = "I don't have any videos to describe. Try searching first."
+PLAY_QUESTION = "Would you like to play this video?"
+NOTHING_TO_PLAY = "I don't have any videos to play. Try searching first."
+CANNOT_PLAY = "I couldn't find a way to play this video."
+NOTHING_TO_SUMMARIZE = "I don't have any videos to summarize. Try searching first."
+SUMMARY_FAILED = "I had trouble summarizing the search results."
+VIDEO_COMMANDS_HINT = "You can say 'Tell me about video number X' or 'Play video number X'."
+FOUND_VIDEOS = "I found {count} videos. " + VIDEO_COMMANDS_HINT
+CHOOSE_VIDEO = "Please specify a video between 1 and {count}."
+
+FIXED_PHRASES = [
+    OPEN_FAILED,
+    NO_VIDEOS_FOUND,
+    SEARCH_FAILED,
+    RESULTS_UNREADABLE,
+    NOTHING_TO_DESCRIBE,
+    PLAY_QUESTION,
+    NOTHING_TO_PLAY,
+    CANNOT_PLAY,
+    NOTHING_TO_SUMMARIZE,
+    SUMMARY_FAILED,
+    VIDEO_COMMANDS_HINT,
+]
+
+# Link of the first rendered search result, or null; read without WebDriver's implicit wait
+FIRST_RESULT_SCRIPT = """
+var link = document.querySelector('ytd-video-renderer a#video-title');
+return link ? link.getAttribute('href') : null;
+"""
+
+
+def url_search_query(url):
+    """The normalized search_query of a YouTube results URL, or None"""
+    values = parse_qs(urlparse(url).query).get("search_query")
+    return " ".join(values[0].lower().split()) if values else None
+
+
+def search_results_loaded(query, previous_first=None):
+    """
+    Wait condition for the results of a new search
+
+    The results page is a single-page app: searching from an earlier results
+    page keeps its result elements on screen until the new ones arrive. The
+    results count as loaded once the URL carries the new query and the first
+    result is a different video than before the search.
+
+    Args:
+        query: The query that was searched for
+        previous_first: Link of the first result shown before the search, if any
+    """
+    query = " ".join(query.lower().split())
+
+    def condition(driver):
+        if url_search_query(driver.current_url) != query:
+            return False
+        first = driver.execute_script(FIRST_RESULT_SCRIPT)
+        return first is not None and first != previous_first
+    return condition
+
+
+def cached_phrases():
+    """Return the fixed feedback and the templates that only depend on the number of results"""
+    phrases = list(FIXED_PHRASES)
+    for count in range(1, MAX_RESULTS + 1):
+        phrases.append(FOUND_VIDEOS.format(count=count))
+        phrases.append(CHOOSE_VIDEO.format(count=count))
+    return phrases
+
+
 class YouTubeController:
     """
     Controller for YouTube-specific functionality.
     Handles searching for videos, extracting video information, and playing videos.
     """
     
-    def __init__(self, driver, speech_engine):
+    def __init__(self, driver, speech_engine, snapshots=None, waits=None):
         """
         Initialize the YouTube controller
         
         Args:
             driver: Selenium webdriver instance
             speech_engine: Text-to-speech engine for voice feedback
+            snapshots: Optional PageSnapshotCache shared with the other page features
+            waits: Optional PageWaiter shared with the other page features
         """
         self.driver = driver
         self.speak = speech_engine
+        self.snapshots = snapshots or PageSnapshotCache(driver)
+        self.waits = waits or PageWaiter(driver)
         self.current_videos = []  # Store the most recent search results
-        
+
     def search_youtube(self, query):
         """
         Search YouTube for the given query
@@ -43,48 +124,48 @@ class YouTubeController:
             logger.info(f"Navigating to YouTube from {current_url}")
             try:
                 self.driver.get("https://www.youtube.com")
-                time.sleep(2)  # Wait for page to load
+                # Wait until the search box can be used
+                self.waits.ready("YouTube home", replaces=2,
+                                 condition=EC.presence_of_element_located((By.NAME, "search_query")))
             except Exception as e:
                 logger.error(f"Error navigating to YouTube: {e}")
-                self.speak("I couldn't open YouTube.")
+                self.speak(OPEN_FAILED)
                 return False
         
         try:
-            # Look for the search box
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.NAME, "search_query"))
-            )
+            # The results shown before this search, which must not be read as its results
+            previous_first = None
+            if url_search_query(self.driver.current_url) != " ".join(query.lower().split()):
+                previous_first = self.driver.execute_script(FIRST_RESULT_SCRIPT)
             
-            # Clear and enter search query
+            # Enter the query in the search box
+            search_box = self.driver.find_element(By.NAME, "search_query")
             search_box.clear()
             search_box.send_keys(query)
             search_box.send_keys(Keys.RETURN)
             
-            # Wait for search results to load
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.ID, "contents"))
-            )
-            
             self.speak(f"Searching YouTube for {query}")
             logger.info(f"Searched YouTube for: {query}")
             
-            # Wait a moment for results to fully load
-            time.sleep(2)
+            # Wait for this search's results to render and their requests to settle
+            self.waits.ready("YouTube results", replaces=2,
+                             condition=search_results_loaded(query, previous_first),
+                             network_idle=True, timeout=5)
             
             # Parse the search results
             self._parse_search_results()
             
             # Announce how many videos were found
             if self.current_videos:
-                self.speak(f"I found {len(self.current_videos)} videos. You can say 'Tell me about video number X' or 'Play video number X'.")
+                self.speak(FOUND_VIDEOS.format(count=len(self.current_videos)))
                 return True
             else:
-                self.speak("I couldn't find any videos for your search.")
+                self.speak(NO_VIDEOS_FOUND)
                 return False
                 
         except Exception as e:
             logger.error(f"Error searching YouTube: {e}")
-            self.speak("I had trouble searching YouTube.")
+            self.speak(SEARCH_FAILED)
             return False
     
     def _parse_search_results(self):
@@ -95,41 +176,48 @@ class YouTubeController:
         self.current_videos = []
         
         try:
-            # Get page content
-            page_source = self.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            
-            # Find video elements - YouTube structure can change, so try different selectors
-            video_elements = soup.select("ytd-video-renderer") or soup.select("#contents ytd-item-section-renderer ytd-video-renderer")
-            
-            for i, video in enumerate(video_elements[:10]):  # Limit to first 10 videos
-                try:
-                    # Extract video information
-                    video_info = {
-                        "position": i + 1,
-                        "title": self._extract_text(video.select_one("#video-title, .title-and-badge a")),
-                        "channel": self._extract_text(video.select_one("#channel-name, .ytd-channel-name")),
-                        "views": self._extract_text(video.select_one(".metadata-stats .style-scope, .ytd-video-meta-block .ytd-video-meta-block")),
-                        "time": self._extract_text(video.select_one(".ytd-thumbnail-overlay-time-status-renderer, span.ytd-thumbnail-overlay-time-status-renderer")),
-                        "description": self._extract_text(video.select_one("#description-text, .description-text")),
-                        "url": video.select_one("#video-title, .title-and-badge a")["href"] if video.select_one("#video-title, .title-and-badge a") else None
-                    }
-                    
-                    # Clean up the URL to be absolute
-                    if video_info["url"] and video_info["url"].startswith("/watch"):
-                        video_info["url"] = f"https://www.youtube.com{video_info['url']}"
-                        
-                    self.current_videos.append(video_info)
-                    
-                except Exception as e:
-                    logger.error(f"Error parsing video {i+1}: {e}")
-                    continue
-                    
+            # Parsed once per page state and shared with the other page features
+            snapshot = self.snapshots.current()
+            self.current_videos = list(snapshot.view("youtube_results", self._extract_search_results))
             logger.info(f"Parsed {len(self.current_videos)} videos from YouTube search results")
             
         except Exception as e:
             logger.error(f"Error parsing YouTube search results: {e}")
-            self.speak("I had trouble reading the search results.")
+            self.speak(RESULTS_UNREADABLE)
+    
+    def _extract_search_results(self, snapshot):
+        """Extract the video list from a YouTube search results page snapshot"""
+        soup = snapshot.soup
+        videos = []
+        
+        # Find video elements - YouTube structure can change, so try different selectors
+        video_elements = soup.select("ytd-video-renderer") or soup.select("#contents ytd-item-section-renderer ytd-video-renderer")
+        
+        for i, video in enumerate(video_elements[:MAX_RESULTS]):
+            try:
+                # Extract video information
+                title_link = video.select_one("#video-title, .title-and-badge a")
+                video_info = {
+                    "position": i + 1,
+                    "title": self._extract_text(title_link),
+                    "channel": self._extract_text(video.select_one("#channel-name, .ytd-channel-name")),
+                    "views": self._extract_text(video.select_one(".metadata-stats .style-scope, .ytd-video-meta-block .ytd-video-meta-block")),
+                    "time": self._extract_text(video.select_one(".ytd-thumbnail-overlay-time-status-renderer, span.ytd-thumbnail-overlay-time-status-renderer")),
+                    "description": self._extract_text(video.select_one("#description-text, .description-text")),
+                    "url": title_link.get("href") if title_link else None
+                }
+                
+                # Clean up the URL to be absolute
+                if video_info["url"] and video_info["url"].startswith("/watch"):
+                    video_info["url"] = f"https://www.youtube.com{video_info['url']}"
+                    
+                videos.append(video_info)
+                
+            except Exception as e:
+                logger.error(f"Error parsing video {i+1}: {e}")
+                continue
+        
+        return videos
     
     def _extract_text(self, element):
         """Safely extract text from an element that might be None"""
@@ -148,12 +236,12 @@ class YouTubeController:
             True if description was successful, False otherwise
         """
         if not self.current_videos:
-            self.speak("I don't have any videos to describe. Try searching first.")
+            self.speak(NOTHING_TO_DESCRIBE)
             return False
             
         # Validate position
         if position < 1 or position > len(self.current_videos):
-            self.speak(f"Please specify a video between 1 and {len(self.current_videos)}.")
+            self.speak(CHOOSE_VIDEO.format(count=len(self.current_videos)))
             return False
             
         try:
@@ -179,7 +267,7 @@ class YouTubeController:
             self.speak(description)
             
             # Ask if user wants to play
-            self.speak("Would you like to play this video?")
+            self.speak(PLAY_QUESTION)
             return True
             
         except Exception as e:
@@ -198,12 +286,12 @@ class YouTubeController:
             True if playback was successful, False otherwise
         """
         if not self.current_videos:
-            self.speak("I don't have any videos to play. Try searching first.")
+            self.speak(NOTHING_TO_PLAY)
             return False
             
         # Validate position
         if position < 1 or position > len(self.current_videos):
-            self.speak(f"Please specify a video between 1 and {len(self.current_videos)}.")
+            self.speak(CHOOSE_VIDEO.format(count=len(self.current_videos)))
             return False
             
         try:
@@ -225,7 +313,7 @@ class YouTubeController:
                     logger.info(f"Playing video {position} by clicking: {video['title']}")
                     return True
                 else:
-                    self.speak("I couldn't find a way to play this video.")
+                    self.speak(CANNOT_PLAY)
                     return False
                 
         except Exception as e:
@@ -241,7 +329,7 @@ class YouTubeController:
             True if summary was provided, False otherwise
         """
         if not self.current_videos:
-            self.speak("I don't have any videos to summarize. Try searching first.")
+            self.speak(NOTHING_TO_SUMMARIZE)
             return False
         
         try:
@@ -256,10 +344,10 @@ class YouTubeController:
                 summary += f"And {len(self.current_videos) - 5} more videos."
                 
             self.speak(summary)
-            self.speak("You can say 'Tell me about video number X' or 'Play video number X'.")
+            self.speak(VIDEO_COMMANDS_HINT)
             return True
             
         except Exception as e:
             logger.error(f"Error summarizing search results: {e}")
-            self.speak("I had trouble summarizing the search results.")
+            self.speak(SUMMARY_FAILED)
             return False 
\ No newline at end of file